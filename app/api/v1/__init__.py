@@ -1,3 +1,3 @@
-from . import public, admin_leads  # re-export for convenience
+from . import public, admin_leads, admin_metrics, admin_profiles, admin_analytics, admin_occupancy, admin_catalog, admin_schedule  # re-export for convenience
 
-__all__ = ["public", "admin_leads"]
+__all__ = ["public", "admin_leads", "admin_metrics", "admin_profiles", "admin_analytics", "admin_occupancy", "admin_catalog", "admin_schedule"]
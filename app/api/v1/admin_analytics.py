@@ -0,0 +1,67 @@
+# app/api/v1/admin_analytics.py
+
+from datetime import date, datetime, timedelta
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.v1.deps import get_read_db
+from app.db.sharding import fan_out, get_shard_router
+from app.services.analytics_service import AnalyticsService
+
+router = APIRouter(
+    prefix="/admin/analytics",
+    tags=["admin_analytics"],
+)
+
+
+# дни роллапа — по UTC (как Lead.created_at), и границы по умолчанию тоже
+def _utc_today() -> date:
+    return datetime.utcnow().date()
+
+
+def _default_from() -> date:
+    return _utc_today() - timedelta(days=30)
+
+
+@router.get("/leads/daily")
+def leads_daily(
+    date_from: date = Query(default_factory=_default_from),
+    date_to: date = Query(default_factory=_utc_today),
+    location_id: Optional[int] = Query(default=None),
+    program_type_id: Optional[int] = Query(default=None),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Лиды по дням × локациям × программам: количество, доля обработанных,
+    среднее время обработки. Читает только роллап lead_daily_stats.
+    Без location_id — по всем шардам (роллап лежит в БД города).
+    """
+    if location_id is None and get_shard_router().sharded:
+        return fan_out(
+            lambda shard_db: AnalyticsService(shard_db).daily(date_from, date_to, None, program_type_id),
+            sort_key=lambda row: (row["day"], row["location_id"] or 0, row["program_type_id"] or 0),
+        )
+    return AnalyticsService(db).daily(date_from, date_to, location_id, program_type_id)
+
+
+@router.get("/leads/summary")
+def leads_summary(
+    date_from: date = Query(default_factory=_default_from),
+    date_to: date = Query(default_factory=_utc_today),
+    group_by: Optional[Literal["location", "program_type", "day"]] = Query(default=None),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Итоги воронки за период — целиком или с разбивкой
+    по локации / программе / дню. При шардировании суммы собираются
+    со всех шардов, доли считаются по общим суммам.
+    """
+    if get_shard_router().sharded:
+        rows = fan_out(
+            lambda shard_db: AnalyticsService(shard_db).totals(date_from, date_to, group_by),
+            sort_key=AnalyticsService.group_key,
+        )
+        return AnalyticsService.summarize_totals(rows)
+    return AnalyticsService(db).summary(date_from, date_to, group_by)
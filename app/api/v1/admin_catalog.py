@@ -0,0 +1,87 @@
+# app/api/v1/admin_catalog.py
+
+from fastapi import APIRouter, Depends, Response, status
+from sqlalchemy.orm import Session
+
+from app.api.v1.deps import get_catalog_db, get_read_db
+from app.schemas.location import LocationCreate, LocationRead, LocationUpdate
+from app.schemas.program_type import ProgramTypeCreate, ProgramTypeRead, ProgramTypeUpdate
+from app.schemas.trainer import TrainerCreate, TrainerRead, TrainerUpdate
+from app.services.catalog_service import CatalogService
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin_catalog"],
+)
+
+
+# --- Локации ---
+
+@router.get("/locations", response_model=list[LocationRead])
+def list_locations(db: Session = Depends(get_read_db)):
+    return CatalogService(db).list_locations()
+
+
+@router.post("/locations", response_model=LocationRead, status_code=status.HTTP_201_CREATED)
+def create_location(payload: LocationCreate, db: Session = Depends(get_catalog_db)):
+    return CatalogService(db).create_location(payload.model_dump())
+
+
+@router.patch("/locations/{location_id}", response_model=LocationRead)
+def update_location(location_id: int, payload: LocationUpdate, db: Session = Depends(get_catalog_db)):
+    return CatalogService(db).update_location(location_id, payload.model_dump(exclude_unset=True))
+
+
+@router.delete("/locations/{location_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_location(location_id: int, db: Session = Depends(get_catalog_db)):
+    """Удалить локацию; 409, если на неё ссылаются занятия, тарифы или заявки."""
+    CatalogService(db).delete_location(location_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+# --- Типы программ ---
+
+@router.get("/program-types", response_model=list[ProgramTypeRead])
+def list_program_types(db: Session = Depends(get_read_db)):
+    return CatalogService(db).list_program_types()
+
+
+@router.post("/program-types", response_model=ProgramTypeRead, status_code=status.HTTP_201_CREATED)
+def create_program_type(payload: ProgramTypeCreate, db: Session = Depends(get_catalog_db)):
+    return CatalogService(db).create_program_type(payload.model_dump())
+
+
+@router.patch("/program-types/{program_type_id}", response_model=ProgramTypeRead)
+def update_program_type(program_type_id: int, payload: ProgramTypeUpdate, db: Session = Depends(get_catalog_db)):
+    return CatalogService(db).update_program_type(program_type_id, payload.model_dump(exclude_unset=True))
+
+
+@router.delete("/program-types/{program_type_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_program_type(program_type_id: int, db: Session = Depends(get_catalog_db)):
+    """Удалить тип программы; 409, если на него ссылаются занятия или заявки."""
+    CatalogService(db).delete_program_type(program_type_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+# --- Тренеры ---
+
+@router.get("/trainers", response_model=list[TrainerRead])
+def list_trainers(db: Session = Depends(get_read_db)):
+    return CatalogService(db).list_trainers()
+
+
+@router.post("/trainers", response_model=TrainerRead, status_code=status.HTTP_201_CREATED)
+def create_trainer(payload: TrainerCreate, db: Session = Depends(get_catalog_db)):
+    return CatalogService(db).create_trainer(payload.model_dump())
+
+
+@router.patch("/trainers/{trainer_id}", response_model=TrainerRead)
+def update_trainer(trainer_id: int, payload: TrainerUpdate, db: Session = Depends(get_catalog_db)):
+    return CatalogService(db).update_trainer(trainer_id, payload.model_dump(exclude_unset=True))
+
+
+@router.delete("/trainers/{trainer_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_trainer(trainer_id: int, db: Session = Depends(get_catalog_db)):
+    """Удалить тренера; 409, пока у него есть занятия."""
+    CatalogService(db).delete_trainer(trainer_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,9 +1,10 @@
 # app/api/v1/admin_leads.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.api.v1.deps import get_db
+from app.api.v1.deps import get_db, get_read_db
+from app.db.sharding import fan_out, get_shard_router
 from app.schemas.lead import LeadRead
 from app.services.lead_service import LeadService
 
@@ -15,12 +16,35 @@ router = APIRouter(
 
 
 @router.get("/", response_model=list[LeadRead])
-def list_leads(db: Session = Depends(get_db)):
+def list_leads(db: Session = Depends(get_read_db)):
     """
     Простой административный эндпоинт:
     вернуть список лидов.
     Главное - чтобы модуль имел router.
     """
+    if get_shard_router().sharded:
+        # лиды лежат в БД своих городов: собираем со всех шардов, новые — первыми
+        return fan_out(
+            lambda shard_db: LeadService(shard_db).list_leads(),
+            sort_key=lambda lead: (lead.created_at, lead.id),
+            reverse=True,
+        )
     service = LeadService(db)
     # если в LeadService нет такого метода - можно временно вернуть пустой список
     return service.list_leads()  # или: return []
+
+
+@router.post("/{lead_id}/processed", response_model=LeadRead)
+def mark_lead_processed(lead_id: int, db: Session = Depends(get_db)):
+    """
+    Отметить лид обработанным администратором.
+    При шардировании шард лида — ?location_id= или заголовок X-Cohai-City.
+    Повторный вызов ничего не меняет (processed_at не перезаписывается).
+    """
+    lead = LeadService(db).mark_processed(lead_id)
+    if lead is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Lead with id={lead_id} not found",
+        )
+    return lead
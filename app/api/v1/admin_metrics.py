@@ -0,0 +1,45 @@
+# app/api/v1/admin_metrics.py
+
+from fastapi import APIRouter
+
+from app.core.error_groups import error_groups
+from app.core.metrics import metrics
+from app.services.job_scheduler import job_scheduler
+
+router = APIRouter(
+    prefix="/admin/metrics",
+    tags=["admin_metrics"],
+)
+
+
+@router.get("/")
+def get_metrics():
+    """
+    Счётчики текущего воркера (pid + counters).
+
+    При нескольких воркерах uvicorn каждый отвечает за себя —
+    см. app/tools/load_test.py, который собирает их со всех pid.
+    """
+    return metrics.snapshot()
+
+
+@router.get("/jobs")
+def get_jobs():
+    """
+    Периодические задачи: расписание и последний запуск в этом воркере
+    (jobs) и итоги последних запусков по всему деплою из job_leases (leases).
+    """
+    return {
+        "holder": job_scheduler.holder,
+        "jobs": job_scheduler.status(),
+        "leases": job_scheduler.leases(),
+    }
+
+
+@router.get("/errors")
+def get_error_groups():
+    """
+    Группы необработанных ошибок этого воркера: отпечаток, тип, место,
+    число случаев, первый/последний раз — сначала последние.
+    """
+    return error_groups.snapshot()
@@ -0,0 +1,66 @@
+# app/api/v1/admin_occupancy.py
+
+import heapq
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.v1.deps import get_read_db
+from app.db.sharding import fan_out, get_shard_router
+from app.services.occupancy_service import OccupancyService
+
+router = APIRouter(
+    prefix="/admin/occupancy",
+    tags=["admin_occupancy"],
+)
+
+
+def _default_from() -> date:
+    return date.today() - timedelta(weeks=12)
+
+
+@router.get("/heatmap")
+def occupancy_heatmap(
+    location_id: int = Query(..., ge=1),
+    date_from: date = Query(default_factory=_default_from),
+    date_to: date = Query(default_factory=date.today),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Тепловая карта загрузки локации: матрицы 7×24 (день недели × час)
+    вместимости, спроса и загрузки за период (по целым неделям).
+    """
+    return OccupancyService(db).heatmap(location_id, date_from, date_to)
+
+
+@router.get("/slots")
+def occupancy_slots(
+    date_from: date = Query(default_factory=_default_from),
+    date_to: date = Query(default_factory=date.today),
+    over: float = Query(default=0.9, ge=0),
+    under: float = Query(default=0.3, ge=0),
+    location_id: Optional[int] = Query(default=None),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Пере- и недогруженные слоты (локация × день недели × час)
+    по порогам загрузки `over` / `under`.
+    Без location_id при шардировании считается в каждом шарде
+    (лиды и расписание лежат в БД города), списки сливаются.
+    """
+    if location_id is None and get_shard_router().sharded:
+        reports = fan_out(
+            lambda shard_db: [OccupancyService(shard_db).slots(date_from, date_to, over=over, under=under)],
+            sort_key=lambda report: 0,  # по одному отчёту на шард, порядок не важен
+        )
+
+        def utilization(slot):
+            return slot["utilization"]
+
+        return {
+            "over": list(heapq.merge(*(r["over"] for r in reports), key=utilization, reverse=True)),
+            "under": list(heapq.merge(*(r["under"] for r in reports), key=utilization)),
+        }
+    return OccupancyService(db).slots(date_from, date_to, over=over, under=under, location_id=location_id)
@@ -0,0 +1,35 @@
+# app/api/v1/admin_profiles.py
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import FileResponse
+
+from app.core import profiling
+from app.core.profiling import PROFILE_NAME_RE, list_profiles
+
+router = APIRouter(
+    prefix="/admin/profiles",
+    tags=["admin_profiles"],
+)
+
+
+@router.get("/")
+def get_profiles(limit: int = Query(default=50, ge=1, le=500)):
+    """
+    Последние сохранённые профили запросов (logs/profiles/).
+
+    *.collapsed.txt   — для flamegraph.pl / inferno
+    *.speedscope.json — открыть на https://www.speedscope.app
+    """
+    return list_profiles()[:limit]
+
+
+@router.get("/{name}")
+def download_profile(name: str):
+    """Скачать один файл профиля по имени из списка."""
+    path = profiling.PROFILE_DIR / name
+    if not PROFILE_NAME_RE.match(name) or not path.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile {name} not found",
+        )
+    return FileResponse(path, filename=name)
@@ -0,0 +1,108 @@
+# app/api/v1/admin_schedule.py
+
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.v1.deps import (
+    get_class_session_db,
+    get_class_session_read_db,
+    get_class_session_row_db,
+    get_class_session_update_db,
+    get_read_db,
+    get_schedule_import_db,
+)
+from app.core.exceptions import AppError
+from app.schemas.class_session import (
+    ClassSessionCreate,
+    ClassSessionRead,
+    ClassSessionUpdate,
+    ScheduleImportReport,
+)
+from app.services.schedule_service import ScheduleService
+
+router = APIRouter(
+    prefix="/admin/class-sessions",
+    tags=["admin_schedule"],
+)
+
+
+@router.get("/", response_model=list[ClassSessionRead])
+def list_class_sessions(
+    location_id: int = Query(..., ge=1),
+    db: Session = Depends(get_read_db),
+):
+    """Все занятия локации, включая неактивные."""
+    return ScheduleService(db).list_sessions(location_id)
+
+
+@router.post("/", response_model=ClassSessionRead, status_code=status.HTTP_201_CREATED)
+def create_class_session(
+    payload: ClassSessionCreate,
+    season_start: Optional[date] = Query(default=None),
+    db: Session = Depends(get_class_session_db),
+):
+    return ScheduleService(db).create_session(payload.model_dump(), season_start)
+
+
+@router.post(
+    "/import",
+    response_model=ScheduleImportReport,
+    responses={422: {"model": ScheduleImportReport}},
+)
+async def import_class_sessions(
+    request: Request,
+    season_start: date = Query(default_factory=date.today),
+    dry_run: bool = Query(default=False),
+    allow_overlaps: bool = Query(default=False),
+    db: Session = Depends(get_schedule_import_db),
+):
+    """
+    Импорт расписания сезона: тело запроса — CSV (text/csv), см. формат
+    в app/services/schedule_import.py. Всё или ничего: при ошибках или
+    пересечениях тренеров (если не allow_overlaps) ничего не пишется и
+    отдаётся 422 с отчётом. dry_run=true — только проверка и подсчёт.
+    Все строки файла должны относиться к локациям одного шарда (города).
+    """
+    try:
+        text = (await request.body()).decode("utf-8")
+    except UnicodeDecodeError:
+        raise AppError(code="INVALID_ENCODING", message="CSV must be UTF-8", http_status=422)
+
+    # тело читаем асинхронно, а сам импорт (синхронная БД) — в пуле потоков
+    report = await run_in_threadpool(
+        ScheduleService(db).import_csv,
+        text, season_start, dry_run=dry_run, allow_overlaps=allow_overlaps,
+    )
+    if report.errors or (report.conflicts and not allow_overlaps):
+        return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=report.model_dump())
+    return report
+
+
+@router.get("/{session_id}", response_model=ClassSessionRead)
+def get_class_session(session_id: int, db: Session = Depends(get_class_session_read_db)):
+    """
+    Занятие по id. При шардировании ищется во всех шардах; если id есть
+    в нескольких — нужен X-Cohai-City или location_id (422 AMBIGUOUS_ID).
+    """
+    return ScheduleService(db).get_session(session_id)
+
+
+@router.patch("/{session_id}", response_model=ClassSessionRead)
+def update_class_session(
+    session_id: int,
+    payload: ClassSessionUpdate,
+    db: Session = Depends(get_class_session_update_db),
+):
+    """Перенос в локацию другого шарда (города) — 422 CROSS_SHARD_MOVE."""
+    return ScheduleService(db).update_session(session_id, payload.model_dump(exclude_unset=True))
+
+
+@router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_class_session(session_id: int, db: Session = Depends(get_class_session_row_db)):
+    ScheduleService(db).delete_session(session_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,17 +1,227 @@
 # app/api/v1/deps.py
-from typing import Generator
+import time
+from typing import AsyncGenerator, Generator, Iterable, List, Optional
 
+from fastapi import Request, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.core.config import settings
+from app.core.exceptions import AppError
+from app.db.routing import open_read_session
+from app.db.sharding import PRIMARY_SHARD, fan_out, get_shard_router, open_shard_session
+from app.models.class_session import ClassSession
+from app.models.membership import MembershipPlan
+from app.schemas.class_session import ClassSessionCreate, ClassSessionUpdate
+from app.schemas.lead import LeadCreateGuestVisit
+from app.services.schedule_import import import_location_ids
 
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
 
-def get_db() -> Generator[Session, None, None]:
+# Явный выбор шарда (города) клиентом, см. app/db/sharding.py
+SHARD_HEADER = "X-Cohai-City"
+
+
+def resolve_shard(request: Request, location_id: Optional[int] = None) -> str:
+    """
+    Шард запроса: заголовок X-Cohai-City, иначе location_id
+    (аргумент, path- или query-параметр), иначе primary.
+    """
+    router = get_shard_router()
+    city = request.headers.get(SHARD_HEADER)
+    if city:
+        key = city.strip().lower()
+        if not router.has_shard(key):
+            raise AppError(code="UNKNOWN_SHARD", message=f"Unknown city {city!r}", http_status=404)
+        return key
+
+    if location_id is None:
+        raw = request.path_params.get("location_id") or request.query_params.get("location_id")
+        try:
+            location_id = int(raw) if raw is not None else None
+        except ValueError:
+            location_id = None  # невалидное значение отклонит валидация эндпоинта
+    return router.shard_for_location(location_id)
+
+
+def resolve_rows_shard(request: Request, location_ids: Iterable[int]) -> str:
+    """
+    Шард пакетной записи: все строки должны жить в одном шарде (и совпадать
+    с X-Cohai-City, если он передан) — одна транзакция не охватывает две БД.
+    """
+    router = get_shard_router()
+    shards = {router.shard_for_location(location_id) for location_id in location_ids}
+    if request.headers.get(SHARD_HEADER) or not shards:
+        shards.add(resolve_shard(request))
+    if len(shards) > 1:
+        raise AppError(
+            code="MIXED_SHARDS",
+            message=f"Rows belong to different cities ({', '.join(sorted(shards))}); import each city separately",
+            http_status=422,
+        )
+    return shards.pop()
+
+
+def resolve_row_shard(request: Request, model, row_id: int) -> str:
+    """
+    Шард строки для /{id}-эндпоинтов: X-Cohai-City или location_id
+    в query, иначе ищем строку по id во всех шардах (по её location_id).
+    id уникальны только внутри шарда: нашлась в нескольких — просим подсказку.
+    """
+    router = get_shard_router()
+    if not router.sharded or request.headers.get(SHARD_HEADER) or request.query_params.get("location_id"):
+        return resolve_shard(request)
+
+    def owners(db: Session) -> List[str]:
+        location_ids = db.scalars(select(model.location_id).where(model.id == row_id))
+        return sorted(router.shard_for_location(location_id) for location_id in location_ids)
+
+    shards = set(fan_out(owners, sort_key=str))
+    if len(shards) > 1:
+        raise AppError(
+            code="AMBIGUOUS_ID",
+            message=f"id={row_id} exists in several cities ({', '.join(sorted(shards))}); pass {SHARD_HEADER}",
+            http_status=422,
+        )
+    return shards.pop() if shards else PRIMARY_SHARD
+
+
+def _open_write_session(request: Request, response: Response, shard: str) -> Session:
+    if request.method not in _SAFE_METHODS:
+        until = int(time.time()) + settings.READ_YOUR_WRITES_SECONDS
+        response.set_cookie(
+            settings.READ_YOUR_WRITES_COOKIE,
+            str(until),
+            max_age=settings.READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+        )
+    return open_shard_session(shard)
+
+
+def _write_session(request: Request, response: Response, shard: str) -> Generator[Session, None, None]:
+    db = _open_write_session(request, response, shard)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_db(request: Request, response: Response) -> Generator[Session, None, None]:
     """
     Зависимость FastAPI, которая отдаёт сессию БД и корректно её закрывает.
+
+    Сессия всегда на primary своего шарда (см. resolve_shard). Для пишущих
+    запросов (POST/PUT/PATCH/DELETE) ставим cookie: следующие
+    READ_YOUR_WRITES_SECONDS секунд чтения этого клиента тоже пойдут
+    в primary (см. get_read_db).
     """
-    db: Session = SessionLocal()
+    yield from _write_session(request, response, resolve_shard(request))
+
+
+def get_catalog_db(request: Request, response: Response) -> Generator[Session, None, None]:
+    """
+    get_db для записи справочников: всегда primary, что бы ни говорили
+    X-Cohai-City и location_id в пути — копии в шарды пишет CatalogService.
+    """
+    yield from _write_session(request, response, PRIMARY_SHARD)
+
+
+def get_guest_visit_db(
+    payload: LeadCreateGuestVisit,
+    request: Request,
+    response: Response,
+) -> Generator[Session, None, None]:
+    """get_db для заявки: location_id приходит в теле запроса."""
+    yield from _write_session(request, response, resolve_shard(request, payload.location_id))
+
+
+def get_class_session_db(
+    payload: ClassSessionCreate,
+    request: Request,
+    response: Response,
+) -> Generator[Session, None, None]:
+    """get_db для нового занятия: location_id приходит в теле запроса."""
+    yield from _write_session(request, response, resolve_shard(request, payload.location_id))
+
+
+def get_class_session_row_db(
+    session_id: int,
+    request: Request,
+    response: Response,
+) -> Generator[Session, None, None]:
+    """get_db для /class-sessions/{session_id}: шард — тот, где лежит занятие."""
+    yield from _write_session(request, response, resolve_row_shard(request, ClassSession, session_id))
+
+
+def get_class_session_update_db(
+    session_id: int,
+    payload: ClassSessionUpdate,
+    request: Request,
+    response: Response,
+) -> Generator[Session, None, None]:
+    """
+    get_db для PATCH занятия. Перенос в локацию другого шарда отклоняем:
+    строку пришлось бы удалить в одной БД и создать в другой.
+    """
+    shard = resolve_row_shard(request, ClassSession, session_id)
+    if payload.location_id is not None and get_shard_router().shard_for_location(payload.location_id) != shard:
+        raise AppError(
+            code="CROSS_SHARD_MOVE",
+            message="Class session cannot be moved to a location of another city; delete and recreate it",
+            http_status=422,
+            extra={"location_id": payload.location_id},
+        )
+    yield from _write_session(request, response, shard)
+
+
+async def get_schedule_import_db(request: Request, response: Response) -> AsyncGenerator[Session, None]:
+    """
+    get_db для импорта CSV: шард — по location_id строк файла.
+    Тело Starlette кэширует, эндпоинт прочитает его повторно бесплатно.
+    """
+    text = (await request.body()).decode("utf-8", errors="replace")
+    db = _open_write_session(request, response, resolve_rows_shard(request, import_location_ids(text)))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def wrote_recently(request: Request) -> bool:
+    raw = request.cookies.get(settings.READ_YOUR_WRITES_COOKIE)
+    if not raw:
+        return False
+    try:
+        return int(raw) >= time.time()
+    except ValueError:
+        return False
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Сессия для read-only эндпоинтов (GET): реплика по кругу,
+    при недоступности реплик или недавней записи клиента — primary.
+    Реплики есть только у основного шарда, прочие шарды читаются напрямую.
+    """
+    yield from _read_session(request, resolve_shard(request))
+
+
+def _read_session(request: Request, shard: str) -> Generator[Session, None, None]:
+    if shard == PRIMARY_SHARD:
+        db: Session = open_read_session(sticky=wrote_recently(request))
+    else:
+        db = open_shard_session(shard)
     try:
         yield db
     finally:
         db.close()
+
+
+def get_class_session_read_db(session_id: int, request: Request) -> Generator[Session, None, None]:
+    """get_read_db для /class-sessions/{session_id}."""
+    yield from _read_session(request, resolve_row_shard(request, ClassSession, session_id))
+
+
+def get_membership_read_db(membership_id: int, request: Request) -> Generator[Session, None, None]:
+    """get_read_db для /memberships/{membership_id}."""
+    yield from _read_session(request, resolve_row_shard(request, MembershipPlan, membership_id))
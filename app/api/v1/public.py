@@ -1,46 +1,258 @@
 # app/api/v1/public.py
 
+from datetime import time
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 
-from app.api.v1.deps import get_db
-from app.repositories.location_repo import LocationRepository
-from app.repositories.program_type_repo import ProgramTypeRepository
-from app.schemas.class_session import ClassSessionRead
+from app.api.v1.deps import get_guest_visit_db, get_membership_read_db, get_read_db
+from app.db.sharding import fan_out, get_shard_router
+from app.repositories.read_models import ReadModelRepository
+from app.schemas.availability import FreeSlotRead
+from app.schemas.class_session import ClassSessionRead, ClassSessionSearchRead
 from app.schemas.lead import LeadCreateGuestVisit, LeadRead
-from app.schemas.location import LocationRead
-from app.schemas.membership import MembershipPlanRead
+from app.schemas.location import LocationNearestRead, LocationRead
+from app.schemas.membership import MembershipComparisonRead, MembershipPlanComparison, MembershipPlanRead
 from app.schemas.program_type import ProgramTypeRead
+from app.core.config import settings
+from app.services.availability import AvailabilityService
+from app.services.ical_feed import feed_cache, feed_etag, get_catalog_version, render_and_cache
 from app.services.lead_service import LeadService
+from app.services.location_index import get_location_index
 from app.services.membership_service import MembershipService
 from app.services.schedule_service import ScheduleService
+from app.services.schedule_changes import schedule_changes
+from app.services.reference_cache import get_reference_data
+from app.services.schedule_versions import get_schedule_version
 from app.core.exceptions import AppError
 
 router = APIRouter(tags=["public"])
 
 
 @router.get("/locations", response_model=list[LocationRead])
-def list_locations(db: Session = Depends(get_db)):
-    repo = LocationRepository(db)
-    return repo.list_all()
+def list_locations(db: Session = Depends(get_read_db)):
+    return ReadModelRepository(db).list_locations()
+
+
+@router.get("/locations/nearest", response_model=list[LocationNearestRead])
+def nearest_locations(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(default=5, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Ближайшие к точке студии (для подсказки в LocationSelect).
+
+    Локации без координат не участвуют. Поиск идёт по KD-дереву
+    в памяти, без запроса к БД (кроме перестройки индекса).
+    """
+    return [
+        LocationNearestRead(
+            id=location.id,
+            name=location.name,
+            address=location.address,
+            latitude=location.latitude,
+            longitude=location.longitude,
+            distance_km=distance_km,
+        )
+        for location, distance_km in get_location_index(db).nearest(lat, lon, limit)
+    ]
 
 
 @router.get("/program-types", response_model=list[ProgramTypeRead])
-def list_program_types(db: Session = Depends(get_db)):
-    repo = ProgramTypeRepository(db)
-    return repo.list_all()
+def list_program_types(db: Session = Depends(get_read_db)):
+    return ReadModelRepository(db).list_program_types()
 
 
 @router.get("/schedule", response_model=list[ClassSessionRead])
 def get_schedule(
     location_id: int = Query(...),
-    db: Session = Depends(get_db),
+    weekday: Optional[int] = Query(default=None, ge=0, le=6),
+    program_type_id: Optional[int] = Query(default=None),
+    trainer_id: Optional[int] = Query(default=None),
+    db: Session = Depends(get_read_db),
 ):
+    """
+    Расписание локации (опционально — только день недели / программа /
+    тренер). Отвечает из снимка расписания в памяти воркера.
+    """
     service = ScheduleService(db)
-    return service.get_schedule_for_location(location_id)
+    return service.get_schedule_for_location(
+        location_id, weekday=weekday, program_type_id=program_type_id, trainer_id=trainer_id,
+    )
+
+
+@router.get("/schedule/search", response_model=list[ClassSessionSearchRead])
+def search_schedule(
+    location_id: Optional[List[int]] = Query(default=None, description="Одна или несколько локаций"),
+    program_type_id: Optional[List[int]] = Query(default=None),
+    trainer_id: Optional[List[int]] = Query(default=None),
+    weekday: Optional[List[int]] = Query(default=None, description="0 = понедельник … 6 = воскресенье"),
+    start_from: Optional[time] = Query(default=None, description="Начало не раньше, HH:MM"),
+    start_to: Optional[time] = Query(default=None, description="Начало не позже, HH:MM"),
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Поиск занятий по всем локациям: любые сочетания фильтров, внутри
+    одного фильтра значения через OR (?weekday=0&weekday=2).
+    Только активные занятия, по дню недели и времени начала.
+    Если локации не заданы или лежат в разных шардах — ищем во всех.
+    """
+    if weekday is not None and any(not 0 <= day <= 6 for day in weekday):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="weekday must be 0..6")
+
+    def search(shard_db: Session) -> List[dict]:
+        return ScheduleService(shard_db).search(
+            location_ids=location_id,
+            program_type_ids=program_type_id,
+            trainer_ids=trainer_id,
+            weekdays=weekday,
+            start_from=start_from,
+            start_to=start_to,
+            limit=limit,
+        )
+
+    shards = get_shard_router()
+    if shards.sharded and (
+        location_id is None or len({shards.shard_for_location(i) for i in location_id}) > 1
+    ):
+        # тот же порядок, что у индекса поиска: день, начало, локация, id
+        rows = fan_out(
+            search,
+            sort_key=lambda row: (row["weekday"], row["start_time"], row["location_id"], row["id"]),
+        )
+        return rows[:limit]
+    return search(db)
+
+
+@router.get("/availability", response_model=list[FreeSlotRead])
+def get_availability(
+    location_id: int = Query(...),
+    program_type_id: Optional[int] = Query(default=None, description="Только персональные программы"),
+    trainer_id: Optional[int] = Query(default=None),
+    duration: int = Query(default=60, ge=15, le=240, description="Длительность, минуты"),
+    limit: int = Query(default=10, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Ближайшие свободные окна тренеров для персонального занятия:
+    рабочие часы минус групповые занятия тренера во всех студиях.
+    """
+    slots = AvailabilityService(db).next_free_slots(
+        location_id,
+        program_type_id=program_type_id,
+        trainer_id=trainer_id,
+        duration_minutes=duration,
+        limit=limit,
+    )
+    references = get_reference_data(db)
+    return [
+        FreeSlotRead(trainer_name=references.trainer_name(slot.trainer_id), **slot._asdict())
+        for slot in slots
+    ]
+
+
+@router.get("/schedule/version")
+async def get_schedule_version_endpoint(
+    location_id: Optional[int] = Query(default=None),
+    since: Optional[int] = Query(
+        default=None,
+        description="Long-poll: ждать, пока версия локации не станет отличной от since.",
+    ),
+    timeout: float = Query(default=25, ge=0, le=settings.SCHEDULE_LONG_POLL_MAX_SECONDS),
+):
+    """
+    Версия расписания (растёт при любой записи ClassSession локации).
+
+    Клиент перезапрашивает /schedule только при её изменении.
+    С `since` (и location_id) запрос висит до изменения или timeout.
+    """
+    if location_id is not None and since is not None:
+        version = await schedule_changes.wait_for_change(location_id, since, timeout)
+        return {"location_id": location_id, "version": version}
+
+    if location_id is not None:
+        return {"location_id": location_id, "version": await schedule_changes.version(location_id)}
+    versions = await schedule_changes.current()
+    return {"version": sum(versions.values()), "locations": versions}
+
+
+@router.get("/schedule/stream")
+async def stream_schedule_versions(location_id: Optional[int] = Query(default=None)):
+    """
+    Server-Sent Events: текущие версии расписания, затем каждое изменение
+    (event: schedule-version, data: {"location_id", "version"}).
+    """
+    return StreamingResponse(
+        schedule_changes.stream(location_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _feed_order(row) -> tuple:
+    # (id, starts_at, weekday, start_time, …) — см. ClassSessionRepository.list_for_feed
+    return row[2], row[3], row[0]
+
+
+@router.get("/schedule.ics", response_class=StreamingResponse)
+def get_schedule_ics(
+    request: Request,
+    location_id: Optional[int] = Query(default=None),
+    trainer_id: Optional[int] = Query(default=None),
+    program_type_id: Optional[int] = Query(default=None),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Расписание в формате iCalendar для подписки из календаря.
+
+    Календари опрашивают фид часто, поэтому:
+    - If-None-Match с актуальным ETag → 304 без обращения к БД;
+    - готовый фид по той же комбинации фильтров и версиям расписания
+      и справочников отдаётся из кэша процесса;
+    - иначе фид рендерится и стримится кусками, попутно попадая в кэш.
+
+    Без location_id при шардировании версия и строки собираются со всех шардов.
+    """
+    all_shards = location_id is None and get_shard_router().sharded
+    key = (location_id, trainer_id, program_type_id)
+    if all_shards:
+        schedule_version = sum(fan_out(lambda shard_db: [get_schedule_version(shard_db)], sort_key=int))
+    else:
+        schedule_version = get_schedule_version(db, location_id)
+    version = (schedule_version, get_catalog_version(db))
+    headers = {
+        "ETag": feed_etag(key, version),
+        "Cache-Control": f"public, max-age={settings.ICAL_MAX_AGE_SECONDS}",
+        "Content-Disposition": 'inline; filename="schedule.ics"',
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    media_type = "text/calendar; charset=utf-8"
+    cached = feed_cache.get(key, version)
+    if cached is not None:
+        return Response(content=cached, media_type=media_type, headers=headers)
+
+    # строки читаем целиком до стрима: сессия закрывается раньше, чем уйдёт ответ
+    if all_shards:
+        # порядок событий календарю не важен: сливаем по дню, началу и id
+        def feed_rows(shard_db: Session) -> List[tuple]:
+            rows = ScheduleService(shard_db).list_for_feed(None, trainer_id, program_type_id)
+            return sorted(rows, key=_feed_order)
+
+        rows = fan_out(feed_rows, sort_key=_feed_order)
+    else:
+        rows = ScheduleService(db).list_for_feed(location_id, trainer_id, program_type_id)
+    name = f"{settings.APP_NAME} — schedule"
+    return StreamingResponse(
+        render_and_cache(rows, name, key, version), media_type=media_type, headers=headers,
+    )
 
 
 @router.get("/memberships", response_model=list[MembershipPlanRead])
@@ -49,35 +261,70 @@ def get_memberships(
         default=None,
         description="Фильтрация по локации. Если не задано — вернуть тарифы по всем локациям.",
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Публичный список абонементов.
 
     - Если location_id не передан — возвращаем все активные тарифы по всем локациям.
     - Если location_id передан — валидируем существование локации, затем фильтруем.
+    - Тарифы лежат в шарде своей локации: без location_id читаем все шарды.
     """
-    # Валидация location_id, если он указан
+    # Валидация location_id, если он указан: поиск в справочнике в памяти, без запроса в БД
     if location_id is not None:
-        loc_repo = LocationRepository(db)
-        location = loc_repo.get_by_id(location_id)
-        if location is None:
+        if not get_reference_data(db).has_location(location_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Location with id={location_id} not found",
             )
-    
-    service = MembershipService(db)
-    # only_active=True — для публичного API показываем только актуальные тарифы
-    return service.list_all(location_id=location_id, only_active=True)
+        return MembershipService(db).list_public(location_id=location_id)
+
+    if get_shard_router().sharded:
+        return fan_out(lambda shard_db: MembershipService(shard_db).list_public(), sort_key=lambda plan: plan.id)
+    return MembershipService(db).list_public()
+
+
+@router.get("/memberships/compare", response_model=MembershipComparisonRead)
+def compare_memberships(
+    location_id: int = Query(...),
+    visits_per_week: int = Query(default=2, ge=1, le=14, description="Сколько раз в неделю планирует ходить клиент"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Тарифы локации, отсортированные по цене одного посещения при заданной
+    частоте (с учётом лимита посещений), плюс цена дня и рекомендация.
+    """
+    if not get_reference_data(db).has_location(location_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Location with id={location_id} not found",
+        )
+
+    scores = MembershipService(db).compare(location_id, visits_per_week)
+    return MembershipComparisonRead(
+        location_id=location_id,
+        visits_per_week=visits_per_week,
+        recommended_plan_id=scores[0].plan.id if scores else None,
+        plans=[
+            MembershipPlanComparison(
+                **{name: getattr(score.plan, name) for name in score.plan.__slots__},
+                rank=score.rank,
+                expected_visits=score.expected_visits,
+                cost_per_visit=score.cost_per_visit,
+                cost_per_day=score.cost_per_day,
+            )
+            for score in scores
+        ],
+    )
+
 
 @router.get("/memberships/{membership_id}", response_model=MembershipPlanRead)
 def get_membership(
     membership_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_membership_read_db),
 ):
     """
-    Публичный эндпоинт: один абонемент по id.
+    Публичный эндпоинт: один абонемент по id (из шарда, где он лежит).
     """
     service = MembershipService(db)
     plan = service.get(membership_id)
@@ -92,7 +339,7 @@ def get_membership(
 @router.post("/leads/guest-visit", response_model=LeadRead)
 def create_guest_visit(
     payload: LeadCreateGuestVisit,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_guest_visit_db),
 ):
     service = LeadService(db)
     return service.create_guest_visit(payload)
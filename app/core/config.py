@@ -23,6 +23,121 @@ class Settings:
     # BACKEND_CORS_ORIGINS="http://localhost:3000,https://my-site.com"
     _cors_origins_env: str = os.getenv("BACKEND_CORS_ORIGINS", "*")
 
+    # Бюджет времени холодного старта (импорт app.main + lifespan), мс.
+    # Проверяется утилитой app/tools/debug_imports.py --importtime
+    STARTUP_BUDGET_MS: int = int(os.getenv("COHAI_STARTUP_BUDGET_MS", "1500"))
+
+    # Сколько соединений открыть в пуле заранее при прогреве (lifespan)
+    DB_POOL_MIN_CONNECTIONS: int = int(os.getenv("COHAI_DB_POOL_MIN_CONNECTIONS", "2"))
+
+    # Выключатель прогрева: COHAI_WARMUP_ENABLED=0 → /ready сразу готов
+    WARMUP_ENABLED: bool = os.getenv("COHAI_WARMUP_ENABLED", "1") == "1"
+
+    # Запись в БД дольше порога считаем ожиданием блокировки (метрика db.lock_waits)
+    DB_LOCK_WAIT_THRESHOLD_MS: float = float(os.getenv("COHAI_DB_LOCK_WAIT_THRESHOLD_MS", "50"))
+
+    # --- Профилирование запросов (app/core/profiling.py) ---
+    # Запрос профилируется, если пришёл заголовок PROFILE_HEADER со значением
+    # PROFILE_TOKEN (пустой токен — заголовок отключён) или он попал в выборку
+    # с вероятностью PROFILE_SAMPLE_RATE (0.0 … 1.0).
+    PROFILE_TOKEN: str = os.getenv("COHAI_PROFILE_TOKEN", "")
+    PROFILE_HEADER: str = "X-Cohai-Profile"
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("COHAI_PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_INTERVAL_MS: float = float(os.getenv("COHAI_PROFILE_INTERVAL_MS", "1"))
+    # сколько последних профилей хранить в logs/profiles/
+    PROFILE_KEEP: int = int(os.getenv("COHAI_PROFILE_KEEP", "50"))
+
+    # --- Реплики для чтения (app/db/routing.py) ---
+    # Сколько секунд не трогать реплику после неудачного подключения
+    REPLICA_RETRY_SECONDS: float = float(os.getenv("COHAI_REPLICA_RETRY_SECONDS", "30"))
+    # Сколько секунд после записи клиент читает с primary (read-your-writes)
+    READ_YOUR_WRITES_SECONDS: int = int(os.getenv("COHAI_READ_YOUR_WRITES_SECONDS", "5"))
+    READ_YOUR_WRITES_COOKIE: str = "cohai_rw_until"
+
+    # --- Outbox-уведомления (app/services/outbox_dispatcher.py) ---
+    # Запускать ли диспетчер в lifespan каждого воркера
+    # (альтернатива — отдельный процесс app/tools/outbox_worker.py)
+    OUTBOX_DISPATCHER_ENABLED: bool = os.getenv("COHAI_OUTBOX_DISPATCHER_ENABLED", "1") == "1"
+    # Куда доставлять: "log", "stdout", "file:<path>" через запятую
+    OUTBOX_SINKS: str = os.getenv("COHAI_OUTBOX_SINKS", "log")
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("COHAI_OUTBOX_BATCH_SIZE", "100"))
+    OUTBOX_POLL_SECONDS: float = float(os.getenv("COHAI_OUTBOX_POLL_SECONDS", "1.0"))
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("COHAI_OUTBOX_MAX_ATTEMPTS", "8"))
+    OUTBOX_BACKOFF_SECONDS: float = float(os.getenv("COHAI_OUTBOX_BACKOFF_SECONDS", "2"))
+    OUTBOX_LEASE_SECONDS: float = float(os.getenv("COHAI_OUTBOX_LEASE_SECONDS", "60"))
+
+    # --- Rate limiting пишущих публичных эндпоинтов (app/core/rate_limit.py) ---
+    RATE_LIMIT_ENABLED: bool = os.getenv("COHAI_RATE_LIMIT_ENABLED", "1") == "1"
+    RATE_LIMIT_PATHS: tuple = ("/api/v1/leads/guest-visit",)
+    # "memory" — ведра в каждом воркере; "sqlite:<path>" — общие на машину
+    RATE_LIMIT_BACKEND: str = os.getenv("COHAI_RATE_LIMIT_BACKEND", "memory")
+    # по IP: всплеск до CAPACITY заявок, дальше PER_MINUTE в минуту
+    RATE_LIMIT_IP_CAPACITY: float = float(os.getenv("COHAI_RATE_LIMIT_IP_CAPACITY", "10"))
+    RATE_LIMIT_IP_PER_MINUTE: float = float(os.getenv("COHAI_RATE_LIMIT_IP_PER_MINUTE", "10"))
+    # по телефону: реальному человеку хватит пары заявок в час
+    RATE_LIMIT_PHONE_CAPACITY: float = float(os.getenv("COHAI_RATE_LIMIT_PHONE_CAPACITY", "3"))
+    RATE_LIMIT_PHONE_PER_HOUR: float = float(os.getenv("COHAI_RATE_LIMIT_PHONE_PER_HOUR", "3"))
+    # брать IP из X-Forwarded-For (только за доверенным reverse proxy)
+    RATE_LIMIT_TRUST_FORWARDED: bool = os.getenv("COHAI_RATE_LIMIT_TRUST_FORWARDED", "0") == "1"
+    # тело заявки читается middleware целиком — больше этого отвечаем 413
+    RATE_LIMIT_MAX_BODY_BYTES: int = int(os.getenv("COHAI_RATE_LIMIT_MAX_BODY_BYTES", "16384"))
+
+    # Отчёты о загрузке занятий: прошлые недели кэшируются насовсем,
+    # текущая (ещё меняется) — на столько секунд
+    OCCUPANCY_CURRENT_WEEK_TTL_SECONDS: float = float(
+        os.getenv("COHAI_OCCUPANCY_CURRENT_WEEK_TTL_SECONDS", "60")
+    )
+
+    # iCalendar-фид расписания: зона для «плавающего» времени занятий,
+    # сколько фидов (комбинаций фильтров) держать в кэше и max-age для клиентов
+    SCHEDULE_TIMEZONE: str = os.getenv("COHAI_SCHEDULE_TIMEZONE", "Europe/Chisinau")
+    ICAL_CACHE_SIZE: int = int(os.getenv("COHAI_ICAL_CACHE_SIZE", "512"))
+    ICAL_MAX_AGE_SECONDS: int = int(os.getenv("COHAI_ICAL_MAX_AGE_SECONDS", "300"))
+
+    # Лента изменений расписания: как часто воркер перечитывает версии
+    # (изменения из других воркеров), heartbeat SSE и предел long-poll
+    SCHEDULE_POLL_SECONDS: float = float(os.getenv("COHAI_SCHEDULE_POLL_SECONDS", "1.0"))
+    SCHEDULE_STREAM_HEARTBEAT_SECONDS: float = float(os.getenv("COHAI_SCHEDULE_STREAM_HEARTBEAT_SECONDS", "15"))
+    SCHEDULE_LONG_POLL_MAX_SECONDS: float = float(os.getenv("COHAI_SCHEDULE_LONG_POLL_MAX_SECONDS", "30"))
+
+    # Согласованность кэшей между воркерами (app/services/cache_bus.py):
+    # как часто сверять версии таблиц в начале запроса и каталог
+    # unix-сокетов для push-уведомлений (пусто — только сверка версий)
+    CACHE_CHECK_INTERVAL_SECONDS: float = float(os.getenv("COHAI_CACHE_CHECK_INTERVAL_SECONDS", "0.05"))
+    CACHE_BUS_SOCKET_DIR: str = os.getenv("COHAI_CACHE_BUS_SOCKET_DIR", "")
+
+    # Свободные окна тренеров для персональных занятий (app/services/availability.py):
+    # рабочие часы ("mon-fri 08:00-21:00; sat 09:00-15:00"), шаг сетки начала,
+    # запас до/после занятий (переезд между студиями), горизонт поиска
+    # и минимальное время до начала слота
+    WORKING_HOURS: str = os.getenv("COHAI_WORKING_HOURS", "mon-fri 08:00-21:00; sat 09:00-15:00")
+    AVAILABILITY_STEP_MINUTES: int = int(os.getenv("COHAI_AVAILABILITY_STEP_MINUTES", "30"))
+    AVAILABILITY_BUFFER_MINUTES: int = int(os.getenv("COHAI_AVAILABILITY_BUFFER_MINUTES", "15"))
+    AVAILABILITY_HORIZON_DAYS: int = int(os.getenv("COHAI_AVAILABILITY_HORIZON_DAYS", "28"))
+    AVAILABILITY_MIN_LEAD_MINUTES: int = int(os.getenv("COHAI_AVAILABILITY_MIN_LEAD_MINUTES", "120"))
+
+    # Периодические задачи (app/services/job_scheduler.py): выключатель,
+    # запас аренды сверх таймаута задачи, случайная задержка старта,
+    # хранение доставленных outbox-сообщений и cron ночной пересборки
+    # роллапа лидов (UTC, например "30 3 * * *"; по умолчанию пусто — не
+    # пересобирать: роллап ведётся инкрементально, пересборка — по решению)
+    JOBS_ENABLED: bool = os.getenv("COHAI_JOBS_ENABLED", "1") == "1"
+    JOB_LEASE_MARGIN_SECONDS: float = float(os.getenv("COHAI_JOB_LEASE_MARGIN_SECONDS", "30"))
+    JOB_JITTER_SECONDS: float = float(os.getenv("COHAI_JOB_JITTER_SECONDS", "10"))
+    OUTBOX_RETENTION_DAYS: int = int(os.getenv("COHAI_OUTBOX_RETENTION_DAYS", "7"))
+    LEAD_STATS_REBUILD_CRON: str = os.getenv("COHAI_LEAD_STATS_REBUILD_CRON", "")
+
+    # Группировка необработанных ошибок (app/core/error_groups.py):
+    # полный стек — только для первых N случаев группы за окно,
+    # сколько кадров стека входит в отпечаток и сколько групп держим
+    ERROR_WINDOW_SECONDS: float = float(os.getenv("COHAI_ERROR_WINDOW_SECONDS", "60"))
+    ERROR_TRACES_PER_WINDOW: int = int(os.getenv("COHAI_ERROR_TRACES_PER_WINDOW", "3"))
+    ERROR_FINGERPRINT_FRAMES: int = int(os.getenv("COHAI_ERROR_FINGERPRINT_FRAMES", "3"))
+    ERROR_GROUPS_MAX: int = int(os.getenv("COHAI_ERROR_GROUPS_MAX", "500"))
+
+    # Импорт расписания из CSV: максимум строк в одном файле
+    SCHEDULE_IMPORT_MAX_ROWS: int = int(os.getenv("COHAI_SCHEDULE_IMPORT_MAX_ROWS", "5000"))
+
     @property
     def BACKEND_CORS_ORIGINS(self) -> List[str]:
         raw = self._cors_origins_env
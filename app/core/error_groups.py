@@ -0,0 +1,207 @@
+# app/core/error_groups.py
+"""
+Группировка необработанных ошибок по «отпечатку».
+
+Отпечаток = тип исключения + верхние ERROR_FINGERPRINT_FRAMES кадров
+стека (файл, функция, строка) от места выброса — кадров нашего кода
+(app/), а не библиотек: KeyError из двух разных сервисов, вылетевший
+в одной и той же функции SQLAlchemy, — это две группы. Если кадров
+app/ в стеке нет — берём все. Одинаковые ошибки одной
+аварии попадают в одну группу, и в error.log полный стек пишется только
+для первых ERROR_TRACES_PER_WINDOW случаев группы за окно
+ERROR_WINDOW_SECONDS; остальные лишь считаются, а при смене окна
+в лог уходит одна строка «повторилась N раз» — со следующим случаем
+или из flush() (раз в окно, см. flush_forever), если авария кончилась.
+
+Группы живут в памяти воркера (как и счётчики app.core.metrics),
+их не больше ERROR_GROUPS_MAX — давно не виденные вытесняются.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger("cohai")
+
+# Каталог пакета app/: кадры отсюда — «наш код»
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+Frame = Tuple[str, str, int]
+
+
+def _stack(exc: BaseException, root: str) -> List[Frame]:
+    """Кадры (файл, функция, строка) до места выброса; только из root, если такие есть."""
+    stack = [
+        (frame.f_code.co_filename, frame.f_code.co_name, lineno)
+        for frame, lineno in traceback.walk_tb(exc.__traceback__)
+    ]
+    prefix = os.path.join(root, "")
+    own = [frame for frame in stack if os.path.abspath(frame[0]).startswith(prefix)]
+    return own or stack
+
+
+def fingerprint(exc: BaseException, frames: int, root: str = PROJECT_ROOT) -> str:
+    """Короткий хэш типа исключения и верхних кадров стека нашего кода."""
+    stack = _stack(exc, root)
+    stack = stack[-frames:] if frames > 0 else []
+    raw = repr((type(exc).__module__, type(exc).__qualname__, stack))
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def _where(exc: BaseException, root: str = PROJECT_ROOT) -> str:
+    """Место выброса в нашем коде: "schedule_service.py:42 in get_session"."""
+    stack = _stack(exc, root)
+    if not stack:
+        return ""
+    filename, function, lineno = stack[-1]
+    return f"{os.path.basename(filename)}:{lineno} in {function}"
+
+
+def log_repeated(group: "ErrorGroup", repeated: int) -> None:
+    logger.error(
+        "Error group %s (%s) repeated %s more time(s) in the previous window",
+        group.fingerprint,
+        group.exc_type,
+        repeated,
+    )
+
+
+class ErrorGroup:
+    __slots__ = (
+        "fingerprint", "exc_type", "message", "where", "last_path",
+        "count", "first_seen", "last_seen",
+        "window_started", "window_count", "suppressed",
+    )
+
+    def __init__(self, key: str, exc: BaseException, now: float, root: str = PROJECT_ROOT) -> None:
+        self.fingerprint = key
+        self.exc_type = f"{type(exc).__module__}.{type(exc).__qualname__}"
+        self.message = str(exc)[:300]
+        self.where = _where(exc, root)
+        self.last_path = ""
+        self.count = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.window_started = now
+        self.window_count = 0   # случаев в текущем окне
+        self.suppressed = 0     # из них без стека
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "exc_type": self.exc_type,
+            "message": self.message,
+            "where": self.where,
+            "last_path": self.last_path,
+            "count": self.count,
+            "first_seen": datetime.utcfromtimestamp(self.first_seen),
+            "last_seen": datetime.utcfromtimestamp(self.last_seen),
+            "suppressed_in_window": self.suppressed,
+        }
+
+
+class Occurrence(NamedTuple):
+    group: ErrorGroup
+    log_trace: bool     # писать ли полный стек
+    repeated: int       # сколько раз группа повторилась без стека в прошлом окне
+
+
+class ErrorGroups:
+    def __init__(
+        self,
+        window_seconds: float,
+        traces_per_window: int,
+        max_groups: int,
+        frames: int,
+        root: str = PROJECT_ROOT,
+    ) -> None:
+        self.window_seconds = window_seconds
+        self.traces_per_window = traces_per_window
+        self.max_groups = max_groups
+        self.frames = frames
+        self.root = root
+        self._groups: "OrderedDict[str, ErrorGroup]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, exc: BaseException, path: str = "") -> Occurrence:
+        key = fingerprint(exc, self.frames, self.root)
+        now = time.time()
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = ErrorGroup(key, exc, now, self.root)
+                if len(self._groups) > self.max_groups:
+                    self._groups.popitem(last=False)
+            else:
+                self._groups.move_to_end(key)
+
+            repeated = 0
+            if now - group.window_started >= self.window_seconds:
+                repeated = group.suppressed
+                group.window_started = now
+                group.window_count = 0
+                group.suppressed = 0
+
+            group.count += 1
+            group.window_count += 1
+            group.last_seen = now
+            group.last_path = path
+            log_trace = group.window_count <= self.traces_per_window
+            if not log_trace:
+                group.suppressed += 1
+            return Occurrence(group, log_trace, repeated)
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Закрыть истёкшие окна: по строке «повторилась N раз» на группу,
+        у которой в окне были случаи без стека. Без этого итог аварии,
+        после которой ошибок больше нет, не попал бы в лог никогда.
+        force — закрыть и неистёкшие (остановка воркера).
+        """
+        now = time.time()
+        flushed = []
+        with self._lock:
+            for group in self._groups.values():
+                if group.suppressed and (force or now - group.window_started >= self.window_seconds):
+                    flushed.append((group, group.suppressed))
+                    group.window_started = now
+                    group.window_count = 0
+                    group.suppressed = 0
+        for group, repeated in flushed:
+            log_repeated(group, repeated)
+        return len(flushed)
+
+    async def flush_forever(self) -> None:
+        """Фоновая задача воркера (lifespan в app/main.py): flush() раз в окно."""
+        while True:
+            await asyncio.sleep(self.window_seconds)
+            self.flush()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Группы, начиная с последней виденной."""
+        with self._lock:
+            return [group.as_dict() for group in reversed(self._groups.values())]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._groups.clear()
+
+
+# Один реестр на процесс
+error_groups = ErrorGroups(
+    window_seconds=settings.ERROR_WINDOW_SECONDS,
+    traces_per_window=settings.ERROR_TRACES_PER_WINDOW,
+    max_groups=settings.ERROR_GROUPS_MAX,
+    frames=settings.ERROR_FINGERPRINT_FRAMES,
+)
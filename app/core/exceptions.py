@@ -6,6 +6,10 @@ from typing import Any, Dict
 
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.error_groups import error_groups, log_repeated
+from app.core.metrics import metrics
 
 logger = logging.getLogger("cohai")
 
@@ -81,12 +85,67 @@ async def global_exception_handler(request: Request, exc: Exception) -> JSONResp
         )
 
     # 3) Любой неожиданный Exception → 500
-    logger.exception(
-        "Unhandled error on %s %s",
-        request.method,
-        request.url.path,
-    )
+    return unhandled_error_response(request, exc)
+
+
+def unhandled_error_response(request: Request, exc: Exception) -> JSONResponse:
+    """
+    Залогировать непойманную ошибку и собрать ответ 500.
+
+    Стек пишем только для первых случаев группы за окно: при аварии
+    одна и та же ошибка не заваливает error.log (см. error_groups).
+    """
+    occurrence = error_groups.record(exc, path=f"{request.method} {request.url.path}")
+    group = occurrence.group
+    metrics.inc("errors.unhandled")
+    if occurrence.repeated:
+        log_repeated(group, occurrence.repeated)
+    if occurrence.log_trace:
+        logger.exception(
+            "Unhandled error [%s] on %s %s",
+            group.fingerprint,
+            request.method,
+            request.url.path,
+        )
+    else:
+        metrics.inc("errors.suppressed_traces")
     return JSONResponse(
         status_code=500,
-        content={"detail": "Internal Server Error"},
+        content={"detail": "Internal Server Error", "error_group": group.fingerprint},
     )
+
+
+class UnhandledErrorMiddleware:
+    """
+    ASGI-middleware: непойманное исключение → 500 (unhandled_error_response),
+    дальше ошибка не пробрасывается.
+
+    Обработчик, зарегистрированный на Exception, Starlette вызывает из
+    ServerErrorMiddleware, который после ответа пробрасывает ошибку
+    серверу — и uvicorn всё равно пишет полный стек на каждый случай.
+    Эта middleware стоит внешней из наших и ловит ошибку раньше.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            response = unhandled_error_response(Request(scope), exc)
+            # ответ уже начат (ошибка посреди стрима) — только логируем
+            if not response_started:
+                await response(scope, receive, send)
@@ -6,8 +6,8 @@ import os
 from pathlib import Path
 from logging.handlers import RotatingFileHandler
 
+# Папка создаётся в setup_logging(), а не при импорте модуля
 LOG_DIR = Path("logs")
-LOG_DIR.mkdir(exist_ok=True)
 
 # Можно управлять поведением логирования через переменные окружения
 LOG_LEVEL = os.getenv("COHAI_LOG_LEVEL", "INFO").upper()
@@ -93,14 +93,25 @@ def get_logging_config() -> dict:
     return config
 
 
+_configured = False
+
+
 def setup_logging() -> logging.Logger:
     """
     Инициализация логирования:
     - app.log   — INFO и выше
     - error.log — WARNING и выше
     - консоль (если включена)
+
+    Вызывается из lifespan приложения; повторные вызовы ничего не делают.
     """
-    logging.config.dictConfig(get_logging_config())
+    global _configured
     logger = logging.getLogger("cohai")
+    if _configured:
+        return logger
+
+    LOG_DIR.mkdir(exist_ok=True)
+    logging.config.dictConfig(get_logging_config())
+    _configured = True
     logger.info("Logging initialized (level=%s)", LOG_LEVEL)
     return logger
@@ -0,0 +1,37 @@
+# app/core/metrics.py
+from __future__ import annotations
+
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Dict
+
+
+class Metrics:
+    """
+    Простейший потокобезопасный реестр счётчиков процесса.
+
+    Счётчики живут в памяти конкретного воркера; чтобы получить картину
+    по всем воркерам, их снимают через /api/v1/admin/metrics у каждого pid.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = defaultdict(int)
+
+    def inc(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {"pid": os.getpid(), "counters": counters}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+# Один реестр на процесс
+metrics = Metrics()
@@ -0,0 +1,257 @@
+# app/core/profiling.py
+from __future__ import annotations
+
+import json
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.logging import LOG_DIR
+
+logger = logging.getLogger("cohai")
+
+PROFILE_DIR = LOG_DIR / "profiles"
+
+# Имя файла профиля: только то, что генерирует write_profile()
+PROFILE_NAME_RE = re.compile(r"^[\w.\-]+\.(collapsed\.txt|speedscope\.json)$")
+
+# Кадр стека: (файл, функция, строка определения функции)
+Frame = Tuple[str, str, int]
+
+# Листовые кадры «спящих» потоков: пул воркеров ждёт задач, event loop — сокеты
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+
+
+class SamplingProfiler:
+    """
+    Статистический профайлер: фоновый поток раз в `interval` секунд
+    снимает стеки всех занятых потоков процесса (sys._current_frames).
+
+    Синхронные эндпоинты FastAPI выполняются в пуле потоков, поэтому
+    семплируем не только текущий поток, а все, кроме простаивающих.
+    Какому запросу принадлежит стек, по потоку не понять (event loop
+    общий, поток пула — любой), поэтому profile_requests профилирует
+    запрос, только когда он в воркере единственный. Фоновые потоки
+    (outbox, планировщик задач) в профиль всё же могут попасть.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.duration = 0.0
+        # запросы, начатые во время профилирования: их стеки тоже в профиле
+        self.overlapping = 0
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="cohai-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self.samples
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = _extract_stack(frame)
+                if stack and (Path(stack[-1][0]).name, stack[-1][1]) not in _IDLE_LEAVES:
+                    self.samples[stack] += 1
+
+
+def _extract_stack(frame) -> Tuple[Frame, ...]:
+    stack: List[Frame] = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()  # от корня к листу
+    return tuple(stack)
+
+
+def _frame_label(frame: Frame) -> str:
+    filename, name, line = frame
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def to_collapsed(samples: Counter) -> str:
+    """Формат collapsed stacks (flamegraph.pl, speedscope, inferno)."""
+    lines = [
+        ";".join(_frame_label(f) for f in stack) + f" {count}"
+        for stack, count in samples.most_common()
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def to_speedscope(samples: Counter, name: str, interval: float) -> Dict:
+    """Формат speedscope (https://www.speedscope.app/file-format-schema.json)."""
+    frame_index: Dict[Frame, int] = {}
+    frames: List[Dict] = []
+    indexed_samples: List[List[int]] = []
+    weights: List[float] = []
+
+    for stack, count in samples.items():
+        indexes = []
+        for frame in stack:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({"name": frame[1], "file": frame[0], "line": frame[2]})
+            indexes.append(frame_index[frame])
+        indexed_samples.append(indexes)
+        weights.append(count * interval * 1000)
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "cohai-profiler",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": indexed_samples,
+                "weights": weights,
+            }
+        ],
+    }
+
+
+def write_profile(request: Request, profiler: SamplingProfiler) -> str:
+    """
+    Сохранить профиль запроса в logs/profiles/ в двух форматах
+    и удалить самые старые файлы сверх PROFILE_KEEP.
+
+    Returns:
+        id профиля (общий префикс имён файлов).
+    """
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+
+    slug = re.sub(r"[^\w]+", "_", request.url.path).strip("_") or "root"
+    profile_id = f"{datetime.now():%Y%m%d-%H%M%S-%f}_{request.method}_{slug}"
+    title = f"{request.method} {request.url.path} ({profiler.duration * 1000:.1f} ms)"
+    if profiler.overlapping:
+        title += f", {profiler.overlapping} concurrent request(s)"
+
+    (PROFILE_DIR / f"{profile_id}.collapsed.txt").write_text(
+        to_collapsed(profiler.samples), encoding="utf-8"
+    )
+    (PROFILE_DIR / f"{profile_id}.speedscope.json").write_text(
+        json.dumps(to_speedscope(profiler.samples, title, profiler.interval)), encoding="utf-8"
+    )
+
+    files = sorted(PROFILE_DIR.glob("*.collapsed.txt"), key=lambda p: p.stat().st_mtime)
+    for old in files[: max(0, len(files) - settings.PROFILE_KEEP)]:
+        old.unlink(missing_ok=True)
+        old.with_name(old.name.replace(".collapsed.txt", ".speedscope.json")).unlink(missing_ok=True)
+
+    return profile_id
+
+
+def list_profiles() -> List[Dict]:
+    """Сохранённые профили, самые свежие первыми."""
+    if not PROFILE_DIR.exists():
+        return []
+    result = []
+    for path in PROFILE_DIR.iterdir():
+        if PROFILE_NAME_RE.match(path.name):
+            stat = path.stat()
+            result.append({
+                "name": path.name,
+                "size": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds"),
+            })
+    result.sort(key=lambda item: item["created_at"], reverse=True)
+    return result
+
+
+def should_profile(request: Request) -> bool:
+    token = settings.PROFILE_TOKEN
+    if token and request.headers.get(settings.PROFILE_HEADER) == token:
+        return True
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+# Запросы воркера в обработке и идущее профилирование. Меняются только
+# из middleware на event loop — блокировка не нужна.
+_in_flight = 0
+_active: Optional[SamplingProfiler] = None
+
+
+async def profile_requests(request: Request, call_next):
+    """
+    HTTP-middleware: профилирует запрос, если пришёл админский заголовок
+    (PROFILE_HEADER: PROFILE_TOKEN) или запрос попал в выборку
+    PROFILE_SAMPLE_RATE. Id профиля возвращается в заголовке X-Profile-Id.
+
+    Профайлер видит стеки всех потоков процесса, поэтому, пока в воркере
+    обрабатываются другие запросы, профилирование не запускается
+    (заголовок X-Profile-Skipped: busy).
+    """
+    global _in_flight, _active
+    busy = _in_flight > 0
+    _in_flight += 1
+    try:
+        if not should_profile(request):
+            if _active is not None:
+                _active.overlapping += 1
+            return await call_next(request)
+        if busy:
+            response = await call_next(request)
+            response.headers["X-Profile-Skipped"] = "busy"
+            return response
+
+        profiler = _active = SamplingProfiler(settings.PROFILE_INTERVAL_MS / 1000)
+        profiler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            profiler.stop()
+            _active = None
+    finally:
+        _in_flight -= 1
+
+    try:
+        # запись файлов и чистка старых — в пуле потоков, не на event loop
+        profile_id = await run_in_threadpool(write_profile, request, profiler)
+    except OSError:
+        logger.exception("Failed to save profile for %s %s", request.method, request.url.path)
+        return response
+
+    response.headers["X-Profile-Id"] = profile_id
+    logger.info(
+        "Profiled %s %s: %d samples, %d concurrent request(s) -> %s",
+        request.method,
+        request.url.path,
+        sum(profiler.samples.values()),
+        profiler.overlapping,
+        profile_id,
+    )
+    return response
@@ -0,0 +1,318 @@
+# app/core/rate_limit.py
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Protocol, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class RateLimitBackend(Protocol):
+    """
+    Хранилище token bucket-ов.
+
+    take() пытается забрать один токен из ведра `key` и возвращает
+    0.0, если запрос разрешён, иначе — сколько секунд подождать.
+    """
+
+    # True — take() может ждать блокировку (I/O), его нельзя звать на event loop
+    blocking: bool
+
+    def take(self, key: str, capacity: float, refill_per_sec: float, now: float) -> float: ...
+
+    def reset(self) -> None: ...
+
+
+class MemoryBackend:
+    """
+    Ведра в памяти процесса: key → (tokens, updated_at, full_at).
+
+    Ведро, которое успело снова наполниться, ничем не отличается от
+    отсутствующего, поэтому периодически выкидываем такие ключи —
+    память растёт с числом активных клиентов, а не со всеми когда-либо
+    виденными IP/телефонами.
+    """
+
+    blocking = False
+
+    def __init__(self, sweep_every: float = 60.0) -> None:
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+        self._sweep_every = sweep_every
+        self._next_sweep = 0.0
+
+    def take(self, key: str, capacity: float, refill_per_sec: float, now: float) -> float:
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+            entry = self._buckets.get(key)
+            if entry is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, entry[0] + (now - entry[1]) * refill_per_sec)
+
+            # full_at — момент, когда ведро снова будет полным (для sweep)
+            if tokens >= 1:
+                tokens -= 1
+                self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill_per_sec)
+                return 0.0
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill_per_sec)
+            return (1 - tokens) / refill_per_sec
+
+    def _sweep(self, now: float) -> None:
+        expired = [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]
+        for key in expired:
+            del self._buckets[key]
+        self._next_sweep = now + self._sweep_every
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class SqliteBackend:
+    """
+    Общие для всех воркеров ведра в отдельном SQLite-файле.
+
+    Локальная замена Redis для нескольких uvicorn-воркеров на одной машине:
+    каждая операция — короткая транзакция BEGIN IMMEDIATE, которая при
+    конкуренции воркеров ждёт блокировку файла до 5 секунд.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, sweep_every: float = 60.0) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._sweep_every = sweep_every
+        self._next_sweep = 0.0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_buckets ("
+                " key TEXT PRIMARY KEY, tokens REAL NOT NULL,"
+                " updated_at REAL NOT NULL, full_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, capacity: float, refill_per_sec: float, now: float) -> float:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * refill_per_sec)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?)",
+                (key, tokens, now, now + (capacity - tokens) / refill_per_sec),
+            )
+            # редкая уборка наполнившихся ведер
+            if now >= self._next_sweep:
+                conn.execute("DELETE FROM rate_buckets WHERE full_at <= ?", (now,))
+                self._next_sweep = now + self._sweep_every
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return 0.0 if allowed else (1 - tokens) / refill_per_sec
+
+    def reset(self) -> None:
+        self._connect().execute("DELETE FROM rate_buckets")
+
+
+def build_backend(spec: str) -> RateLimitBackend:
+    """"memory" или "sqlite:<path>" (общий файл для всех воркеров)."""
+    kind, _, arg = spec.partition(":")
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        return SqliteBackend(arg or "logs/ratelimit.db")
+    raise ValueError(f"Unknown rate limit backend: {spec!r}")
+
+
+def normalize_phone(raw: str) -> str:
+    return re.sub(r"\D", "", raw)
+
+
+class RateLimiter:
+    """Два уровня ведер для записи лида: по IP клиента и по телефону."""
+
+    def __init__(self, backend: RateLimitBackend) -> None:
+        self.backend = backend
+
+    def check(self, ip: str, phone: Optional[str]) -> float:
+        """0.0 — можно, иначе Retry-After в секундах."""
+        now = time.time()
+        retry_after = self.backend.take(
+            f"ip:{ip}",
+            settings.RATE_LIMIT_IP_CAPACITY,
+            settings.RATE_LIMIT_IP_PER_MINUTE / 60,
+            now,
+        )
+        if retry_after:
+            metrics.inc("rate_limit.ip_rejected")
+            return retry_after
+
+        if phone:
+            retry_after = self.backend.take(
+                f"phone:{phone}",
+                settings.RATE_LIMIT_PHONE_CAPACITY,
+                settings.RATE_LIMIT_PHONE_PER_HOUR / 3600,
+                now,
+            )
+            if retry_after:
+                metrics.inc("rate_limit.phone_rejected")
+        return retry_after
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(build_backend(settings.RATE_LIMIT_BACKEND))
+    return _limiter
+
+
+def _client_ip(scope) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _declared_length(scope) -> int:
+    for name, value in scope.get("headers", []):
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return 0
+    return 0
+
+
+def _extract_phone(body: bytes) -> Optional[str]:
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    phone = data.get("phone") if isinstance(data, dict) else None
+    return normalize_phone(phone) if isinstance(phone, str) and phone else None
+
+
+class RateLimitMiddleware:
+    """
+    ASGI-middleware: ограничивает пишущие публичные эндпоинты
+    (settings.RATE_LIMIT_PATHS) ещё ДО роутинга и открытия сессии БД.
+
+    Тело запроса читаем сами (нужен телефон) и затем «проигрываем»
+    его приложению заново.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["method"] != "POST"
+            or scope["path"] not in settings.RATE_LIMIT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.RATE_LIMIT_MAX_BODY_BYTES
+        if _declared_length(scope) > limit:
+            await self._respond(send, 413, "Request body too large.", "PAYLOAD_TOO_LARGE")
+            return
+
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > limit:
+                # chunked-тело без Content-Length: дальше не буферизуем
+                await self._respond(send, 413, "Request body too large.", "PAYLOAD_TOO_LARGE")
+                return
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        limiter = get_rate_limiter()
+        args = (_client_ip(scope), _extract_phone(body))
+        if limiter.backend.blocking:
+            # ожидание блокировки SQLite не должно останавливать весь воркер
+            retry_after = await run_in_threadpool(limiter.check, *args)
+        else:
+            retry_after = limiter.check(*args)
+        if retry_after:
+            await self._reject(send, retry_after)
+            return
+
+        replayed = False
+
+        async def replay_receive():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay_receive, send)
+
+    @classmethod
+    async def _reject(cls, send, retry_after: float) -> None:
+        await cls._respond(
+            send,
+            429,
+            "Too many requests, please try again later.",
+            "RATE_LIMITED",
+            [(b"retry-after", str(max(1, int(retry_after + 0.999))).encode())],
+        )
+
+    @staticmethod
+    async def _respond(send, status: int, detail: str, code: str, headers=()) -> None:
+        payload = json.dumps({"detail": detail, "code": code}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode()),
+                *headers,
+            ],
+        })
+        await send({"type": "http.response.body", "body": payload})
@@ -0,0 +1,119 @@
+# app/core/warmup.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger("cohai")
+
+
+class WarmupState:
+    """
+    Состояние прогрева приложения после старта.
+
+    ready       – прогрев завершён, можно принимать трафик (/ready → 200)
+    error       – текст ошибки, если прогрев упал
+    duration_ms – сколько занял прогрев
+    stats       – что именно прогрели (кол-во локаций, занятий и т.п.)
+    """
+
+    def __init__(self) -> None:
+        self.ready: bool = False
+        self.error: Optional[str] = None
+        self.duration_ms: Optional[float] = None
+        self.stats: Dict[str, Any] = {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        if self.ready:
+            status = "ready"
+        elif self.error is not None:
+            status = "failed"
+        else:
+            status = "warming"
+        payload: Dict[str, Any] = {"status": status, "stats": self.stats}
+        if self.duration_ms is not None:
+            payload["duration_ms"] = self.duration_ms
+        if self.error is not None:
+            payload["error"] = self.error
+        return payload
+
+
+# Один объект состояния на процесс (воркер)
+warmup_state = WarmupState()
+
+
+def warm_up() -> Dict[str, Any]:
+    """
+    Синхронный прогрев (выполняется в отдельном потоке):
+
+    1. configure_mappers() — чтобы первый запрос не платил за конфигурацию ORM;
+    2. открываем DB_POOL_MIN_CONNECTIONS соединений и возвращаем их в пул;
+    3. вытягиваем каталог (локации, программы, тарифы) и расписание
+       по каждой локации — прогреваем кэши БД и ленивые структуры ORM;
+    4. строим индекс ближайших студий и снимки справочников и расписания
+       в памяти (расписание — попутно с п. 3).
+    """
+    from sqlalchemy.orm import configure_mappers
+
+    import app.models  # noqa: F401  — регистрируем все мапперы
+    from app.db.session import get_engine, get_sessionmaker
+    from app.repositories.location_repo import LocationRepository
+    from app.repositories.program_type_repo import ProgramTypeRepository
+    from app.services.location_index import get_location_index
+    from app.services.membership_service import MembershipService
+    from app.services.reference_cache import get_reference_data
+    from app.services.schedule_service import ScheduleService
+
+    configure_mappers()
+
+    engine = get_engine()
+    connections = [engine.connect() for _ in range(settings.DB_POOL_MIN_CONNECTIONS)]
+    try:
+        for conn in connections:
+            conn.exec_driver_sql("SELECT 1")
+    finally:
+        for conn in connections:
+            conn.close()  # соединение остаётся открытым в пуле
+
+    stats: Dict[str, Any] = {"pool_connections": len(connections)}
+    with get_sessionmaker()() as db:
+        locations = LocationRepository(db).list_all()
+        stats["locations"] = len(locations)
+        stats["program_types"] = len(ProgramTypeRepository(db).list_all())
+        stats["located_locations"] = len(get_location_index(db).tree)
+        stats["trainers"] = len(get_reference_data(db).trainers)
+
+        membership_service = MembershipService(db)
+        schedule_service = ScheduleService(db)
+        stats["memberships"] = len(membership_service.list_all(only_active=True))
+
+        sessions = 0
+        for location in locations:
+            membership_service.list_all(location_id=location.id, only_active=True)
+            sessions += len(schedule_service.get_schedule_for_location(location.id))
+        stats["class_sessions"] = sessions
+
+    return stats
+
+
+async def run_warmup(state: WarmupState = warmup_state) -> None:
+    """
+    Асинхронная обёртка для lifespan: гоняет warm_up() в потоке,
+    чтобы liveness (`/`) отвечал, пока идёт прогрев.
+    """
+    started = time.perf_counter()
+    try:
+        state.stats = await asyncio.to_thread(warm_up)
+    except Exception as exc:  # прогрев не должен валить процесс
+        state.error = repr(exc)
+        logger.exception("Warm-up failed")
+        return
+    finally:
+        state.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    state.ready = True
+    logger.info("Warm-up finished in %.1f ms: %s", state.duration_ms, state.stats)
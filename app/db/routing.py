@@ -0,0 +1,113 @@
+# app/db/routing.py
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db import session as db_session
+
+logger = logging.getLogger("cohai")
+
+
+class ReplicaRouter:
+    """
+    Маршрутизация чтений по репликам.
+
+    - round-robin по здоровым репликам;
+    - реплика, к которой не удалось подключиться, выключается
+      на REPLICA_RETRY_SECONDS, затем снова пробуется;
+    - если здоровых реплик нет — читаем с primary.
+    """
+
+    def __init__(self, urls: List[str], retry_seconds: float) -> None:
+        self.urls = list(urls)
+        self.retry_seconds = retry_seconds
+        self._factories: Dict[str, sessionmaker] = {}
+        self._down_until: Dict[str, float] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _factory(self, url: str) -> sessionmaker:
+        with self._lock:
+            factory = self._factories.get(url)
+            if factory is None:
+                # pool_pre_ping: мёртвое соединение заметим при checkout,
+                # а не посреди запроса
+                engine = db_session.instrument_engine(
+                    create_engine(url, future=True, pool_pre_ping=True)
+                )
+                factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+                self._factories[url] = factory
+            return factory
+
+    def candidates(self) -> List[str]:
+        """Здоровые реплики, начиная со следующей по кругу."""
+        if not self.urls:
+            return []
+        now = time.monotonic()
+        start = next(self._counter) % len(self.urls)
+        ordered = self.urls[start:] + self.urls[:start]
+        return [url for url in ordered if self._down_until.get(url, 0.0) <= now]
+
+    def mark_down(self, url: str) -> None:
+        self._down_until[url] = time.monotonic() + self.retry_seconds
+        logger.warning("Replica %s marked down for %.0fs", url, self.retry_seconds)
+
+    def open_session(self) -> Optional[Session]:
+        """Сессия на первой живой реплике или None (→ читать с primary)."""
+        for url in self.candidates():
+            db = self._factory(url)()
+            try:
+                db.connection()  # реальный checkout + pre-ping
+            except DBAPIError:
+                db.close()
+                self.mark_down(url)
+                continue
+            db.info["replica"] = url
+            return db
+        return None
+
+    def dispose(self) -> None:
+        with self._lock:
+            for factory in self._factories.values():
+                factory.kw["bind"].dispose()
+            self._factories.clear()
+
+
+_router: Optional[ReplicaRouter] = None
+
+
+def get_replica_router() -> ReplicaRouter:
+    global _router
+    if _router is None:
+        _router = ReplicaRouter(db_session.REPLICA_DATABASE_URLS, settings.REPLICA_RETRY_SECONDS)
+    return _router
+
+
+def dispose_replicas() -> None:
+    global _router
+    if _router is not None:
+        _router.dispose()
+    _router = None
+
+
+def open_read_session(sticky: bool = False) -> Session:
+    """
+    Сессия только для чтения.
+
+    sticky=True — клиент недавно писал (read-your-writes): читаем с primary,
+    чтобы не увидеть реплику, которая ещё не догнала запись.
+    """
+    if not sticky:
+        db = get_replica_router().open_session()
+        if db is not None:
+            return db
+    return db_session.get_sessionmaker()()
@@ -0,0 +1,35 @@
+# app/db/schema.py
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.db.base import Base
+
+logger = logging.getLogger("cohai")
+
+
+def ensure_schema(target: Engine) -> None:
+    """
+    Создать недостающие таблицы и nullable-колонки (без дропа и без миграции данных).
+
+    Пока в проекте нет Alembic, этого хватает, чтобы новые таблицы
+    (outbox и т.п.) и новые необязательные поля появлялись в уже
+    существующей БД при старте.
+    """
+    import app.models  # noqa: F401  — регистрируем все модели в Base.metadata
+
+    Base.metadata.create_all(bind=target)
+
+    inspector = inspect(target)
+    with target.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=target.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+                logger.info("Schema: added column %s.%s", table.name, column.name)
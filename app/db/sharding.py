@@ -0,0 +1,181 @@
+# app/db/sharding.py
+"""
+Шардирование по локациям: у каждого города — своя БД.
+
+- шарды задаются COHAI_SHARDS ("balti=sqlite:///./cohai_balti.db,...");
+  ключ шарда — это ключ города (заголовок X-Cohai-City);
+- диапазоны location_id → шард задаются COHAI_SHARD_LOCATION_RANGES
+  ("1000-1999=balti,2000-2999=cahul");
+- всё, что не попало ни в один диапазон, живёт в primary (DATABASE_URL).
+  Без настроек есть только primary — поведение как до шардирования.
+
+Что где лежит:
+- данные локации (membership_plans, class_sessions, leads,
+  lead_daily_stats, schedule_versions) — в шарде её location_id;
+- справочники (locations, program_types, trainers) — копия в каждом шарде
+  (app/tools/split_shards.py); пишутся только в primary, откуда
+  CatalogService сразу копирует запись во все шарды.
+"""
+
+from __future__ import annotations
+
+import heapq
+import threading
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db import session as db_session
+
+PRIMARY_SHARD = "primary"
+
+LocationRange = Tuple[int, int, str]
+T = TypeVar("T")
+
+
+def parse_shard_urls(spec: str) -> Dict[str, str]:
+    """"balti=sqlite:///...,cahul=postgresql://..." → {"balti": url, ...}."""
+    urls: Dict[str, str] = {}
+    for part in filter(None, (chunk.strip() for chunk in spec.split(","))):
+        key, sep, url = part.partition("=")
+        key = key.strip().lower()
+        if not sep or not key or not url.strip() or key == PRIMARY_SHARD:
+            raise ValueError(f"Invalid shard definition: {part!r}")
+        urls[key] = url.strip()
+    return urls
+
+
+def parse_location_ranges(spec: str) -> List[LocationRange]:
+    """"1000-1999=balti,2000-2999=cahul" → [(1000, 1999, "balti"), ...]."""
+    ranges: List[LocationRange] = []
+    for part in filter(None, (chunk.strip() for chunk in spec.split(","))):
+        bounds, sep, key = part.partition("=")
+        first, dash, last = bounds.partition("-")
+        try:
+            lo, hi = int(first), int(last if dash else first)
+        except ValueError:
+            raise ValueError(f"Invalid location range: {part!r}") from None
+        if not sep or lo > hi:
+            raise ValueError(f"Invalid location range: {part!r}")
+        ranges.append((lo, hi, key.strip().lower()))
+    return sorted(ranges)
+
+
+class ShardRouter:
+    """
+    location_id / ключ города → шард → фабрика сессий.
+
+    Движки шардов создаются лениво; primary — это движок из app.db.session.
+    """
+
+    def __init__(self, urls: Dict[str, str], ranges: Sequence[LocationRange]) -> None:
+        self.urls = dict(urls)
+        self.ranges = sorted(ranges)
+        for (lo, hi, key), following in zip(self.ranges, self.ranges[1:] + [None]):
+            if key != PRIMARY_SHARD and key not in self.urls:
+                raise ValueError(f"Location range {lo}-{hi} points to unknown shard {key!r}")
+            if following is not None and following[0] <= hi:
+                raise ValueError(f"Location ranges {lo}-{hi} and {following[0]}-{following[1]} overlap")
+        self._starts = [lo for lo, _, _ in self.ranges]
+        self._factories: Dict[str, sessionmaker] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def sharded(self) -> bool:
+        return bool(self.urls)
+
+    def keys(self) -> List[str]:
+        return [PRIMARY_SHARD, *self.urls]
+
+    def has_shard(self, key: str) -> bool:
+        return key == PRIMARY_SHARD or key in self.urls
+
+    def shard_for_location(self, location_id: Optional[int]) -> str:
+        if location_id is None:
+            return PRIMARY_SHARD
+        i = bisect_right(self._starts, location_id) - 1
+        if i >= 0 and location_id <= self.ranges[i][1]:
+            return self.ranges[i][2]
+        return PRIMARY_SHARD
+
+    def location_ranges(self, key: str) -> List[Tuple[int, int]]:
+        """Диапазоны location_id, явно отданные шарду."""
+        return [(lo, hi) for lo, hi, shard in self.ranges if shard == key]
+
+    def sessionmaker(self, key: str) -> sessionmaker:
+        if key == PRIMARY_SHARD:
+            return db_session.get_sessionmaker()
+        with self._lock:
+            factory = self._factories.get(key)
+            if factory is None:
+                engine = db_session.instrument_engine(
+                    create_engine(self.urls[key], future=True, pool_pre_ping=True)
+                )
+                factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+                self._factories[key] = factory
+            return factory
+
+    def engine(self, key: str) -> Engine:
+        return self.sessionmaker(key).kw["bind"]
+
+    def dispose(self) -> None:
+        with self._lock:
+            for factory in self._factories.values():
+                factory.kw["bind"].dispose()
+            self._factories.clear()
+
+
+_router: Optional[ShardRouter] = None
+
+
+def get_shard_router() -> ShardRouter:
+    global _router
+    if _router is None:
+        _router = ShardRouter(
+            parse_shard_urls(db_session.SHARD_DATABASE_URLS),
+            parse_location_ranges(db_session.SHARD_LOCATION_RANGES),
+        )
+    return _router
+
+
+def dispose_shards() -> None:
+    global _router
+    if _router is not None:
+        _router.dispose()
+    _router = None
+
+
+def open_shard_session(key: str) -> Session:
+    return get_shard_router().sessionmaker(key)()
+
+
+def fan_out(
+    fetch: Callable[[Session], Sequence[T]],
+    sort_key: Callable[[T], Any],
+    reverse: bool = False,
+) -> List[T]:
+    """
+    Выполнить fetch на каждом шарде (параллельно) и слить результаты.
+
+    fetch должен возвращать строки, уже отсортированные по sort_key
+    (в том же направлении) — слияние идёт за один проход, без пересортировки.
+    """
+    router = get_shard_router()
+
+    def run(key: str) -> List[T]:
+        db = router.sessionmaker(key)()
+        try:
+            return list(fetch(db))
+        finally:
+            db.close()
+
+    keys = router.keys()
+    if len(keys) == 1:
+        return run(keys[0])
+    with ThreadPoolExecutor(max_workers=len(keys), thread_name_prefix="shard-fan-out") as pool:
+        results = list(pool.map(run, keys))
+    return list(heapq.merge(*results, key=sort_key, reverse=reverse))
@@ -0,0 +1,20 @@
+# app/db/upsert.py
+from __future__ import annotations
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+
+def insert_for(bind: Session | Connection | Engine):
+    """
+    `insert` с поддержкой ON CONFLICT … DO UPDATE для текущего диалекта.
+
+    Проект работает на SQLite (dev) и Postgres (prod), у обоих одинаковый
+    API upsert-а в SQLAlchemy — различается только модуль диалекта.
+    """
+    dialect = bind.get_bind().dialect if isinstance(bind, Session) else bind.dialect
+    if dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
@@ -1,24 +1,112 @@
 # app/main.py
 
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.core.config import settings
-from app.core.logging import setup_logging
-from app.core.exceptions import global_exception_handler
-from app.api.v1.public import router as public_router
-from app.api.v1 import public, admin_leads
-from app.db.base import Base  # пригодится для Alembic / init схемы
-from app.db.session import engine
+from app.core.error_groups import error_groups
+from app.core.exceptions import AppError, UnhandledErrorMiddleware, global_exception_handler
+from app.core.profiling import profile_requests
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.warmup import run_warmup, warmup_state
+from app.services.cache_bus import cache_bus, check_caches
+from app.services.job_scheduler import job_scheduler
+from app.api.v1 import public, admin_leads, admin_metrics, admin_profiles, admin_analytics, admin_occupancy, admin_catalog, admin_schedule
+
+logger = logging.getLogger("cohai")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Жизненный цикл приложения.
+
+    Всё, что имеет побочные эффекты (папка logs, dictConfig, engine БД),
+    инициализируется здесь, а не при импорте модуля: так `import app.main`
+    остаётся дешёвым, а холодный старт контейнера — предсказуемым.
+    """
+    from app.core.logging import setup_logging
+    from app.db.routing import dispose_replicas
+    from app.db.schema import ensure_schema
+    from app.db.sharding import PRIMARY_SHARD, dispose_shards, get_shard_router
+    from app.db.session import dispose_engine, get_engine
+
+    setup_logging()
+    ensure_schema(get_engine())
+    shards = get_shard_router()
+    for key in shards.keys():
+        if key != PRIMARY_SHARD:
+            ensure_schema(shards.engine(key))
+    # базовая линия версий таблиц — до прогрева, который наполняет кэши
+    # (по соединению на шард: справочники копируются в шарды, расписание пишется туда)
+    cache_bus.start({key: shards.engine(key) for key in shards.keys()}, settings.CACHE_BUS_SOCKET_DIR)
+
+    # Прогрев идёт в фоне: `/` (liveness) отвечает сразу,
+    # `/ready` (readiness) — только после окончания прогрева.
+    warmup_task = None
+    if settings.WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(run_warmup())
+    else:
+        warmup_state.ready = True
+
+    # Доставка outbox-уведомлений (лиды → админам) в фоне
+    # (по диспетчеру на шард: outbox лежит в БД шарда лида)
+    outbox_tasks = []
+    if settings.OUTBOX_DISPATCHER_ENABLED:
+        from app.services.outbox_dispatcher import build_shard_dispatchers
+
+        outbox_tasks = [
+            asyncio.create_task(dispatcher.run_forever()) for dispatcher in build_shard_dispatchers()
+        ]
+
+    # Периодические задачи обслуживания: слот каждой выполняет один воркер
+    if settings.JOBS_ENABLED:
+        from app.services.job_scheduler import register_default_jobs
+
+        register_default_jobs(job_scheduler)
+        job_scheduler.start()
+
+    # Итоги «повторилась N раз» по группам ошибок — и после конца аварии
+    # (у каждого воркера свои группы, поэтому задача своя, а не job_scheduler)
+    error_flush_task = asyncio.create_task(error_groups.flush_forever())
+    logger.info("Application startup complete")
+
+    yield
+
+    logger.info("Application shutdown")
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    for task in (*outbox_tasks, error_flush_task):
+        task.cancel()
+    await asyncio.gather(*outbox_tasks, error_flush_task, return_exceptions=True)
+    error_groups.flush(force=True)
+    await job_scheduler.stop()
+    from app.services.schedule_changes import schedule_changes
+
+    await schedule_changes.stop()
+    cache_bus.stop()
+    dispose_replicas()
+    dispose_shards()
+    dispose_engine()
 
-# Инициализируем логирование ПЕРЕД созданием приложения
-logger = setup_logging()
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
+    lifespan=lifespan,
 )
 
+# --- Rate limiting заявок (429 до обращения к БД) ---
+
+# Добавляем раньше CORS: последний добавленный middleware — внешний,
+# так что и ответы 429 получат CORS-заголовки.
+app.add_middleware(RateLimitMiddleware)
+
 # --- CORS ---
 
 app.add_middleware(
@@ -29,20 +117,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Профилирование (opt-in: админский заголовок или выборка из Settings) ---
+
+app.middleware("http")(profile_requests)
+
+# --- Согласованность кэшей между воркерами (сверка версий таблиц) ---
+
+app.middleware("http")(check_caches)
+
+# --- Непойманные ошибки → 500 (внешняя из наших middleware, см. UnhandledErrorMiddleware) ---
+
+app.add_middleware(UnhandledErrorMiddleware)
+
 # --- Роуты v1 ---
 
 # Публичные эндпоинты
 app.include_router(public.router, prefix="/api/v1")
 
 # Админские эндпоинты по лидам
-app.include_router(admin_leads.router, prefix="/api/v1/admin/leads")
+app.include_router(admin_leads.router, prefix="/api/v1")
+
+# Аналитика воронки лидов (из роллапа)
+app.include_router(admin_analytics.router, prefix="/api/v1")
+
+# Загрузка занятий: тепловые карты по дням недели и часам
+app.include_router(admin_occupancy.router, prefix="/api/v1")
+
+# Справочники: локации, типы программ, тренеры
+app.include_router(admin_catalog.router, prefix="/api/v1")
+
+# Расписание: CRUD занятий и импорт сезона из CSV
+app.include_router(admin_schedule.router, prefix="/api/v1")
 
-logger.info("Application startup: loading routes")
+# Служебные счётчики воркера (блокировки БД и т.п.)
+app.include_router(admin_metrics.router, prefix="/api/v1")
+
+# Сохранённые профили запросов
+app.include_router(admin_profiles.router, prefix="/api/v1")
 
 # --- Глобальный обработчик ошибок ---
 
-# Один раз регистрируем глобальный обработчик на все непойманные Exception
-app.add_exception_handler(Exception, global_exception_handler)
+# Бизнес-ошибки AppError; прочие непойманные Exception превращает в 500
+# UnhandledErrorMiddleware (обработчик на Exception сработал бы только в
+# ServerErrorMiddleware, который после ответа пробрасывает ошибку серверу).
+app.add_exception_handler(AppError, global_exception_handler)
 
 
 # --- Корневой эндпоинт (health / meta) ---
@@ -60,4 +178,18 @@ def root():
         "version": settings.APP_VERSION,
         "docs": "/docs",
         "redoc": "/redoc",
-    }
\ No newline at end of file
+    }
+
+
+@app.get("/ready", tags=["meta"])
+def ready():
+    """
+    Readiness-probe.
+
+    В отличие от `/` (liveness) отвечает 200 только после того,
+    как lifespan прогрел мапперы, пул соединений и каталог/расписание.
+    До этого — 503, чтобы балансировщик не слал сюда трафик.
+    """
+    payload = warmup_state.as_dict()
+    status_code = 200 if warmup_state.ready else 503
+    return JSONResponse(status_code=status_code, content=payload)
@@ -4,6 +4,11 @@ from .program_type import ProgramType
 from .membership import MembershipPlan
 from .class_session import ClassSession
 from .lead import Lead
+from .lead_stats import LeadDailyStat
+from .outbox import OutboxMessage
+from .schedule_version import ScheduleVersion
+from .table_version import TableVersion
+from .job_lease import JobLease
 
 __all__ = [
     "Location",
@@ -12,4 +17,9 @@ __all__ = [
     "MembershipPlan",
     "ClassSession",
     "Lead",
+    "LeadDailyStat",
+    "OutboxMessage",
+    "ScheduleVersion",
+    "TableVersion",
+    "JobLease",
 ]
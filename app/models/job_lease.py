@@ -0,0 +1,37 @@
+# app/models/job_lease.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class JobLease(Base):
+    """
+    Аренда периодической задачи (app/services/job_scheduler.py).
+
+    Одна строка на задачу: кто её сейчас выполняет (holder), до какого
+    момента аренда действует и какой запуск по расписанию (slot_at) уже
+    взят — так каждый слот выполняет ровно один воркер во всём деплое.
+    """
+
+    __tablename__ = "job_leases"
+
+    job_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(128), nullable=False)
+    slot_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    # итог последнего запуска — для админки
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    duration_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    status: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+
+
+__all__ = ["JobLease"]
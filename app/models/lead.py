@@ -25,3 +25,5 @@ class Lead(Base):
 
     is_processed: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # когда администратор обработал лид (для метрики time-to-process)
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
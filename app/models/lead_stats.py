@@ -0,0 +1,43 @@
+# app/models/lead_stats.py
+from __future__ import annotations
+
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Date, Float, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class LeadDailyStat(Base):
+    """
+    Роллап воронки лидов: день × локация × тип программы.
+
+    Обновляется инкрементально вместе с записью лида
+    (app/repositories/lead_stats_repo.py), пересобирается
+    app/tools/backfill_lead_stats.py. Лиды без локации/программы
+    попадают в строку с id = 0.
+
+    processed_* относятся к дню СОЗДАНИЯ лида (когортный взгляд):
+    processed_count / leads_count — доля обработанных лидов этого дня.
+    Дни — по UTC, как и Lead.created_at.
+    """
+
+    __tablename__ = "lead_daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    location_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    program_type_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    leads_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    processed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # сумма (processed_at - created_at) в секундах по обработанным лидам
+    process_seconds_total: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    # сколько из обработанных имеют processed_at (знаменатель среднего времени;
+    # у старых лидов его нет). NULL — строка из БД до появления колонки,
+    # считаем как processed_count, пока роллап не пересоберут
+    timed_processed_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, default=0)
+
+
+__all__ = ["LeadDailyStat"]
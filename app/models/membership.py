@@ -28,6 +28,9 @@ class MembershipPlan(Base):
         default=30,
     )
 
+    # лимит посещений за срок абонемента; None — безлимит
+    visits_limit: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
     # активен ли тариф
     is_active: Mapped[bool] = mapped_column(
         Boolean,
@@ -0,0 +1,47 @@
+# app/models/outbox.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class OutboxMessage(Base):
+    """
+    Transactional outbox: событие пишется в той же транзакции,
+    что и бизнес-данные (например, лид), а доставляет его фоновый
+    диспетчер (app/services/outbox_dispatcher.py).
+    """
+
+    __tablename__ = "outbox_messages"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+
+    # тип события, например "lead.created"
+    topic: Mapped[str] = mapped_column(String(100), nullable=False)
+    # JSON с данными события
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    # не раньше этого момента пробуем доставить (backoff / аренда диспетчером)
+    available_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+
+    # какой диспетчер сейчас держит сообщение (случайный токен пачки)
+    claimed_by: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+
+    # доставлено; NULL — ещё в очереди
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_outbox_pending", "sent_at", "available_at"),
+    )
+
+
+__all__ = ["OutboxMessage"]
@@ -0,0 +1,29 @@
+# app/models/schedule_version.py
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ScheduleVersion(Base):
+    """
+    Версия расписания локации: растёт в той же транзакции, что и любая
+    запись ClassSession этой локации (app/services/schedule_versions.py).
+
+    Клиенты сравнивают версию и перезапрашивают /schedule только при
+    изменении; кэши фидов используют её как часть ключа.
+    """
+
+    __tablename__ = "schedule_versions"
+
+    # без FK: версия удалённой локации тоже должна расти
+    location_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+__all__ = ["ScheduleVersion"]
@@ -0,0 +1,28 @@
+# app/models/table_version.py
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class TableVersion(Base):
+    """
+    Версия таблицы справочника/расписания: растёт в той же транзакции,
+    что и запись в неё (app/services/cache_bus.py).
+
+    По ней воркеры узнают, что их кэши в памяти устарели из-за записи
+    в соседнем процессе.
+    """
+
+    __tablename__ = "table_versions"
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+__all__ = ["TableVersion"]
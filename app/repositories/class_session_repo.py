@@ -1,7 +1,11 @@
-from typing import List
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import bindparam, func, insert, select, update
 from sqlalchemy.orm import Session
 
 from app.models.class_session import ClassSession
+from app.models.location import Location
+from app.models.program_type import ProgramType
+from app.models.trainer import Trainer
 
 
 class ClassSessionRepository:
@@ -14,3 +18,103 @@ class ClassSessionRepository:
             .filter(ClassSession.location_id == location_id)
             .all()
         )
+
+    def list_active_slots(self) -> List[Tuple[int, int, int, object, int]]:
+        """
+        Недельный шаблон активных занятий для отчётов:
+        (location_id, program_type_id, weekday, start_time, capacity).
+        """
+        query = select(
+            ClassSession.location_id,
+            ClassSession.program_type_id,
+            ClassSession.weekday,
+            ClassSession.start_time,
+            ClassSession.capacity,
+        ).where(ClassSession.is_active.is_(True))
+        return [tuple(row) for row in self.db.execute(query)]
+
+    def list_for_feed(
+        self,
+        location_id: Optional[int] = None,
+        trainer_id: Optional[int] = None,
+        program_type_id: Optional[int] = None,
+    ) -> List[Tuple]:
+        """
+        Активные занятия для календарного фида плоскими строками
+        (без ORM-объектов): занятие + названия программы, тренера и локации.
+        """
+        query = (
+            select(
+                ClassSession.id,
+                ClassSession.starts_at,
+                ClassSession.weekday,
+                ClassSession.start_time,
+                ClassSession.end_time,
+                ClassSession.capacity,
+                ProgramType.name,
+                Trainer.full_name,
+                Location.name,
+                Location.address,
+            )
+            .join(ProgramType, ProgramType.id == ClassSession.program_type_id)
+            .join(Location, Location.id == ClassSession.location_id)
+            .outerjoin(Trainer, Trainer.id == ClassSession.trainer_id)
+            .where(ClassSession.is_active.is_(True))
+            .order_by(ClassSession.location_id, ClassSession.weekday, ClassSession.start_time, ClassSession.id)
+        )
+        if location_id is not None:
+            query = query.where(ClassSession.location_id == location_id)
+        if trainer_id is not None:
+            query = query.where(ClassSession.trainer_id == trainer_id)
+        if program_type_id is not None:
+            query = query.where(ClassSession.program_type_id == program_type_id)
+        return [tuple(row) for row in self.db.execute(query)]
+
+    def get_by_id(self, session_id: int) -> Optional[ClassSession]:
+        return self.db.get(ClassSession, session_id)
+
+    def add(self, data: dict) -> ClassSession:
+        """Добавить занятие в текущую транзакцию (flush → есть id), без commit."""
+        session = ClassSession(**data)
+        self.db.add(session)
+        self.db.flush()
+        return session
+
+    def count_for(self, **filters: int) -> int:
+        """Сколько занятий ссылается на сущность, например count_for(trainer_id=3)."""
+        query = select(func.count()).select_from(ClassSession)
+        for column, value in filters.items():
+            query = query.where(getattr(ClassSession, column) == value)
+        return self.db.scalar(query) or 0
+
+    def list_by_locations(self, location_ids: Iterable[int]) -> List[ClassSession]:
+        return list(self.db.scalars(
+            select(ClassSession).where(ClassSession.location_id.in_(list(location_ids)))
+        ))
+
+    def list_by_trainers(self, trainer_ids: Iterable[int]) -> List[ClassSession]:
+        return list(self.db.scalars(
+            select(ClassSession).where(
+                ClassSession.trainer_id.in_(list(trainer_ids)),
+                ClassSession.is_active.is_(True),
+            )
+        ))
+
+    # --- set-based запись для импорта (мимо ORM unit of work) ---
+
+    def bulk_insert(self, rows: List[Dict]) -> None:
+        if rows:
+            self.db.execute(insert(ClassSession), rows)
+
+    def bulk_update(self, rows: List[Dict]) -> None:
+        """rows: словари с ключом "id" и обновляемыми колонками (одинаковый набор)."""
+        if not rows:
+            return
+        table = ClassSession.__table__
+        columns = [key for key in rows[0] if key != "id"]
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values({column: bindparam(f"_{column}") for column in columns})
+        )
+        self.db.execute(stmt, [{"_id": row["id"], **{f"_{c}": row[c] for c in columns}} for row in rows])
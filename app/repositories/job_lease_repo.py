@@ -0,0 +1,77 @@
+# app/repositories/job_lease_repo.py
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.db.upsert import insert_for
+from app.models.job_lease import JobLease
+
+
+class JobLeaseRepository:
+    """
+    Аренды периодических задач: захват слота одним upsert-ом,
+    чтобы из нескольких воркеров, проснувшихся одновременно, слот
+    достался ровно одному.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def acquire(self, job_name: str, holder: str, slot_at: datetime, lease_seconds: float) -> bool:
+        """
+        Взять слот slot_at задачи. Получится, если прошлая аренда истекла
+        (или снята) и этот слот ещё никто не брал.
+        """
+        table = JobLease.__table__
+        now = datetime.utcnow()
+        values = {
+            "job_name": job_name,
+            "holder": holder,
+            "slot_at": slot_at,
+            "expires_at": now + timedelta(seconds=lease_seconds),
+            "started_at": now,
+            "status": "running",
+        }
+        stmt = insert_for(self.db)(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.job_name],
+            set_={name: stmt.excluded[name] for name in values if name != "job_name"},
+            where=(table.c.expires_at <= now) & (table.c.slot_at < slot_at),
+        )
+        self.db.execute(stmt)
+        self.db.commit()
+        row = self.db.execute(
+            select(table.c.holder, table.c.slot_at).where(table.c.job_name == job_name)
+        ).one()
+        return row.holder == holder and row.slot_at == slot_at
+
+    def release(
+        self,
+        job_name: str,
+        holder: str,
+        slot_at: datetime,
+        status: str,
+        duration_ms: int,
+        error: Optional[str] = None,
+    ) -> None:
+        """Снять свою аренду и записать итог запуска."""
+        now = datetime.utcnow()
+        self.db.execute(
+            update(JobLease)
+            .where(JobLease.job_name == job_name, JobLease.holder == holder, JobLease.slot_at == slot_at)
+            .values(
+                expires_at=now,
+                finished_at=now,
+                duration_ms=duration_ms,
+                status=status,
+                last_error=error[:500] if error else None,
+            )
+        )
+        self.db.commit()
+
+    def list_all(self) -> List[JobLease]:
+        return list(self.db.scalars(select(JobLease).order_by(JobLease.job_name)))
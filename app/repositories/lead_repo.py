@@ -1,25 +1,63 @@
-from typing import List
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import Integer, cast, func, select
 from sqlalchemy.orm import Session
 
 from app.models.lead import Lead
+from app.repositories.lead_stats_repo import LeadStatsRepository
 
 
 class LeadRepository:
     def __init__(self, db: Session):
         self.db = db
+        self.stats = LeadStatsRepository(db)
 
-    def create_guest_visit(self, data: dict) -> Lead:
+    def add(self, data: dict) -> Lead:
+        """Добавить лид в текущую транзакцию (flush → есть id), без commit."""
         lead = Lead(**data)
         self.db.add(lead)
+        self.db.flush()
+        # роллап воронки обновляется в той же транзакции
+        self.stats.increment_created(lead)
+        return lead
+
+    def create_guest_visit(self, data: dict) -> Lead:
+        lead = self.add(data)
         self.db.commit()
         self.db.refresh(lead)
         return lead
 
     def list_all(self) -> List[Lead]:
-        return self.db.query(Lead).all()
+        # новые — первыми (по этому же ключу сливаются выборки шардов)
+        return self.db.query(Lead).order_by(Lead.created_at.desc(), Lead.id.desc()).all()
+
+    def get(self, lead_id: int) -> Lead | None:
+        return self.db.get(Lead, lead_id)
 
     def mark_processed(self, lead_id: int) -> None:
         lead = self.db.query(Lead).get(lead_id)
-        if lead:
+        if lead and not lead.is_processed:
             lead.is_processed = True
+            lead.processed_at = datetime.utcnow()
+            self.stats.increment_processed(lead)
             self.db.commit()
+
+    def list_demand(self, created_from: datetime, created_to: datetime) -> List[Tuple[int, int, int]]:
+        """
+        Лиды за [created_from, created_to) для отчётов о загрузке:
+        (location_id, program_type_id, минут от created_from), NULL → -1.
+
+        Минуты считает БД, а выборка идёт через Core без ORM-обвязки —
+        на годе истории это миллион строк.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            minutes = cast(func.floor(func.extract("epoch", Lead.created_at - created_from) / 60), Integer)
+        else:
+            minutes = cast((func.julianday(Lead.created_at) - func.julianday(created_from)) * 1440, Integer)
+        query = select(
+            func.coalesce(Lead.location_id, -1),
+            func.coalesce(Lead.program_type_id, -1),
+            minutes,
+        ).where(Lead.created_at >= created_from, Lead.created_at < created_to)
+        return self.db.connection().execute(query).all()
@@ -0,0 +1,212 @@
+# app/repositories/lead_stats_repo.py
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Date, case, cast, delete, func, select, text
+from sqlalchemy.orm import Session
+
+from app.db.upsert import insert_for
+from app.models.lead import Lead
+from app.models.lead_stats import LeadDailyStat
+
+
+class LeadStatsRepository:
+    """
+    Репозиторий роллапа lead_daily_stats.
+
+    Методы increment_* НЕ коммитят — счётчики меняются в той же
+    транзакции, что и сам лид, поэтому роллап не расходится с leads.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # --- инкрементальное обновление ---
+
+    def _add(
+        self,
+        day: date,
+        location_id: Optional[int],
+        program_type_id: Optional[int],
+        leads: int = 0,
+        processed: int = 0,
+        process_seconds: float = 0.0,
+        timed: int = 0,
+    ) -> None:
+        table = LeadDailyStat.__table__
+        stmt = insert_for(self.db)(table).values(
+            day=day,
+            location_id=location_id or 0,
+            program_type_id=program_type_id or 0,
+            leads_count=leads,
+            processed_count=processed,
+            process_seconds_total=process_seconds,
+            timed_processed_count=timed,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.location_id, table.c.program_type_id],
+            set_=self._merge_counts(table, stmt),
+        )
+        self.db.execute(stmt)
+
+    @staticmethod
+    def _merge_counts(table, stmt) -> Dict[str, Any]:
+        """SET для ON CONFLICT: прибавить новые счётчики к существующим."""
+        return {
+            "leads_count": table.c.leads_count + stmt.excluded.leads_count,
+            "processed_count": table.c.processed_count + stmt.excluded.processed_count,
+            "process_seconds_total": table.c.process_seconds_total + stmt.excluded.process_seconds_total,
+            "timed_processed_count": (
+                func.coalesce(table.c.timed_processed_count, table.c.processed_count)
+                + stmt.excluded.timed_processed_count
+            ),
+        }
+
+    def increment_created(self, lead: Lead) -> None:
+        created_at = lead.created_at or datetime.utcnow()
+        processed_seconds = 0.0
+        timed = lead.is_processed and lead.processed_at is not None
+        if timed:
+            processed_seconds = (lead.processed_at - created_at).total_seconds()
+        self._add(
+            created_at.date(),
+            lead.location_id,
+            lead.program_type_id,
+            leads=1,
+            processed=1 if lead.is_processed else 0,
+            process_seconds=processed_seconds,
+            timed=1 if timed else 0,
+        )
+
+    def increment_processed(self, lead: Lead) -> None:
+        self._add(
+            lead.created_at.date(),
+            lead.location_id,
+            lead.program_type_id,
+            processed=1,
+            process_seconds=(lead.processed_at - lead.created_at).total_seconds(),
+            timed=1,
+        )
+
+    # --- чтение ---
+
+    def list_daily(
+        self,
+        date_from: date,
+        date_to: date,
+        location_id: Optional[int] = None,
+        program_type_id: Optional[int] = None,
+    ) -> List[LeadDailyStat]:
+        query = (
+            select(LeadDailyStat)
+            .where(LeadDailyStat.day >= date_from, LeadDailyStat.day <= date_to)
+            .order_by(LeadDailyStat.day, LeadDailyStat.location_id, LeadDailyStat.program_type_id)
+        )
+        if location_id is not None:
+            query = query.where(LeadDailyStat.location_id == location_id)
+        if program_type_id is not None:
+            query = query.where(LeadDailyStat.program_type_id == program_type_id)
+        return list(self.db.scalars(query))
+
+    def summarize(
+        self,
+        date_from: date,
+        date_to: date,
+        group_by: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Суммы по диапазону дат; group_by: None | "location" | "program_type" | "day"."""
+        group_columns = {
+            None: [],
+            "location": [LeadDailyStat.location_id],
+            "program_type": [LeadDailyStat.program_type_id],
+            "day": [LeadDailyStat.day],
+        }[group_by]
+        query = (
+            select(
+                *group_columns,
+                func.coalesce(func.sum(LeadDailyStat.leads_count), 0).label("leads"),
+                func.coalesce(func.sum(LeadDailyStat.processed_count), 0).label("processed"),
+                func.coalesce(func.sum(LeadDailyStat.process_seconds_total), 0.0).label("process_seconds"),
+                func.coalesce(
+                    func.sum(func.coalesce(LeadDailyStat.timed_processed_count, LeadDailyStat.processed_count)), 0
+                ).label("timed_processed"),
+            )
+            .where(LeadDailyStat.day >= date_from, LeadDailyStat.day <= date_to)
+            .group_by(*group_columns)
+            .order_by(*group_columns)
+        )
+        return [dict(row._mapping) for row in self.db.execute(query)]
+
+    # --- пересборка (backfill) ---
+
+    def lock_for_rebuild(self) -> None:
+        """
+        Взять блокировку записи роллапа до конца транзакции.
+
+        SQLite: BEGIN IMMEDIATE-эквивалент — пустой DELETE берёт
+        файловую блокировку записи. PostgreSQL: EXCLUSIVE не мешает
+        SELECT, но останавливает increment_* других транзакций.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(text("LOCK TABLE lead_daily_stats IN EXCLUSIVE MODE"))
+        else:
+            self.db.execute(delete(LeadDailyStat).where(LeadDailyStat.leads_count < 0))
+
+    def clear(self) -> None:
+        self.db.execute(delete(LeadDailyStat))
+
+    def max_lead_id(self) -> int:
+        return self.db.scalar(select(func.max(Lead.id))) or 0
+
+    def backfill_range(self, id_from: int, id_to: int) -> None:
+        """
+        Добавить в роллап лиды с id в (id_from, id_to].
+
+        Один оператор INSERT … SELECT … GROUP BY … ON CONFLICT DO UPDATE:
+        агрегация и слияние с роллапом целиком на стороне БД.
+        """
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            day_expr = cast(Lead.created_at, Date)
+            seconds_expr = func.extract("epoch", Lead.processed_at - Lead.created_at)
+        else:
+            day_expr = func.date(Lead.created_at)
+            seconds_expr = (func.julianday(Lead.processed_at) - func.julianday(Lead.created_at)) * 86400.0
+
+        timed_expr = Lead.is_processed.is_(True) & Lead.processed_at.is_not(None)
+        location_expr = func.coalesce(Lead.location_id, 0)
+        program_expr = func.coalesce(Lead.program_type_id, 0)
+        aggregated = (
+            select(
+                day_expr,
+                location_expr,
+                program_expr,
+                func.count(),
+                func.sum(case((Lead.is_processed.is_(True), 1), else_=0)),
+                func.sum(case((timed_expr, seconds_expr), else_=0.0)),
+                func.sum(case((timed_expr, 1), else_=0)),
+            )
+            .where(Lead.id > id_from, Lead.id <= id_to)
+            .group_by(day_expr, location_expr, program_expr)
+        )
+
+        table = LeadDailyStat.__table__
+        stmt = insert_for(self.db)(table).from_select(
+            [
+                table.c.day,
+                table.c.location_id,
+                table.c.program_type_id,
+                table.c.leads_count,
+                table.c.processed_count,
+                table.c.process_seconds_total,
+                table.c.timed_processed_count,
+            ],
+            aggregated,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.location_id, table.c.program_type_id],
+            set_=self._merge_counts(table, stmt),
+        )
+        self.db.execute(stmt)
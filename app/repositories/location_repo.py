@@ -20,3 +20,10 @@ class LocationRepository:
             .filter(Location.id == location_id)
             .first()
         )
+
+    def add(self, data: dict) -> Location:
+        """Добавить локацию в текущую транзакцию (flush → есть id), без commit."""
+        location = Location(**data)
+        self.db.add(location)
+        self.db.flush()
+        return location
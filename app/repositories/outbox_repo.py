@@ -0,0 +1,85 @@
+# app/repositories/outbox_repo.py
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.models.outbox import OutboxMessage
+
+
+class OutboxRepository:
+    """
+    Репозиторий outbox-сообщений.
+
+    add() НЕ коммитит — сообщение уходит в БД вместе с транзакцией
+    вызывающего кода (в этом весь смысл transactional outbox).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(self, topic: str, payload: Dict[str, Any]) -> OutboxMessage:
+        message = OutboxMessage(topic=topic, payload=json.dumps(payload, default=str))
+        self.db.add(message)
+        return message
+
+    def claim_batch(self, limit: int, lease_seconds: float) -> List[OutboxMessage]:
+        """
+        Забрать до `limit` готовых к доставке сообщений.
+
+        Одним UPDATE помечаем пачку своим токеном и сдвигаем available_at
+        на время аренды: параллельные диспетчеры (другие воркеры) эти
+        сообщения не возьмут, а если мы упадём — аренда истечёт и
+        сообщения достанутся кому-то ещё (доставка at-least-once).
+        """
+        now = datetime.utcnow()
+        token = str(uuid.uuid4())
+        pending_ids = (
+            select(OutboxMessage.id)
+            .where(OutboxMessage.sent_at.is_(None), OutboxMessage.available_at <= now)
+            .order_by(OutboxMessage.id)
+            .limit(limit)
+            .scalar_subquery()
+        )
+        self.db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(pending_ids), OutboxMessage.available_at <= now)
+            .values(claimed_by=token, available_at=now + timedelta(seconds=lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return list(
+            self.db.scalars(
+                select(OutboxMessage)
+                .where(OutboxMessage.claimed_by == token)
+                .order_by(OutboxMessage.id)
+            )
+        )
+
+    def mark_sent(self, message: OutboxMessage) -> None:
+        message.sent_at = datetime.utcnow()
+        message.claimed_by = None
+        message.attempts += 1
+
+    def mark_failed(self, message: OutboxMessage, error: str, retry_at: datetime) -> None:
+        message.attempts += 1
+        message.last_error = error[:500]
+        message.available_at = retry_at
+        message.claimed_by = None
+
+    def purge_sent(self, before: datetime) -> int:
+        """Удалить сообщения, доставленные раньше before (без commit)."""
+        result = self.db.execute(
+            delete(OutboxMessage)
+            .where(OutboxMessage.sent_at.is_not(None), OutboxMessage.sent_at < before)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def count_pending(self) -> int:
+        return self.db.query(OutboxMessage).filter(OutboxMessage.sent_at.is_(None)).count()
@@ -1,5 +1,5 @@
 # app/repositories/program_type_repo.py
-from typing import List
+from typing import List, Optional
 
 from sqlalchemy.orm import Session
 
@@ -12,3 +12,13 @@ class ProgramTypeRepository:
 
     def list_all(self) -> List[ProgramType]:
         return self.db.query(ProgramType).all()
+
+    def get_by_id(self, program_type_id: int) -> Optional[ProgramType]:
+        return self.db.get(ProgramType, program_type_id)
+
+    def add(self, data: dict) -> ProgramType:
+        """Добавить тип программы в текущую транзакцию (flush → есть id), без commit."""
+        program_type = ProgramType(**data)
+        self.db.add(program_type)
+        self.db.flush()
+        return program_type
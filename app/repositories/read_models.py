@@ -0,0 +1,116 @@
+# app/repositories/read_models.py
+"""
+Read-модели горячих публичных GET-ов без ORM.
+
+ORM-объект на каждую строку — это identity map, состояние атрибутов и
+отношений, инструментирование, и всё ради того, чтобы тут же скопировать
+поля в Pydantic-схему ответа. Здесь — Core `select()` ровно нужных колонок
+и лёгкие DTO со `__slots__` (без __dict__ и без привязки к сессии).
+
+Запись по-прежнему идёт через ORM и обычные репозитории.
+"""
+
+from __future__ import annotations
+
+from typing import ClassVar, List, Optional, Sequence, Type, TypeVar
+
+from sqlalchemy import Select, bindparam, select
+from sqlalchemy.orm import Session
+
+from app.models.class_session import ClassSession
+from app.models.location import Location
+from app.models.membership import MembershipPlan
+from app.models.program_type import ProgramType
+
+DTO = TypeVar("DTO", bound="RowDTO")
+
+
+class RowDTO:
+    """
+    Строка выборки как объект с атрибутами (для from_attributes-схем).
+
+    Колонки выборки = __slots__ в том же порядке, берутся из model.
+    """
+
+    __slots__ = ()
+    model: ClassVar[type]
+
+    def __init__(self, row: Sequence) -> None:
+        for name, value in zip(self.__slots__, row):
+            setattr(self, name, value)
+
+    @classmethod
+    def select(cls) -> Select:
+        return select(*(getattr(cls.model, name) for name in cls.__slots__))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class LocationRow(RowDTO):
+    __slots__ = ("id", "name", "address", "latitude", "longitude")
+    model = Location
+
+
+class ProgramTypeRow(RowDTO):
+    __slots__ = ("id", "name", "description")
+    model = ProgramType
+
+
+class MembershipPlanRow(RowDTO):
+    __slots__ = (
+        "id", "name", "description", "price", "duration_days", "visits_limit", "location_id", "is_active",
+    )
+    model = MembershipPlan
+
+
+class ClassSessionRow(RowDTO):
+    __slots__ = (
+        "id", "location_id", "program_type_id", "trainer_id", "membership_plan_id",
+        "weekday", "start_time", "end_time", "capacity", "is_active",
+    )
+    model = ClassSession
+
+
+# Выражения строим один раз при импорте: на горячем пути — только
+# поиск в кэше компиляции SQLAlchemy и подстановка параметров
+_LOCATIONS = LocationRow.select().order_by(Location.id)
+_PROGRAM_TYPES = ProgramTypeRow.select().order_by(ProgramType.id)
+_MEMBERSHIPS = MembershipPlanRow.select().order_by(MembershipPlan.id)
+_MEMBERSHIPS_FOR_LOCATION = _MEMBERSHIPS.where(MembershipPlan.location_id == bindparam("location_id"))
+_SCHEDULE = (
+    ClassSessionRow.select()
+    .where(ClassSession.location_id == bindparam("location_id"))
+    .order_by(ClassSession.id)
+)
+_ALL_SESSIONS = ClassSessionRow.select().order_by(ClassSession.location_id, ClassSession.id)
+
+
+class ReadModelRepository:
+    """Плоские выборки для публичного API (GET /locations, /program-types, ...)."""
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def _fetch(self, dto: Type[DTO], query: Select, **params) -> List[DTO]:
+        # через Connection: строки не проходят через ORM-загрузчик сессии
+        return [dto(row) for row in self.db.connection().execute(query, params)]
+
+    def list_locations(self) -> List[LocationRow]:
+        return self._fetch(LocationRow, _LOCATIONS)
+
+    def list_program_types(self) -> List[ProgramTypeRow]:
+        return self._fetch(ProgramTypeRow, _PROGRAM_TYPES)
+
+    def list_memberships(self, location_id: Optional[int] = None) -> List[MembershipPlanRow]:
+        if location_id is None:
+            return self._fetch(MembershipPlanRow, _MEMBERSHIPS)
+        return self._fetch(MembershipPlanRow, _MEMBERSHIPS_FOR_LOCATION, location_id=location_id)
+
+    def list_schedule(self, location_id: int) -> List[ClassSessionRow]:
+        return self._fetch(ClassSessionRow, _SCHEDULE, location_id=location_id)
+
+    def list_all_sessions(self) -> List[ClassSessionRow]:
+        """Все занятия всех локаций (для снимка расписания в памяти)."""
+        return self._fetch(ClassSessionRow, _ALL_SESSIONS)
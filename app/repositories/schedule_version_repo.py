@@ -0,0 +1,47 @@
+# app/repositories/schedule_version_repo.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.db.upsert import insert_for
+from app.models.schedule_version import ScheduleVersion
+
+
+class ScheduleVersionRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, location_id: int) -> int:
+        return self.db.scalar(
+            select(ScheduleVersion.version).where(ScheduleVersion.location_id == location_id)
+        ) or 0
+
+    def total(self) -> int:
+        """Сумма версий: растёт при любом изменении расписания."""
+        return self.db.scalar(select(func.coalesce(func.sum(ScheduleVersion.version), 0))) or 0
+
+    def list_all(self) -> Dict[int, int]:
+        return dict(self.db.execute(select(ScheduleVersion.location_id, ScheduleVersion.version)).all())
+
+
+def bump_versions(conn: Connection, location_ids: Iterable[int]) -> None:
+    """
+    +1 к версиям локаций одним upsert-ом. Принимает Connection,
+    потому что вызывается изнутри flush-а (см. schedule_versions).
+    """
+    table = ScheduleVersion.__table__
+    now = datetime.utcnow()
+    rows = [{"location_id": location_id, "version": 1, "updated_at": now} for location_id in sorted(location_ids)]
+    if not rows:
+        return
+    stmt = insert_for(conn)(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.location_id],
+        set_={"version": table.c.version + 1, "updated_at": stmt.excluded.updated_at},
+    )
+    conn.execute(stmt, rows)
@@ -0,0 +1,41 @@
+# app/repositories/table_version_repo.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+
+from app.db.upsert import insert_for
+from app.models.table_version import TableVersion
+
+
+def load_table_versions(conn: Connection) -> Dict[str, int]:
+    """Все версии таблиц: {"locations": 12, ...} (таблица — десяток строк)."""
+    table = TableVersion.__table__
+    return dict(conn.execute(select(table.c.table_name, table.c.version)).all())
+
+
+def sum_table_versions(conn: Connection, table_names: Iterable[str]) -> int:
+    """Сумма версий таблиц: растёт при любой записи в любую из них."""
+    versions = load_table_versions(conn)
+    return sum(versions.get(name, 0) for name in table_names)
+
+
+def bump_table_versions(conn: Connection, table_names: Iterable[str]) -> None:
+    """
+    +1 к версиям таблиц одним upsert-ом. Принимает Connection,
+    потому что вызывается изнутри flush-а (см. cache_bus).
+    """
+    table = TableVersion.__table__
+    now = datetime.utcnow()
+    rows = [{"table_name": name, "version": 1, "updated_at": now} for name in sorted(table_names)]
+    if not rows:
+        return
+    stmt = insert_for(conn)(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.table_name],
+        set_={"version": table.c.version + 1, "updated_at": stmt.excluded.updated_at},
+    )
+    conn.execute(stmt, rows)
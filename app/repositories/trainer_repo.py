@@ -0,0 +1,24 @@
+# app/repositories/trainer_repo.py
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.trainer import Trainer
+
+
+class TrainerRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_all(self) -> List[Trainer]:
+        return self.db.query(Trainer).order_by(Trainer.id).all()
+
+    def get_by_id(self, trainer_id: int) -> Optional[Trainer]:
+        return self.db.get(Trainer, trainer_id)
+
+    def add(self, data: dict) -> Trainer:
+        """Добавить тренера в текущую транзакцию (flush → есть id), без commit."""
+        trainer = Trainer(**data)
+        self.db.add(trainer)
+        self.db.flush()
+        return trainer
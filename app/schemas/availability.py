@@ -0,0 +1,20 @@
+# app/schemas/availability.py
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class FreeSlotRead(BaseModel):
+    """Свободное окно тренера для персонального занятия."""
+    trainer_id: int
+    trainer_name: Optional[str] = None
+    location_id: int
+    starts_at: datetime
+    ends_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+__all__ = ["FreeSlotRead"]
@@ -2,9 +2,9 @@
 from __future__ import annotations
 
 from datetime import time, datetime, date
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict, computed_field
+from pydantic import BaseModel, ConfigDict, computed_field, field_validator
 
 
 # Базовая схема – общие поля для ClassSession
@@ -45,8 +45,63 @@ class ClassSessionRead(ClassSessionBase):
         return int((dt_end - dt_start).total_seconds() // 60)
 
 
+# Результат поиска по всем локациям: плюс названия для выдачи
+class ClassSessionSearchRead(ClassSessionRead):
+    location_name: Optional[str] = None
+    program_type_name: Optional[str] = None
+    trainer_name: Optional[str] = None
+
+
+# Для частичного обновления (PATCH)
+class ClassSessionUpdate(BaseModel):
+    weekday: Optional[int] = None
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    location_id: Optional[int] = None
+    program_type_id: Optional[int] = None
+    trainer_id: Optional[int] = None
+    membership_plan_id: Optional[int] = None
+    capacity: Optional[int] = None
+    is_active: Optional[bool] = None
+
+    # не передано — не меняем; явный null — 422 (а не 500 из БД). Исключения:
+    # membership_plan_id можно очистить, trainer_id проверяет сервис (TRAINER_REQUIRED)
+    @field_validator(
+        "weekday", "start_time", "end_time", "location_id", "program_type_id", "capacity", "is_active",
+    )
+    @classmethod
+    def _not_null(cls, value):
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+
+# Одна проблема импорта расписания из CSV
+class ScheduleImportIssue(BaseModel):
+    line: int                   # номер строки CSV (заголовок = 1)
+    code: str                   # INVALID_VALUE / UNKNOWN_REFERENCE / DUPLICATE_ROW / TRAINER_OVERLAP ...
+    message: str
+    other_line: Optional[int] = None        # вторая строка конфликта (если в том же файле)
+    other_session_id: Optional[int] = None  # или существующее занятие
+
+
+# Итог импорта: при ошибках/конфликтах ничего не записывается
+class ScheduleImportReport(BaseModel):
+    rows: int
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    dry_run: bool = False
+    errors: List[ScheduleImportIssue] = []
+    conflicts: List[ScheduleImportIssue] = []
+
+
 __all__ = [
     "ClassSessionBase",
     "ClassSessionCreate",
     "ClassSessionRead",
+    "ClassSessionSearchRead",
+    "ClassSessionUpdate",
+    "ScheduleImportIssue",
+    "ScheduleImportReport",
 ]
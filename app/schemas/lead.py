@@ -1,8 +1,9 @@
 # app/schemas/lead.py
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 
 # Базовая часть данных лида
@@ -32,12 +33,23 @@ class LeadCreateGuestVisit(LeadBase):
     pass
 
 
-# То, что отдаём наружу (в ответах API)
-class LeadRead(LeadBase):
+# То, что отдаём наружу (в ответах API) — поля, которые реально
+# хранятся в таблице leads (см. app.models.lead.Lead)
+class LeadRead(BaseModel):
     id: int
+    full_name: str
+    phone: str
+    source: Optional[str] = None
 
-    class Config:
-        orm_mode = True  # чтобы Pydantic понимал ORM-объекты SQLAlchemy
+    location_id: Optional[int] = None
+    program_type_id: Optional[int] = None
+
+    is_processed: bool = False
+    created_at: Optional[datetime] = None
+    processed_at: Optional[datetime] = None
+
+    # чтобы Pydantic понимал ORM-объекты SQLAlchemy
+    model_config = ConfigDict(from_attributes=True)
 
 
 __all__ = [
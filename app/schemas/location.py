@@ -9,6 +9,8 @@ class LocationBase(BaseModel):
     """Базовая схема локации (общие поля)."""
     name: str
     address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
     class Config:
         orm_mode = True
@@ -19,6 +21,11 @@ class LocationRead(LocationBase):
     id: int
 
 
+class LocationNearestRead(LocationRead):
+    """Локация из поиска ближайших: плюс расстояние до точки запроса."""
+    distance_km: float
+
+
 class LocationCreate(LocationBase):
     """Если потом понадобится создавать локации через API."""
     pass
@@ -28,6 +35,8 @@ class LocationUpdate(BaseModel):
     """Схема для обновления (вдруг пригодится)."""
     name: Optional[str] = None
     address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
     class Config:
         orm_mode = True
@@ -36,6 +45,7 @@ class LocationUpdate(BaseModel):
 __all__ = [
     "LocationBase",
     "LocationRead",
+    "LocationNearestRead",
     "LocationCreate",
     "LocationUpdate",
 ]
@@ -1,7 +1,7 @@
 # app/schemas/membership.py
 from __future__ import annotations
 
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -11,6 +11,7 @@ class MembershipPlanBase(BaseModel):
     description: Optional[str] = None
     price: float
     duration_days: int          # можно и int, но float чуть гибче
+    visits_limit: Optional[int] = None  # None — безлимит
     location_id: int      # FK -> locations.id
     is_active: bool = True
     # аналог orm_mode=True в pydantic v2
@@ -37,9 +38,27 @@ class MembershipPlanUpdate(BaseModel):
         orm_mode = True
 
 
+class MembershipPlanComparison(MembershipPlanRead):
+    """Тариф с расчётом выгоды при заданной частоте посещений."""
+    rank: int                   # 1 — самый выгодный
+    expected_visits: float      # посещений за срок с учётом visits_limit
+    cost_per_visit: float
+    cost_per_day: float
+
+
+class MembershipComparisonRead(BaseModel):
+    """Ответ /memberships/compare."""
+    location_id: int
+    visits_per_week: int
+    recommended_plan_id: Optional[int] = None
+    plans: List[MembershipPlanComparison]
+
+
 __all__ = [
     "MembershipPlanBase",
     "MembershipPlanRead",
     "MembershipPlanCreate",
     "MembershipPlanUpdate",
+    "MembershipPlanComparison",
+    "MembershipComparisonRead",
 ]
\ No newline at end of file
@@ -1,11 +1,29 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
 class TrainerRead(BaseModel):
     id: int
     full_name: str
+    phone: Optional[str] = None
+    email: Optional[str] = None
     bio: str | None = None
     photo_url: str | None = None
 
     class Config:
         from_attributes = True
+
+
+class TrainerCreate(BaseModel):
+    """Создание тренера через админку."""
+    full_name: str
+    phone: Optional[str] = None
+    email: Optional[str] = None
+
+
+class TrainerUpdate(BaseModel):
+    """Обновление тренера (все поля необязательны)."""
+    full_name: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
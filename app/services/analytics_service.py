@@ -0,0 +1,135 @@
+# app/services/analytics_service.py
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.repositories.lead_stats_repo import LeadStatsRepository
+
+# суммируемые колонки LeadStatsRepository.summarize; остальные — ключ группы
+_SUM_FIELDS = ("leads", "processed", "process_seconds", "timed_processed")
+
+
+class AnalyticsService:
+    """
+    Аналитика воронки лидов.
+
+    Все отчёты читают только роллап lead_daily_stats
+    (день × локация × программа), а не таблицу leads целиком,
+    поэтому их стоимость не растёт с историей лидов.
+
+    При шардировании роллап лежит в БД шарда: роутер собирает строки
+    daily / totals со всех шардов (fan_out), а доли и средние считаются
+    уже по слитым суммам (summarize_totals).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = LeadStatsRepository(db)
+
+    @staticmethod
+    def _with_ratios(row: Dict[str, Any]) -> Dict[str, Any]:
+        leads = row["leads"] or 0
+        processed = row["processed"] or 0
+        process_seconds = row.pop("process_seconds", 0.0) or 0.0
+        # среднее — только по лидам с processed_at: у старых его нет
+        timed = row.pop("timed_processed", None)
+        timed = processed if timed is None else timed
+        row["processed_ratio"] = round(processed / leads, 4) if leads else 0.0
+        row["avg_process_hours"] = round(process_seconds / timed / 3600, 2) if timed else None
+        return row
+
+    def daily(
+        self,
+        date_from: date,
+        date_to: date,
+        location_id: Optional[int] = None,
+        program_type_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Строки роллапа как есть: лиды по дням/локациям/программам."""
+        return [
+            self._with_ratios({
+                "day": stat.day,
+                "location_id": stat.location_id or None,
+                "program_type_id": stat.program_type_id or None,
+                "leads": stat.leads_count,
+                "processed": stat.processed_count,
+                "process_seconds": stat.process_seconds_total,
+                "timed_processed": stat.timed_processed_count,
+            })
+            for stat in self.repo.list_daily(date_from, date_to, location_id, program_type_id)
+        ]
+
+    def totals(
+        self,
+        date_from: date,
+        date_to: date,
+        group_by: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Суммы роллапа за период (без долей), в порядке группировки."""
+        return self.repo.summarize(date_from, date_to, group_by)
+
+    @staticmethod
+    def group_key(row: Dict[str, Any]) -> Tuple:
+        return tuple(value for name, value in row.items() if name not in _SUM_FIELDS)
+
+    @classmethod
+    def summarize_totals(cls, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Сложить суммы с одинаковой группой (строки разных шардов) и посчитать доли."""
+        merged: Dict[Tuple, Dict[str, Any]] = {}
+        for row in rows:
+            key = cls.group_key(row)
+            target = merged.get(key)
+            if target is None:
+                merged[key] = dict(row)
+            else:
+                for name in _SUM_FIELDS:
+                    target[name] = (target[name] or 0) + (row[name] or 0)
+        result = list(merged.values())
+        for row in result:
+            for key in ("location_id", "program_type_id"):
+                if key in row and row[key] == 0:
+                    row[key] = None
+        return [cls._with_ratios(row) for row in result]
+
+    def summary(
+        self,
+        date_from: date,
+        date_to: date,
+        group_by: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Итоги за период: всего лидов, доля обработанных,
+        среднее время обработки (часы) — целиком или с разбивкой.
+        """
+        return self.summarize_totals(self.totals(date_from, date_to, group_by))
+
+    def rebuild(self, chunk_size: int = 100_000, log=None) -> int:
+        """
+        Пересобрать роллап с нуля по диапазонам id лидов.
+        Возвращает число обработанных чанков.
+
+        Вся пересборка — одна транзакция: роллап блокируется на запись,
+        затем фиксируется граница max_id, и только потом старый роллап
+        очищается. Читатели до commit видят прежние цифры, а increment_*
+        параллельных лидов ждут блокировку и ложатся поверх нового роллапа —
+        ни двойного счёта, ни частично собранных отчётов. Чанки лишь
+        ограничивают размер одного INSERT … SELECT.
+        """
+        try:
+            self.repo.lock_for_rebuild()
+            max_id = self.repo.max_lead_id()
+            self.repo.clear()
+            chunks = 0
+            for id_from in range(0, max_id, chunk_size):
+                id_to = min(id_from + chunk_size, max_id)
+                self.repo.backfill_range(id_from, id_to)
+                chunks += 1
+                if log is not None:
+                    log(f"  leads ({id_from}, {id_to}] merged into rollup")
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return chunks
@@ -0,0 +1,224 @@
+# app/services/availability.py
+"""
+Свободные окна тренеров для персональных (не групповых) занятий.
+
+Свободно = рабочие часы (WORKING_HOURS) минус занятия тренера в любой
+студии, расширенные на AVAILABILITY_BUFFER_MINUTES с каждой стороны
+(переезд, подготовка зала). Расписание — недельный шаблон, поэтому
+свободные интервалы считаются один раз на (тренер, день недели) по
+снимку расписания, а даты лишь «прикладываются» к ним.
+
+Интервалы — полуоткрытые [start, end) в минутах от начала дня,
+списки всегда отсортированы и не пересекаются.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+import threading
+import weakref
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import AppError
+from app.services.reference_cache import get_reference_data
+from app.services.schedule_snapshot import ScheduleSnapshot, get_schedule_snapshot
+
+Interval = Tuple[int, int]
+MINUTES_PER_DAY = 24 * 60
+WEEKDAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+# --- арифметика множеств интервалов ---
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Объединить пересекающиеся и смежные интервалы."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(base: List[Interval], cuts: List[Interval]) -> List[Interval]:
+    """base минус cuts (оба списка отсортированы и не пересекаются) за один проход."""
+    result: List[Interval] = []
+    j = 0
+    for start, end in base:
+        while j < len(cuts) and cuts[j][1] <= start:
+            j += 1
+        k = j
+        while k < len(cuts) and cuts[k][0] < end:
+            if cuts[k][0] > start:
+                result.append((start, cuts[k][0]))
+            start = max(start, cuts[k][1])
+            k += 1
+        if start < end:
+            result.append((start, end))
+    return result
+
+
+# --- рабочие часы ---
+
+_HOURS_RE = re.compile(r"^(\w{3})(?:-(\w{3}))?\s+(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})$")
+
+
+def parse_working_hours(spec: str) -> Dict[int, List[Interval]]:
+    """"mon-fri 08:00-21:00; sat 09:00-15:00" → {день недели: [интервалы]}."""
+    hours: Dict[int, List[Interval]] = {weekday: [] for weekday in range(7)}
+    for part in filter(None, (chunk.strip().lower() for chunk in spec.split(";"))):
+        match = _HOURS_RE.match(part)
+        if match is None or match.group(1) not in WEEKDAY_NAMES or (match.group(2) or "mon") not in WEEKDAY_NAMES:
+            raise ValueError(f"Invalid working hours: {part!r}")
+        first = WEEKDAY_NAMES.index(match.group(1))
+        last = WEEKDAY_NAMES.index(match.group(2)) if match.group(2) else first
+        start = int(match.group(3)) * 60 + int(match.group(4))
+        end = int(match.group(5)) * 60 + int(match.group(6))
+        for weekday in range(first, last + 1):
+            hours[weekday].append((start, end))
+    return {weekday: merge_intervals(intervals) for weekday, intervals in hours.items()}
+
+
+# --- свободные интервалы по снимку расписания ---
+
+class FreeSlot(NamedTuple):
+    trainer_id: int
+    location_id: int
+    starts_at: datetime
+    ends_at: datetime
+
+
+class TrainerAvailability:
+    """Свободные интервалы тренеров по дням недели для одного снимка расписания."""
+
+    def __init__(self, snapshot: ScheduleSnapshot, working_hours: Dict[int, List[Interval]], buffer: int) -> None:
+        self.working_hours = working_hours
+        self.busy: Dict[int, Dict[int, List[Interval]]] = {}
+        for row in snapshot.rows:
+            if not row.is_active or row.trainer_id is None:
+                continue
+            start = row.start_time.hour * 60 + row.start_time.minute
+            end = row.end_time.hour * 60 + row.end_time.minute
+            days = self.busy.setdefault(row.trainer_id, {})
+            if end <= start:  # через полночь: хвост — на следующий день
+                days.setdefault((row.weekday + 1) % 7, []).append((0, end + buffer))
+                end = MINUTES_PER_DAY
+            days.setdefault(row.weekday, []).append((start - buffer, end + buffer))
+        for days in self.busy.values():
+            for weekday, intervals in days.items():
+                days[weekday] = merge_intervals(intervals)
+        self._free: Dict[Tuple[int, int], List[Interval]] = {}
+
+    def free(self, trainer_id: int, weekday: int) -> List[Interval]:
+        key = (trainer_id, weekday)
+        free = self._free.get(key)
+        if free is None:
+            busy = self.busy.get(trainer_id, {}).get(weekday, [])
+            free = self._free[key] = subtract_intervals(self.working_hours[weekday], busy)
+        return free
+
+
+_availability: "weakref.WeakKeyDictionary[ScheduleSnapshot, Tuple[tuple, TrainerAvailability]]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+def get_trainer_availability(db: Session) -> TrainerAvailability:
+    """Свободные интервалы для текущего снимка (пересчёт — при смене снимка или настроек)."""
+    snapshot = get_schedule_snapshot(db)
+    config = (settings.WORKING_HOURS, settings.AVAILABILITY_BUFFER_MINUTES)
+    cached = _availability.get(snapshot)
+    if cached is not None and cached[0] == config:
+        return cached[1]
+    availability = TrainerAvailability(snapshot, parse_working_hours(config[0]), config[1])
+    with _lock:
+        _availability[snapshot] = (config, availability)
+    return availability
+
+
+def _slot_starts(free: List[Interval], duration: int, step: int, not_before: int) -> Iterable[int]:
+    for start, end in free:
+        # сетка начала — кратно step от полуночи
+        first = max(start, not_before)
+        first = -(-first // step) * step
+        for slot in range(first, end - duration + 1, step):
+            yield slot
+
+
+def _tagged(minutes: Iterable[int], trainer_id: int) -> Iterable[Tuple[int, int]]:
+    for minute in minutes:
+        yield minute, trainer_id
+
+
+class AvailabilityService:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def _candidate_trainers(self, snapshot: ScheduleSnapshot, location_id: int) -> List[int]:
+        """Тренеры, которые ведут занятия в этой студии."""
+        start, stop = snapshot.span(location_id)
+        return sorted({
+            row.trainer_id
+            for row in snapshot.rows[start:stop]
+            if row.is_active and row.trainer_id is not None
+        })
+
+    def next_free_slots(
+        self,
+        location_id: int,
+        program_type_id: Optional[int] = None,
+        trainer_id: Optional[int] = None,
+        duration_minutes: int = 60,
+        limit: int = 10,
+        now: Optional[datetime] = None,
+    ) -> List[FreeSlot]:
+        """Ближайшие `limit` свободных слотов (по времени, затем по тренеру)."""
+        references = get_reference_data(self.db)
+        missing = references.missing(location_id=location_id, program_type_id=program_type_id, trainer_id=trainer_id)
+        if missing:
+            raise AppError(
+                code="UNKNOWN_REFERENCE",
+                message="Unknown " + ", ".join(f"{field}={value}" for field, value in missing.items()),
+                http_status=404,
+            )
+        if program_type_id is not None and references.program_types[program_type_id].is_group is not False:
+            raise AppError(
+                code="PROGRAM_IS_GROUP",
+                message=f"Program type id={program_type_id} is a group program",
+                http_status=422,
+            )
+
+        availability = get_trainer_availability(self.db)
+        trainers = (
+            [trainer_id] if trainer_id is not None
+            else self._candidate_trainers(get_schedule_snapshot(self.db), location_id)
+        )
+        step = settings.AVAILABILITY_STEP_MINUTES
+        earliest = (now or datetime.now()) + timedelta(minutes=settings.AVAILABILITY_MIN_LEAD_MINUTES)
+
+        slots: List[FreeSlot] = []
+        for offset in range(settings.AVAILABILITY_HORIZON_DAYS + 1):
+            day: date = earliest.date() + timedelta(days=offset)
+            not_before = earliest.hour * 60 + earliest.minute if offset == 0 else 0
+            midnight = datetime.combine(day, datetime.min.time())
+            # слоты каждого тренера уже по возрастанию — сливаем лениво
+            day_slots = heapq.merge(*(
+                _tagged(_slot_starts(availability.free(trainer, day.weekday()), duration_minutes, step, not_before), trainer)
+                for trainer in trainers
+            ))
+            for minute, trainer in day_slots:
+                starts_at = midnight + timedelta(minutes=minute)
+                slots.append(FreeSlot(trainer, location_id, starts_at, starts_at + timedelta(minutes=duration_minutes)))
+                if len(slots) >= limit:
+                    return slots
+        return slots
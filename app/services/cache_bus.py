@@ -0,0 +1,280 @@
+# app/services/cache_bus.py
+"""
+Согласованность кэшей в памяти между воркерами (uvicorn/gunicorn -w N).
+
+Каждый воркер кэширует справочники и производные от расписания сам по
+себе, а пишет в БД любой из них. Поэтому:
+
+1. Версии таблиц в БД (table_versions): любая запись в отслеживаемую
+   таблицу поднимает её версию в той же транзакции (after_flush).
+2. Проверка в начале запроса (не чаще CACHE_CHECK_INTERVAL_SECONDS):
+   на SQLite сначала `PRAGMA data_version` на выделенном соединении —
+   меняется, только если БД коммитил кто-то ещё, и стоит микросекунды;
+   table_versions перечитываем лишь тогда. На других СУБД — сразу
+   table_versions (десяток строк). При шардировании (app/db/sharding.py)
+   у каждого шарда своё соединение и свои версии: запись в таблицу
+   любого шарда сбрасывает кэши.
+3. Опционально push: unix-датаграммы между воркерами одной машины
+   (CACHE_BUS_SOCKET_DIR). После коммита воркер рассылает список
+   изменённых таблиц, получатели сбрасывают кэши сразу, не дожидаясь
+   очередной проверки.
+
+Кэши подписываются через on_tables_changed(tables, callback).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import glob
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.repositories.table_version_repo import bump_table_versions, load_table_versions
+
+logger = logging.getLogger("cohai")
+
+# Таблицы, от которых зависят кэши в памяти
+TRACKED_TABLES: FrozenSet[str] = frozenset({
+    "locations",
+    "program_types",
+    "trainers",
+    "membership_plans",
+    "class_sessions",
+})
+
+Listener = Tuple[FrozenSet[str], Callable[[], None]]
+
+
+class _Watch:
+    """Выделенное соединение одной БД и версии таблиц на прошлой проверке."""
+
+    __slots__ = ("conn", "versions", "data_version")
+
+    def __init__(self, conn: Connection) -> None:
+        self.conn = conn
+        self.versions: Optional[Dict[str, int]] = None
+        self.data_version: Optional[int] = None
+
+    def changed(self) -> Set[str]:
+        conn = self.conn
+        try:
+            if conn.dialect.name == "sqlite":
+                data_version = conn.exec_driver_sql("PRAGMA data_version").scalar()
+                if data_version == self.data_version:
+                    conn.rollback()
+                    return set()
+                self.data_version = data_version
+            versions = load_table_versions(conn)
+            conn.rollback()  # не держим снимок БД открытым между проверками
+        except Exception:
+            logger.exception("Cache version check failed")
+            conn.rollback()
+            return set()
+
+        previous, self.versions = self.versions, versions
+        if previous is None:
+            return set()
+        return {name for name, version in versions.items() if previous.get(name) != version}
+
+
+class CacheBus:
+    def __init__(self) -> None:
+        self._listeners: List[Listener] = []
+        # ключ БД (шард) → её соединение для проверок
+        self._watches: Dict[str, _Watch] = {}
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._socket: Optional[socket.socket] = None
+        self._socket_dir: Optional[str] = None
+        self._socket_path: Optional[str] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # --- подписчики ---
+
+    def subscribe(self, tables: Iterable[str], callback: Callable[[], None]) -> None:
+        self._listeners.append((frozenset(tables), callback))
+
+    def invalidate(self, tables: Set[str]) -> None:
+        """Сбросить кэши, зависящие от любой из таблиц."""
+        for watched, callback in self._listeners:
+            if watched & tables:
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("Cache invalidation callback failed")
+
+    # --- жизненный цикл ---
+
+    def start(self, engines: Union[Engine, Mapping[str, Engine]], socket_dir: str = "") -> None:
+        """
+        Выделенные соединения для проверок + (опционально) сокет воркера.
+
+        Args:
+            engines: engine БД или {ключ шарда → engine} — по соединению на каждый.
+        """
+        if isinstance(engines, Engine):
+            engines = {"": engines}
+        self._watches = {key: _Watch(engine.connect()) for key, engine in engines.items()}
+        self.check()  # базовая линия: с ней сравниваем все следующие проверки
+        if socket_dir:
+            self._open_socket(socket_dir)
+
+    def stop(self) -> None:
+        if self._loop is not None and self._socket is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._socket.fileno())
+        self._loop = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            try:
+                os.unlink(self._socket_path)
+            except OSError:
+                pass
+        for watch in self._watches.values():
+            watch.conn.close()
+        self._watches = {}
+
+    # --- pull: версии таблиц в БД ---
+
+    def due(self) -> bool:
+        return bool(self._watches) and time.monotonic() >= self._next_check
+
+    def check(self) -> Set[str]:
+        """Сравнить версии таблиц каждой БД с прошлой проверкой; устаревшие кэши сбросить."""
+        if not self._watches or not self._lock.acquire(blocking=False):
+            return set()  # другой поток уже проверяет прямо сейчас
+        try:
+            self._next_check = time.monotonic() + settings.CACHE_CHECK_INTERVAL_SECONDS
+            changed: Set[str] = set()
+            for watch in self._watches.values():
+                changed |= watch.changed()
+        finally:
+            self._lock.release()
+
+        if changed:
+            self.invalidate(changed)
+        return changed
+
+    # --- push: unix-датаграммы между воркерами ---
+
+    def _open_socket(self, socket_dir: str) -> None:
+        os.makedirs(socket_dir, exist_ok=True)
+        path = os.path.join(socket_dir, f"worker-{os.getpid()}-{id(self):x}.sock")
+        if os.path.exists(path):
+            os.unlink(path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(path)
+        sock.setblocking(False)
+        self._socket, self._socket_dir, self._socket_path = sock, socket_dir, path
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None  # без event loop читаем вручную через drain()
+        else:
+            self._loop.add_reader(sock.fileno(), self.drain)
+
+    def publish(self, tables: Set[str]) -> None:
+        """Разослать соседним воркерам, какие таблицы изменились."""
+        sock = self._socket
+        if sock is None:
+            return
+        payload = json.dumps({"tables": sorted(tables)}).encode()
+        for path in glob.glob(os.path.join(self._socket_dir, "*.sock")):
+            if path == self._socket_path:
+                continue
+            try:
+                sock.sendto(payload, path)
+            except ConnectionRefusedError:
+                # воркер умер, а файл сокета остался
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except (BlockingIOError, FileNotFoundError):
+                # очередь получателя полна / он уже ушёл — догонит по версиям
+                pass
+
+    def drain(self) -> Set[str]:
+        """Прочитать все пришедшие уведомления и сбросить кэши."""
+        tables: Set[str] = set()
+        sock = self._socket
+        while sock is not None:
+            try:
+                data = sock.recv(65536)
+            except (BlockingIOError, OSError):
+                break
+            try:
+                tables.update(json.loads(data)["tables"])
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Malformed cache bus message: %r", data[:200])
+        tables &= TRACKED_TABLES
+        if tables:
+            self.invalidate(tables)
+            self._next_check = 0.0  # и сверим версии на ближайшем запросе
+        return tables
+
+
+# Одна шина на процесс (воркер)
+cache_bus = CacheBus()
+
+
+def on_tables_changed(tables: Iterable[str], callback: Callable[[], None]) -> None:
+    """Сбрасывать кэш при записи в любую из таблиц (в любом воркере)."""
+    cache_bus.subscribe(tables, callback)
+
+
+def mark_tables_written(session: Session, tables: Set[str]) -> None:
+    """
+    Поднять версии таблиц в текущей транзакции сессии.
+
+    Вызывается автоматически после flush-а; set-based запись мимо
+    unit of work (bulk insert/update) должна вызвать её сама.
+    """
+    tables = set(tables) & TRACKED_TABLES
+    if tables:
+        bump_table_versions(session.connection(), tables)
+        session.info.setdefault("cache_tables", set()).update(tables)
+
+
+async def check_caches(request: Request, call_next):
+    """HTTP-middleware: сверить версии таблиц перед обработкой запроса."""
+    if cache_bus.due():
+        await run_in_threadpool(cache_bus.check)
+    return await call_next(request)
+
+
+# --- Версии таблиц растут вместе с записью ---
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_flush(session: Session, _flush_context) -> None:
+    tables = {
+        getattr(type(obj), "__tablename__", None)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    }
+    mark_tables_written(session, tables)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_after_commit(session: Session) -> None:
+    tables = session.info.pop("cache_tables", None)
+    if tables:
+        # свои кэши — сразу; соседним воркерам — push (если включён)
+        cache_bus.invalidate(tables)
+        cache_bus.publish(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop("cache_tables", None)
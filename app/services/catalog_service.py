@@ -0,0 +1,203 @@
+# app/services/catalog_service.py
+"""
+Справочники для админки: локации, типы программ, тренеры.
+
+Удаление запрещено (409), пока на сущность кто-то ссылается — занятия,
+тарифы, заявки: SQLite по умолчанию внешние ключи не проверяет, так что
+проверяем сами, а не полагаемся на IntegrityError.
+
+При шардировании (app/db/sharding.py) источник правды — primary: сессия
+сервиса всегда на нём (deps.get_catalog_db), а после commit строка
+копируется (upsert / delete по id) в каждый шард. Ссылки при удалении
+проверяются во всех шардах. Если копия в шард не записалась, это видно
+в логе; app/tools/split_shards.py досинхронизирует справочники.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, func, inspect, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.exceptions import AppError
+from app.db.sharding import PRIMARY_SHARD, get_shard_router
+from app.db.upsert import insert_for
+from app.models.class_session import ClassSession
+from app.models.lead import Lead
+from app.models.location import Location
+from app.models.membership import MembershipPlan
+from app.models.program_type import ProgramType
+from app.models.trainer import Trainer
+from app.repositories.location_repo import LocationRepository
+from app.repositories.program_type_repo import ProgramTypeRepository
+from app.repositories.trainer_repo import TrainerRepository
+from app.services.cache_bus import mark_tables_written
+
+logger = logging.getLogger("cohai")
+
+
+class CatalogService:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+        self.locations = LocationRepository(db)
+        self.program_types = ProgramTypeRepository(db)
+        self.trainers = TrainerRepository(db)
+
+    # --- общее ---
+
+    @staticmethod
+    def _shards() -> List[sessionmaker]:
+        """Фабрики сессий шардов с копиями справочников (без primary)."""
+        router = get_shard_router()
+        return [router.sessionmaker(key) for key in router.keys() if key != PRIMARY_SHARD]
+
+    def _references(self, columns: Dict[str, Any], value: int) -> Dict[str, int]:
+        """{"class_sessions": 3, ...} — кто и сколько раз ссылается на value (во всех шардах)."""
+        counts: Dict[str, int] = {}
+        shard_sessions = [factory() for factory in self._shards()]
+        try:
+            for db in (self.db, *shard_sessions):
+                for name, column in columns.items():
+                    count = db.scalar(select(func.count()).where(column == value)) or 0
+                    if count:
+                        counts[name] = counts.get(name, 0) + count
+        finally:
+            for db in shard_sessions:
+                db.close()
+        return counts
+
+    @staticmethod
+    def _row(obj) -> Dict[str, Any]:
+        return {attr.columns[0].name: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+    def _copy_to_shards(self, table, row: Dict[str, Any], deleted: bool = False) -> None:
+        """Повторить запись строки справочника в каждом шарде (после commit в primary)."""
+        for factory in self._shards():
+            try:
+                with factory() as db:
+                    if deleted:
+                        db.execute(delete(table).where(table.c.id == row["id"]))
+                    else:
+                        stmt = insert_for(db)(table).values(row)
+                        stmt = stmt.on_conflict_do_update(
+                            index_elements=[table.c.id],
+                            set_={name: stmt.excluded[name] for name in row if name != "id"},
+                        )
+                        db.execute(stmt)
+                    # запись мимо unit of work — версии для кэшей поднимаем сами
+                    mark_tables_written(db, {table.name})
+                    db.commit()
+            except Exception:
+                logger.exception("Catalog copy of %s id=%s to a shard failed", table.name, row["id"])
+
+    def _ensure_unused(self, code: str, entity: str, columns: Dict[str, Any], value: int) -> None:
+        references = self._references(columns, value)
+        if references:
+            raise AppError(
+                code=code,
+                message=f"{entity} id={value} is still referenced",
+                http_status=409,
+                extra={"references": references},
+            )
+
+    def _update(self, obj, data: Dict[str, Any]):
+        for field, value in data.items():
+            setattr(obj, field, value)
+        self.db.commit()
+        self.db.refresh(obj)
+        self._copy_to_shards(obj.__table__, self._row(obj))
+        return obj
+
+    def _create(self, repo, data: Dict[str, Any]):
+        obj = repo.add(data)
+        self.db.commit()
+        self.db.refresh(obj)
+        self._copy_to_shards(obj.__table__, self._row(obj))
+        return obj
+
+    def _delete(self, obj) -> None:
+        row = self._row(obj)  # после commit удалённый объект уже не прочитать
+        self.db.delete(obj)
+        self.db.commit()
+        self._copy_to_shards(obj.__table__, row, deleted=True)
+
+    # --- локации ---
+
+    def list_locations(self) -> List[Location]:
+        return self.locations.list_all()
+
+    def get_location(self, location_id: int) -> Location:
+        location = self.locations.get_by_id(location_id)
+        if location is None:
+            raise AppError(code="LOCATION_NOT_FOUND", message=f"Location id={location_id} not found", http_status=404)
+        return location
+
+    def create_location(self, data: Dict[str, Any]) -> Location:
+        return self._create(self.locations, data)
+
+    def update_location(self, location_id: int, data: Dict[str, Any]) -> Location:
+        return self._update(self.get_location(location_id), data)
+
+    def delete_location(self, location_id: int) -> None:
+        location = self.get_location(location_id)
+        self._ensure_unused("LOCATION_IN_USE", "Location", {
+            "class_sessions": ClassSession.location_id,
+            "membership_plans": MembershipPlan.location_id,
+            "leads": Lead.location_id,
+        }, location_id)
+        self._delete(location)
+
+    # --- типы программ ---
+
+    def list_program_types(self) -> List[ProgramType]:
+        return self.program_types.list_all()
+
+    def get_program_type(self, program_type_id: int) -> ProgramType:
+        program_type = self.program_types.get_by_id(program_type_id)
+        if program_type is None:
+            raise AppError(
+                code="PROGRAM_TYPE_NOT_FOUND",
+                message=f"Program type id={program_type_id} not found",
+                http_status=404,
+            )
+        return program_type
+
+    def create_program_type(self, data: Dict[str, Any]) -> ProgramType:
+        return self._create(self.program_types, data)
+
+    def update_program_type(self, program_type_id: int, data: Dict[str, Any]) -> ProgramType:
+        return self._update(self.get_program_type(program_type_id), data)
+
+    def delete_program_type(self, program_type_id: int) -> None:
+        program_type = self.get_program_type(program_type_id)
+        self._ensure_unused("PROGRAM_TYPE_IN_USE", "Program type", {
+            "class_sessions": ClassSession.program_type_id,
+            "leads": Lead.program_type_id,
+        }, program_type_id)
+        self._delete(program_type)
+
+    # --- тренеры ---
+
+    def list_trainers(self) -> List[Trainer]:
+        return self.trainers.list_all()
+
+    def get_trainer(self, trainer_id: int) -> Trainer:
+        trainer = self.trainers.get_by_id(trainer_id)
+        if trainer is None:
+            raise AppError(code="TRAINER_NOT_FOUND", message=f"Trainer id={trainer_id} not found", http_status=404)
+        return trainer
+
+    def create_trainer(self, data: Dict[str, Any]) -> Trainer:
+        return self._create(self.trainers, data)
+
+    def update_trainer(self, trainer_id: int, data: Dict[str, Any]) -> Trainer:
+        return self._update(self.get_trainer(trainer_id), data)
+
+    def delete_trainer(self, trainer_id: int) -> None:
+        trainer = self.get_trainer(trainer_id)
+        self._ensure_unused("TRAINER_IN_USE", "Trainer", {
+            "class_sessions": ClassSession.trainer_id,
+        }, trainer_id)
+        self._delete(trainer)
@@ -0,0 +1,84 @@
+# app/services/engine_cache.py
+"""
+Кэш значений, построенных из БД, — по одному набору на engine
+(primary, реплики, шарды, БД тестов).
+
+Сбрасывается целиком через invalidate() (её вешают на on_tables_changed,
+app/services/cache_bus.py). Значение, собранное «во время» сброса, не
+кэшируется: за этим следит счётчик поколений.
+
+Инвалидацию вызывает коммит в primary, а реплика может его ещё не
+получить: значение, собранное с неё сразу после сброса, было бы старым
+и жило бы до следующей записи. Поэтому у значения есть version (версия
+данных, прочитанная в той же транзакции), после сброса один раз читаем
+версию primary, и значение реплики с меньшей версией отдаём в запрос,
+но не кэшируем.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from typing import Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db import session as db_session
+
+T = TypeVar("T")
+
+
+class EngineCache(Generic[T]):
+    """
+    engine → {ключ → значение}; у значения есть атрибут version.
+
+    Args:
+        primary_version: версия данных в сессии primary — нижняя граница
+            для кэшируемых значений реплик.
+    """
+
+    def __init__(self, primary_version: Callable[[Session], int]) -> None:
+        self._primary_version = primary_version
+        # engine-ы тестов и отключённых реплик не держим
+        self._values: "weakref.WeakKeyDictionary[Engine, Dict[Hashable, T]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        # растёт при каждой инвалидации
+        self._generation = 0
+        # версия в primary после последней инвалидации (None — ещё не читали)
+        self._primary_floor: Optional[int] = None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._primary_floor = None
+            self._values.clear()
+
+    def _floor(self, generation: int) -> int:
+        """Версия primary, не ниже которой должно быть кэшируемое значение реплики."""
+        floor = self._primary_floor
+        if floor is None:
+            # читаем здесь, а не в самой инвалидации: её зовут и с event loop (cache_bus.drain)
+            with db_session.get_sessionmaker()() as primary:
+                floor = self._primary_version(primary)
+            with self._lock:
+                if generation == self._generation:
+                    self._primary_floor = floor
+        return floor
+
+    def get(self, db: Session, load: Callable[[Session], T], key: Hashable = None) -> T:
+        """Значение для БД этой сессии; load(db) — при первом обращении после сброса."""
+        bind = db.get_bind()
+        engine = getattr(bind, "engine", bind)
+        value = self._values.get(engine, {}).get(key)
+        if value is not None:
+            return value
+
+        generation = self._generation
+        value = load(db)
+        if db.info.get("replica") and value.version < self._floor(generation):
+            return value  # реплика отстаёт: отвечаем как есть, но не кэшируем
+        with self._lock:
+            if generation == self._generation:
+                self._values.setdefault(engine, {})[key] = value
+        return value
@@ -0,0 +1,189 @@
+# app/services/ical_feed.py
+"""
+iCalendar-фид расписания (RFC 5545) для подписки из календарей.
+
+Каждое занятие недельного шаблона — один VEVENT с RRULE:FREQ=WEEKLY,
+а не развёрнутые экземпляры: фид не растёт со временем и не
+устаревает через неделю.
+
+Готовые фиды кэшируются в памяти процесса по комбинации фильтров
+и паре версий: расписания (app/services/schedule_versions.py) и
+справочников (table_versions локаций, тренеров и программ — их имена
+попадают в VEVENT). Та же пара входит в ETag, так что переименование
+локации меняет и ETag, а не только сбрасывает кэш (cache_bus).
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.table_version_repo import sum_table_versions
+from app.services.cache_bus import on_tables_changed
+
+ICAL_WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+# Сколько VEVENT-ов отдавать одним куском стрима
+EVENTS_PER_CHUNK = 200
+
+# Справочники, чьи названия попадают в фид
+CATALOG_TABLES = ("locations", "trainers", "program_types")
+
+FeedKey = Tuple[Optional[int], Optional[int], Optional[int]]
+# (версия расписания, версия справочников)
+FeedVersion = Tuple[int, int]
+
+
+def get_catalog_version(db: Session) -> int:
+    """Сумма версий справочников: растёт при любой их записи."""
+    return sum_table_versions(db.connection(), CATALOG_TABLES)
+
+
+def escape_text(value: str) -> str:
+    """Экранирование TEXT-значений (RFC 5545, 3.3.11)."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """Перенос строк длиннее 75 октетов (RFC 5545, 3.1), не разрывая UTF-8."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts: List[str] = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # не режем многобайтовый символ: откатываемся к началу символа
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74  # у строк-продолжений первый октет — пробел
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _format_local(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def _first_occurrence(anchor: date, weekday: int) -> date:
+    """Ближайший к якорю (не раньше) день с нужным днём недели."""
+    return anchor + timedelta(days=(weekday - anchor.weekday()) % 7)
+
+
+def render_event(row: Sequence, stamp: str) -> str:
+    """
+    Один VEVENT из строки ClassSessionRepository.list_for_feed().
+
+    Время — «плавающее» локальное (без Z/TZID): календари показывают его
+    в зоне X-WR-TIMEZONE календаря.
+    """
+    (session_id, starts_at, weekday, start_time, end_time, capacity,
+     program_name, trainer_name, location_name, location_address) = row
+
+    first_day = _first_occurrence(starts_at.date() if starts_at else date.today(), weekday)
+    dt_start = datetime.combine(first_day, start_time)
+    dt_end = datetime.combine(first_day, end_time)
+    if dt_end <= dt_start:  # занятие через полночь
+        dt_end += timedelta(days=1)
+
+    summary = program_name if not trainer_name else f"{program_name} — {trainer_name}"
+    place = location_name if not location_address else f"{location_name}, {location_address}"
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:class-session-{session_id}@cohai",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_format_local(dt_start)}",
+        f"DTEND:{_format_local(dt_end)}",
+        f"RRULE:FREQ=WEEKLY;BYDAY={ICAL_WEEKDAYS[weekday]}",
+        f"SUMMARY:{escape_text(summary)}",
+        f"LOCATION:{escape_text(place)}",
+        f"DESCRIPTION:{escape_text(f'Capacity: {capacity}')}",
+        "END:VEVENT",
+    ]
+    return "".join(fold_line(line) for line in lines)
+
+
+def render_calendar(rows: Iterable[Sequence], name: str) -> Iterator[bytes]:
+    """VCALENDAR кусками по EVENTS_PER_CHUNK событий (для StreamingResponse)."""
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    header = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:-//{settings.APP_NAME}//Schedule//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+        f"X-WR-TIMEZONE:{settings.SCHEDULE_TIMEZONE}",
+    ]
+    yield "".join(fold_line(line) for line in header).encode("utf-8")
+
+    chunk: List[str] = []
+    for row in rows:
+        chunk.append(render_event(row, stamp))
+        if len(chunk) >= EVENTS_PER_CHUNK:
+            yield "".join(chunk).encode("utf-8")
+            chunk = []
+    chunk.append(fold_line("END:VCALENDAR"))
+    yield "".join(chunk).encode("utf-8")
+
+
+class FeedCache:
+    """LRU: фильтры фида → (версии расписания и справочников, тело фида)."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._items: "OrderedDict[FeedKey, Tuple[FeedVersion, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: FeedKey, version: FeedVersion) -> Optional[bytes]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] != version:
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def put(self, key: FeedKey, version: FeedVersion, body: bytes) -> None:
+        with self._lock:
+            self._items[key] = (version, body)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+feed_cache = FeedCache(settings.ICAL_CACHE_SIZE)
+on_tables_changed({"locations", "trainers", "program_types"}, feed_cache.clear)
+
+
+def render_and_cache(rows: List[Sequence], name: str, key: FeedKey, version: FeedVersion) -> Iterator[bytes]:
+    """Стримим фид и, если клиент дочитал его до конца, кладём в кэш."""
+    parts: List[bytes] = []
+    for part in render_calendar(rows, name):
+        parts.append(part)
+        yield part
+    feed_cache.put(key, version, b"".join(parts))
+
+
+def feed_etag(key: FeedKey, version: FeedVersion) -> str:
+    location_id, trainer_id, program_type_id = key
+    schedule_version, catalog_version = version
+    return (
+        f'W/"schedule-{schedule_version}-{catalog_version}-'
+        f'{location_id or 0}-{trainer_id or 0}-{program_type_id or 0}"'
+    )
@@ -0,0 +1,345 @@
+# app/services/job_scheduler.py
+"""
+Периодические задачи внутри процесса приложения (без внешнего cron).
+
+- триггеры: интервал (every=секунды) или cron-выражение из 5 полей
+  (минута час день месяц день-недели, время UTC);
+- моменты запуска («слоты») у всех воркеров одинаковые: cron — по
+  определению, интервалы — выровнены по эпохе;
+- каждый воркер просыпается к слоту (плюс случайный jitter, чтобы не
+  ломиться в БД одновременно) и пытается взять аренду слота в таблице
+  job_leases. Слот достаётся ровно одному воркеру во всём деплое,
+  остальные его пропускают (exclusive=False — выполнять в каждом воркере);
+- таймаут на запуск; синхронная задача идёт в потоке, и по таймауту
+  поток не прерывается — поэтому аренда в этом случае не снимается,
+  а истекает сама (timeout + JOB_LEASE_MARGIN_SECONDS);
+- счётчики jobs.<name>.runs/failed/timeouts/skipped/duration_ms —
+  в app.core.metrics, состояние задач — GET /admin/metrics/jobs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.repositories.job_lease_repo import JobLeaseRepository
+
+logger = logging.getLogger("cohai")
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+# --- триггеры ---
+
+class IntervalTrigger:
+    def __init__(self, seconds: float) -> None:
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Ближайший слот строго после moment (слоты кратны интервалу от эпохи)."""
+        elapsed = (moment - _EPOCH).total_seconds()
+        return _EPOCH + timedelta(seconds=(elapsed // self.seconds + 1) * self.seconds)
+
+    def __repr__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+def _cron_field(spec: str, lo: int, hi: int) -> Set[int]:
+    """"*/15", "1-5", "0,30", "8-20/2" → множество значений поля."""
+    values: Set[int] = set()
+    for part in spec.split(","):
+        body, _, step = part.partition("/")
+        if body == "*":
+            first, last = lo, hi
+        elif "-" in body:
+            first, last = (int(x) for x in body.split("-", 1))
+        else:
+            first = int(body)
+            last = hi if step else first
+        if not lo <= first <= last <= hi:
+            raise ValueError(f"Cron field {spec!r} out of range {lo}-{hi}")
+        values.update(range(first, last + 1, int(step) if step else 1))
+    return values
+
+
+class CronTrigger:
+    def __init__(self, expression: str) -> None:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        try:
+            self.minutes = _cron_field(fields[0], 0, 59)
+            self.hours = _cron_field(fields[1], 0, 23)
+            self.days = _cron_field(fields[2], 1, 31)
+            self.months = _cron_field(fields[3], 1, 12)
+            # 0 и 7 — воскресенье
+            self.weekdays = {day % 7 for day in _cron_field(fields[4], 0, 7)}
+        except ValueError as exc:
+            raise ValueError(f"Invalid cron expression {expression!r}: {exc}") from None
+        # как в cron: если ограничены и день месяца, и день недели — подходит любой
+        self._any_day = fields[2] != "*" and fields[4] != "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        return (day_ok or weekday_ok) if self._any_day else (day_ok and weekday_ok)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Ближайшая подходящая минута строго после moment."""
+        t = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = datetime(t.year + t.month // 12, t.month % 12 + 1, 1)
+            elif not self._day_matches(t):
+                t = datetime(t.year, t.month, t.day) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"Cron expression {self.expression!r} never fires")
+
+    def __repr__(self) -> str:
+        return f"cron {self.expression!r}"
+
+
+# --- задачи и планировщик ---
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        trigger,
+        timeout: float,
+        jitter: float = 0.0,
+        exclusive: bool = True,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.timeout = timeout
+        self.jitter = jitter
+        self.exclusive = exclusive
+        # состояние в этом воркере
+        self.next_run_at: Optional[datetime] = None
+        self.last_started_at: Optional[datetime] = None
+        self.last_status: Optional[str] = None
+        self.last_duration_ms: Optional[int] = None
+        self.last_error: Optional[str] = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trigger": repr(self.trigger),
+            "timeout": self.timeout,
+            "exclusive": self.exclusive,
+            "next_run_at": self.next_run_at,
+            "last_started_at": self.last_started_at,
+            "last_status": self.last_status,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+        }
+
+
+class JobScheduler:
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        lease_margin_seconds: Optional[float] = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self.lease_margin_seconds = lease_margin_seconds
+        # уникален на процесс: по нему аренда отличает «свой» слот от чужого
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def session_factory(self) -> Session:
+        if self._session_factory is None:
+            from app.db.session import get_sessionmaker
+
+            return get_sessionmaker()()
+        return self._session_factory()
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        *,
+        every: Optional[float] = None,
+        cron: Optional[str] = None,
+        timeout: float,
+        jitter: Optional[float] = None,
+        exclusive: bool = True,
+    ) -> Job:
+        """Зарегистрировать задачу (повторная регистрация имени заменяет её)."""
+        if (every is None) == (cron is None):
+            raise ValueError("Exactly one of every= or cron= is required")
+        trigger = IntervalTrigger(every) if every is not None else CronTrigger(cron)
+        job = Job(
+            name,
+            func,
+            trigger,
+            timeout,
+            settings.JOB_JITTER_SECONDS if jitter is None else jitter,
+            exclusive,
+        )
+        self.jobs[name] = job
+        return job
+
+    # --- аренда ---
+
+    def _acquire(self, job: Job, slot_at: datetime) -> bool:
+        margin = settings.JOB_LEASE_MARGIN_SECONDS if self.lease_margin_seconds is None else self.lease_margin_seconds
+        with self.session_factory() as db:
+            return JobLeaseRepository(db).acquire(job.name, self.holder, slot_at, job.timeout + margin)
+
+    def _release(self, job: Job, slot_at: datetime) -> None:
+        with self.session_factory() as db:
+            JobLeaseRepository(db).release(
+                job.name, self.holder, slot_at, job.last_status, job.last_duration_ms, job.last_error
+            )
+
+    # --- выполнение ---
+
+    async def run_once(self, job: Job, slot_at: datetime) -> str:
+        """Выполнить слот задачи, если он достался этому воркеру. Вернуть статус."""
+        if job.exclusive and not await asyncio.to_thread(self._acquire, job, slot_at):
+            metrics.inc(f"jobs.{job.name}.skipped")
+            return "skipped"
+
+        metrics.inc(f"jobs.{job.name}.runs")
+        job.last_started_at = datetime.utcnow()
+        job.last_error = None
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(job.func):
+                await asyncio.wait_for(job.func(), job.timeout)
+            else:
+                await asyncio.wait_for(asyncio.to_thread(job.func), job.timeout)
+            job.last_status = "ok"
+        except asyncio.TimeoutError:
+            job.last_status = "timeout"
+            metrics.inc(f"jobs.{job.name}.timeouts")
+            logger.error("Job %s timed out after %.0fs", job.name, job.timeout)
+        except Exception as exc:
+            job.last_status = "failed"
+            job.last_error = repr(exc)
+            metrics.inc(f"jobs.{job.name}.failed")
+            logger.exception("Job %s failed", job.name)
+        job.last_duration_ms = int((time.perf_counter() - started) * 1000)
+        metrics.inc(f"jobs.{job.name}.duration_ms", job.last_duration_ms)
+
+        # после таймаута поток задачи может ещё работать: аренду не снимаем
+        if job.exclusive and job.last_status != "timeout":
+            await asyncio.to_thread(self._release, job, slot_at)
+        return job.last_status
+
+    async def _run_forever(self, job: Job) -> None:
+        while True:
+            slot_at = job.trigger.next_after(datetime.utcnow())
+            job.next_run_at = slot_at
+            delay = (slot_at - datetime.utcnow()).total_seconds() + random.uniform(0, job.jitter)
+            await asyncio.sleep(max(delay, 0.0))
+            try:
+                await self.run_once(job, slot_at)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # сбой самой аренды (БД недоступна и т.п.) — ждём следующий слот
+                logger.exception("Job %s: scheduling iteration failed", job.name)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._run_forever(job), name=f"job:{job.name}"))
+        logger.info("Job scheduler started: %s", {name: repr(job.trigger) for name, job in self.jobs.items()})
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [job.status() for job in self.jobs.values()]
+
+    def leases(self) -> List[Dict[str, Any]]:
+        """Итоги последних запусков по всему деплою (из job_leases)."""
+        with self.session_factory() as db:
+            return [
+                {
+                    "name": lease.job_name,
+                    "holder": lease.holder,
+                    "slot_at": lease.slot_at,
+                    "expires_at": lease.expires_at,
+                    "started_at": lease.started_at,
+                    "finished_at": lease.finished_at,
+                    "duration_ms": lease.duration_ms,
+                    "status": lease.status,
+                    "last_error": lease.last_error,
+                }
+                for lease in JobLeaseRepository(db).list_all()
+            ]
+
+
+# --- стандартные задачи обслуживания ---
+
+# Outbox и роллап лидов лежат в БД шарда, поэтому задачи обходят все шарды
+
+def purge_delivered_outbox() -> int:
+    """Удалить outbox-сообщения, доставленные больше OUTBOX_RETENTION_DAYS назад."""
+    from app.db.sharding import get_shard_router
+    from app.repositories.outbox_repo import OutboxRepository
+
+    router = get_shard_router()
+    before = datetime.utcnow() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    purged = 0
+    for key in router.keys():
+        with router.sessionmaker(key)() as db:
+            count = OutboxRepository(db).purge_sent(before)
+            db.commit()
+        logger.info("Outbox cleanup [%s]: %s delivered message(s) purged", key, count)
+        purged += count
+    return purged
+
+
+def rebuild_lead_stats() -> int:
+    """Ночная сверка роллапа воронки лидов с таблицей leads."""
+    from app.db.sharding import get_shard_router
+    from app.services.analytics_service import AnalyticsService
+
+    router = get_shard_router()
+    chunks = 0
+    for key in router.keys():
+        with router.sessionmaker(key)() as db:
+            chunks += AnalyticsService(db).rebuild()
+    return chunks
+
+
+def register_default_jobs(scheduler: JobScheduler) -> None:
+    scheduler.add("outbox_cleanup", purge_delivered_outbox, every=3600, timeout=300)
+    if settings.LEAD_STATS_REBUILD_CRON:
+        scheduler.add("lead_stats_rebuild", rebuild_lead_stats, cron=settings.LEAD_STATS_REBUILD_CRON, timeout=1800)
+
+
+# Один планировщик на процесс (запускается из lifespan, см. app/main.py)
+job_scheduler = JobScheduler()
@@ -1,9 +1,12 @@
 # app/services/lead_service.py
 
+from typing import List
+
 from sqlalchemy.orm import Session
 
 from app.schemas.lead import LeadCreateGuestVisit
 from app.repositories.lead_repo import LeadRepository
+from app.repositories.outbox_repo import OutboxRepository
 from app.models.lead import Lead
 
 
@@ -16,21 +19,62 @@ class LeadService:
     def __init__(self, db: Session):
         self.db = db
         self.repo = LeadRepository(db)
+        self.outbox = OutboxRepository(db)
 
     def create_guest_visit(self, payload: LeadCreateGuestVisit) -> Lead:
-        data = payload.model_dump()   # <<--- добавить эту строку
-        lead = self.repo.create_guest_visit(data)
+        # Форма присылает имя/фамилию раздельно, в таблице — одно поле full_name.
+        # email и notes в модели Lead пока не хранятся.
+        full_name = " ".join(p for p in (payload.first_name, payload.last_name) if p)
+        data = {
+            "full_name": full_name,
+            "phone": payload.phone or "",
+            "source": "site",
+            "location_id": payload.location_id,
+            "program_type_id": payload.program_type_id,
+        }
+        lead = self.repo.add(data)
+
+        # Уведомление админам — через outbox в ТОЙ ЖЕ транзакции:
+        # запрос не ждёт SMTP/мессенджер, а событие не потеряется,
+        # даже если процесс упадёт сразу после commit.
+        self.outbox.add(
+            "lead.created",
+            {
+                "lead_id": lead.id,
+                "full_name": lead.full_name,
+                "phone": lead.phone,
+                "source": lead.source,
+                "location_id": lead.location_id,
+                "program_type_id": lead.program_type_id,
+                "created_at": lead.created_at,
+            },
+        )
+        self.db.commit()
+        self.db.refresh(lead)
         return lead
 
+    def list_leads(self) -> List[Lead]:
+        """
+        Список лидов для админ-панели (GET /api/v1/admin/leads/).
+        """
+        return self.repo.list_all()
 
     def get_all(self):
         """
         Получить всех лидов (например, для админ-панели).
         """
-        return self.repo.get_all()
+        return self.repo.list_all()
 
     def get(self, lead_id: int):
         return self.repo.get(lead_id)
 
+    def mark_processed(self, lead_id: int):
+        """
+        Отметить лид обработанным (и обновить роллап воронки).
+        Возвращает лид или None, если такого нет.
+        """
+        self.repo.mark_processed(lead_id)
+        return self.repo.get(lead_id)
+
     def delete(self, lead_id: int):
         return self.repo.delete(lead_id)
\ No newline at end of file
@@ -0,0 +1,156 @@
+# app/services/location_index.py
+"""
+Поиск ближайших студий: KD-дерево по координатам локаций в памяти процесса.
+
+Точки кладём на единичную сферу (x, y, z): евклидово расстояние между
+ними монотонно с расстоянием по большому кругу, поэтому обычное
+3D KD-дерево даёт точных k ближайших без искажений у полюсов и
+на 180-м меридиане.
+
+Индекс строится лениво при первом запросе и помечается устаревшим
+после записи в locations в любом воркере (app/services/cache_bus.py).
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.location import Location
+from app.services.cache_bus import on_tables_changed
+
+EARTH_RADIUS_KM = 6371.0088
+
+Point = Tuple[float, float, float]
+
+
+def to_unit_vector(lat: float, lon: float) -> Point:
+    phi, lam = math.radians(lat), math.radians(lon)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi))
+
+
+def chord_to_km(chord: float) -> float:
+    """Длина хорды единичной сферы → расстояние по поверхности Земли."""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+class KDTree:
+    """
+    Статическое 3D KD-дерево в плоских списках (узел = индекс точки).
+
+    items — произвольные объекты, соответствующие точкам (здесь id локаций).
+    """
+
+    def __init__(self, points: Sequence[Point], items: Sequence[int]) -> None:
+        self.points = list(points)
+        self.items = list(items)
+        n = len(self.points)
+        self.axis = [0] * n
+        self.left = [-1] * n
+        self.right = [-1] * n
+        self.root = self._build(list(range(n)), 0)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _build(self, indexes: List[int], depth: int) -> int:
+        if not indexes:
+            return -1
+        axis = depth % 3
+        indexes.sort(key=lambda i: self.points[i][axis])
+        mid = len(indexes) // 2
+        node = indexes[mid]
+        self.axis[node] = axis
+        self.left[node] = self._build(indexes[:mid], depth + 1)
+        self.right[node] = self._build(indexes[mid + 1:], depth + 1)
+        return node
+
+    def nearest(self, target: Point, k: int) -> List[Tuple[float, int]]:
+        """k ближайших: [(квадрат хорды, item), ...] по возрастанию расстояния."""
+        if k <= 0 or self.root == -1:
+            return []
+        heap: List[Tuple[float, int]] = []  # max-heap через отрицание
+        points, axes, left, right = self.points, self.axis, self.left, self.right
+
+        def visit(node: int) -> None:
+            point = points[node]
+            dist2 = (
+                (point[0] - target[0]) ** 2
+                + (point[1] - target[1]) ** 2
+                + (point[2] - target[2]) ** 2
+            )
+            if len(heap) < k:
+                heapq.heappush(heap, (-dist2, node))
+            elif dist2 < -heap[0][0]:
+                heapq.heapreplace(heap, (-dist2, node))
+
+            diff = target[axes[node]] - point[axes[node]]
+            near, far = (left[node], right[node]) if diff < 0 else (right[node], left[node])
+            if near != -1:
+                visit(near)
+            if far != -1 and (len(heap) < k or diff * diff < -heap[0][0]):
+                visit(far)
+
+        visit(self.root)
+        return sorted((-neg_dist2, self.items[node]) for neg_dist2, node in heap)
+
+
+class LocationIndex:
+    """Индекс локаций с координатами + сами строки для ответа API."""
+
+    def __init__(self, locations: Sequence[Location]) -> None:
+        located = [loc for loc in locations if loc.latitude is not None and loc.longitude is not None]
+        self.locations = {loc.id: loc for loc in located}
+        self.tree = KDTree(
+            [to_unit_vector(loc.latitude, loc.longitude) for loc in located],
+            [loc.id for loc in located],
+        )
+
+    def nearest(self, lat: float, lon: float, limit: int) -> List[Tuple[Location, float]]:
+        """[(локация, расстояние в км), ...] от ближайшей к дальней."""
+        return [
+            (self.locations[location_id], round(chord_to_km(math.sqrt(dist2)), 3))
+            for dist2, location_id in self.tree.nearest(to_unit_vector(lat, lon), limit)
+        ]
+
+
+_index: Optional[LocationIndex] = None
+_index_lock = threading.Lock()
+# растёт при каждой инвалидации: индекс, собранный «во время» изменения, не кэшируем
+_generation = 0
+
+
+def invalidate_location_index() -> None:
+    global _index, _generation
+    _generation += 1
+    _index = None
+
+
+def get_location_index(db: Session) -> LocationIndex:
+    """Текущий индекс; перестраивается из БД, если его сбросили."""
+    global _index
+    index = _index
+    if index is not None:
+        return index
+    with _index_lock:
+        if _index is not None:
+            return _index
+        generation = _generation
+        locations = db.query(Location).all()
+        # строки живут дольше сессии запроса — отвязываем их от неё
+        for location in locations:
+            db.expunge(location)
+        index = LocationIndex(locations)
+        if generation == _generation:
+            _index = index
+        return index
+
+
+# --- Инвалидация при изменении локаций (в том числе другим воркером) ---
+
+on_tables_changed({"locations"}, invalidate_location_index)
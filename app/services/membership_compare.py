@@ -0,0 +1,109 @@
+# app/services/membership_compare.py
+"""
+Сравнение абонементов локации: «хожу N раз в неделю — что выгоднее?».
+
+Для каждого активного тарифа:
+- ожидаемые посещения за срок = N * duration_days / 7, но не больше
+  visits_limit (если он задан — сверх лимита ходить нельзя);
+- цена посещения = price / посещения, цена дня = price / duration_days.
+
+Рейтинг — по цене посещения, затем по цене дня и id; первый — рекомендация.
+
+Колонки тарифов локации (numpy) строятся один раз и живут до записи в
+membership_plans в любом воркере (app/services/cache_bus.py); результат
+для каждого N вычисляется векторно по всем тарифам и запоминается там же.
+Каталог реплики, отстающей от primary по версии membership_plans, не
+кэшируется (app/services/engine_cache.py).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, NamedTuple, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.repositories.read_models import MembershipPlanRow, ReadModelRepository
+from app.repositories.table_version_repo import sum_table_versions
+from app.services.cache_bus import on_tables_changed
+from app.services.engine_cache import EngineCache
+
+
+class PlanScore(NamedTuple):
+    plan: MembershipPlanRow
+    rank: int
+    expected_visits: float
+    cost_per_visit: float
+    cost_per_day: float
+
+
+class PlanCatalog:
+    """Активные тарифы одной локации в колонках numpy."""
+
+    def __init__(self, plans: Sequence[MembershipPlanRow], version: int = 0) -> None:
+        import numpy as np  # numpy грузим лениво: импорт app.main остаётся дешёвым
+
+        self.version = version
+        self.plans: List[MembershipPlanRow] = [
+            plan for plan in plans if plan.is_active and plan.duration_days > 0
+        ]
+        n = len(self.plans)
+        self.ids = np.fromiter((p.id for p in self.plans), dtype=np.int64, count=n)
+        self.price = np.fromiter((p.price for p in self.plans), dtype=np.float64, count=n)
+        self.days = np.fromiter((p.duration_days for p in self.plans), dtype=np.float64, count=n)
+        self.limit = np.fromiter(
+            (np.inf if p.visits_limit is None else p.visits_limit for p in self.plans),
+            dtype=np.float64,
+            count=n,
+        )
+        self._scores: Dict[int, List[PlanScore]] = {}
+
+    def rank(self, visits_per_week: int) -> List[PlanScore]:
+        """Тарифы по возрастанию цены посещения (результат кэшируется на каталог)."""
+        scores = self._scores.get(visits_per_week)
+        if scores is not None:
+            return scores
+
+        import numpy as np
+
+        visits = np.minimum(visits_per_week * self.days / 7.0, self.limit)
+        with np.errstate(divide="ignore"):
+            per_visit = np.where(visits > 0, self.price / visits, np.inf)
+        per_day = self.price / self.days
+        order = np.lexsort((self.ids, per_day, per_visit))
+
+        scores = [
+            PlanScore(self.plans[i], rank, round(float(visits[i]), 1), round(float(per_visit[i]), 2),
+                      round(float(per_day[i]), 2))
+            for rank, i in enumerate(order.tolist(), start=1)
+        ]
+        self._scores[visits_per_week] = scores
+        return scores
+
+
+PLAN_TABLES = ("membership_plans",)
+
+
+def _primary_version(primary: Session) -> int:
+    return sum_table_versions(primary.connection(), PLAN_TABLES)
+
+
+# engine → {location_id → каталог}
+_cache: "EngineCache[PlanCatalog]" = EngineCache(_primary_version)
+
+
+def invalidate_plan_catalogs() -> None:
+    _cache.invalidate()
+
+
+def _load_catalog(db: Session, location_id: int) -> PlanCatalog:
+    # версия и строки — в одной транзакции сессии
+    version = sum_table_versions(db.connection(), PLAN_TABLES)
+    return PlanCatalog(ReadModelRepository(db).list_memberships(location_id=location_id), version)
+
+
+def get_plan_catalog(db: Session, location_id: int) -> PlanCatalog:
+    """Каталог тарифов локации для БД этой сессии; строится при первом обращении."""
+    return _cache.get(db, lambda session: _load_catalog(session, location_id), key=location_id)
+
+
+on_tables_changed(PLAN_TABLES, invalidate_plan_catalogs)
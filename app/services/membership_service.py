@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session
 
 from app.models.membership import MembershipPlan
 from app.repositories.membership_repo import MembershipRepository
+from app.repositories.read_models import MembershipPlanRow, ReadModelRepository
+from app.services.membership_compare import PlanScore, get_plan_catalog
 
 
 class MembershipService:
@@ -40,6 +42,20 @@ class MembershipService:
         """
         return self.repo.list_all(location_id=location_id, only_active=only_active)
 
+    def list_public(self, location_id: Optional[int] = None) -> List[MembershipPlanRow]:
+        """
+        Тарифы для публичного /memberships — плоские строки без ORM
+        (см. app.repositories.read_models).
+        """
+        return ReadModelRepository(self.db).list_memberships(location_id=location_id)
+
+    def compare(self, location_id: int, visits_per_week: int) -> List[PlanScore]:
+        """
+        Активные тарифы локации по возрастанию цены посещения
+        (см. app.services.membership_compare).
+        """
+        return get_plan_catalog(self.db, location_id).rank(visits_per_week)
+
     def get(self, plan_id: int) -> Optional[MembershipPlan]:
         """
         Получить один тариф по id.
@@ -0,0 +1,82 @@
+# app/services/notifications.py
+from __future__ import annotations
+
+import json
+import logging
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Protocol
+
+logger = logging.getLogger("cohai")
+
+
+class NotificationSink(Protocol):
+    """
+    Куда доставляются события из outbox.
+
+    send() должен бросить исключение, если доставка не удалась —
+    тогда диспетчер повторит попытку с backoff.
+    """
+
+    name: str
+
+    def send(self, topic: str, payload: Dict[str, Any]) -> None: ...
+
+
+class LogSink:
+    """Пишет событие в лог приложения (по умолчанию)."""
+
+    name = "log"
+
+    def send(self, topic: str, payload: Dict[str, Any]) -> None:
+        logger.info("Notification %s: %s", topic, payload)
+
+
+class StdoutSink:
+    """JSON-строка в stdout — удобно при локальной отладке."""
+
+    name = "stdout"
+
+    def send(self, topic: str, payload: Dict[str, Any]) -> None:
+        sys.stdout.write(json.dumps({"topic": topic, "payload": payload}, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
+class FileSink:
+    """Дописывает события в JSONL-файл — заглушка SMTP/мессенджера для тестов."""
+
+    name = "file"
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def send(self, topic: str, payload: Dict[str, Any]) -> None:
+        line = json.dumps({"topic": topic, "payload": payload}, ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+
+
+def build_sinks(spec: str) -> List[NotificationSink]:
+    """
+    Собрать синки из строки настроек, например:
+        "log"  |  "stdout"  |  "file:logs/notifications.jsonl,log"
+    """
+    sinks: List[NotificationSink] = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        kind, _, arg = item.partition(":")
+        if kind == "log":
+            sinks.append(LogSink())
+        elif kind == "stdout":
+            sinks.append(StdoutSink())
+        elif kind == "file":
+            sinks.append(FileSink(arg or "logs/notifications.jsonl"))
+        else:
+            raise ValueError(f"Unknown notification sink: {item!r}")
+    return sinks
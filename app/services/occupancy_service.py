@@ -0,0 +1,326 @@
+# app/services/occupancy_service.py
+"""
+Загрузка занятий (occupancy / utilization) по локации × дню недели × часу.
+
+Бронирований в системе пока нет, поэтому спрос считаем по заявкам на
+гостевой визит: каждый лид «приходит» на ближайшее после его создания
+активное занятие той же локации и программы (с переходом на следующую
+неделю). Предложение — вместимость недельного шаблона ClassSession.
+
+Все вычисления — на массивах numpy (searchsorted + bincount), без циклов
+по занятиям и лидам. Спрос по каждой неделе кэшируется в памяти
+процесса: завершённые недели — насовсем, текущая — на
+OCCUPANCY_CURRENT_WEEK_TTL_SECONDS.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time as time_module
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.class_session_repo import ClassSessionRepository
+from app.repositories.lead_repo import LeadRepository
+from app.services.reference_cache import get_reference_data
+
+HOURS = 24
+CELLS_PER_LOCATION = 7 * HOURS  # день недели × час
+MINUTES_PER_WEEK = 7 * 24 * 60
+
+# Сколько недель держать в кэше (≈ пять лет истории)
+WEEK_CACHE_SIZE = 260
+
+
+def week_start(day: date) -> date:
+    """Понедельник недели, в которую попадает `day`."""
+    return day - timedelta(days=day.weekday())
+
+
+class WeeklySlots:
+    """
+    Недельный шаблон активных занятий в колоночном виде.
+
+    Занятия отсортированы по (локация, программа, минута недели) —
+    это позволяет привязывать лидов к занятиям через searchsorted.
+    Ячейки индексируются компактным номером локации (позиция в
+    location_ids), а не её id: при разреженных id (1000, 2500, …)
+    массивы спроса не раздуваются.
+    """
+
+    def __init__(self, rows: List[Tuple[int, int, int, time, int]]) -> None:
+        import numpy as np  # numpy грузим лениво: импорт app.main остаётся дешёвым
+
+        location, program, weekday, start, capacity = (list(col) for col in zip(*rows)) if rows else ([],) * 5
+        location = np.array(location, dtype=np.int64)
+        program = np.array(program, dtype=np.int64)
+        weekday = np.array(weekday, dtype=np.int64)
+        hour = np.array([t.hour for t in start], dtype=np.int64)
+        minute = weekday * 1440 + hour * 60 + np.array([t.minute for t in start], dtype=np.int64)
+
+        self.location_ids, location = np.unique(location, return_inverse=True)
+        self.locations = len(self.location_ids)
+        self.programs = int(program.max()) + 1 if rows else 0
+
+        key = location * self.programs + program
+        order = np.lexsort((minute, key))
+        self.key = key[order]
+        self.combined = self.key * MINUTES_PER_WEEK + minute[order]
+        self.cell = (location * CELLS_PER_LOCATION + weekday * HOURS + hour)[order]
+        self.capacity = np.bincount(
+            self.cell, weights=np.array(capacity, dtype=np.float64)[order], minlength=self.size
+        )
+        # отпечаток шаблона: поменялось расписание → кэш спроса невалиден
+        self.digest = hashlib.blake2b(
+            self.location_ids.tobytes() + self.combined.tobytes() + self.capacity.tobytes(), digest_size=16
+        ).hexdigest()
+
+    @property
+    def size(self) -> int:
+        return self.locations * CELLS_PER_LOCATION
+
+    def location_index(self, location):
+        """Компактные номера локаций для массива id (-1 — у локации нет занятий)."""
+        import numpy as np
+
+        pos = np.searchsorted(self.location_ids, location)
+        clipped = np.minimum(pos, max(self.locations - 1, 0))
+        found = (pos < self.locations) & (self.location_ids[clipped] == location) if self.locations else False
+        return np.where(found, pos, -1)
+
+    def attribute(self, location, program, minute):
+        """
+        Привязать лидов к ближайшему занятию их локации и программы.
+
+        Args:
+            location, program, minute: массивы (минута — от начала недели).
+
+        Returns:
+            (ячейки занятий для привязанных лидов, маска привязанных).
+        """
+        import numpy as np
+
+        n = len(self.combined)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(len(location), dtype=bool)
+        location = self.location_index(location)
+        valid = (location >= 0) & (program >= 0) & (program < self.programs)
+
+        key = np.where(valid, location * self.programs + program, -1)
+        # первое занятие ключа на неделе — для переноса «на следующую неделю»
+        first = np.searchsorted(self.combined, key * MINUTES_PER_WEEK, side="left")
+        has_sessions = valid & (first < n) & (self.key[np.minimum(first, n - 1)] == key)
+
+        idx = np.searchsorted(self.combined, key * MINUTES_PER_WEEK + minute, side="left")
+        wrap = (idx >= n) | (self.key[np.minimum(idx, n - 1)] != key)
+        idx = np.where(wrap, first, idx)
+        return self.cell[idx[has_sessions]], has_sessions
+
+
+class _WeekCache:
+    """
+    LRU: (понедельник, отпечаток шаблона) → (спрос по ячейкам, непривязанные лиды).
+
+    У записи может быть срок жизни (для текущей недели).
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._items: "OrderedDict[Tuple[date, str], Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            demand, unmatched, expires_at = item
+            if expires_at is not None and expires_at <= time_module.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return demand, unmatched
+
+    def put(self, key, demand, unmatched: int, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            expires_at = time_module.monotonic() + ttl if ttl is not None else None
+            self._items[key] = (demand, unmatched, expires_at)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_week_cache = _WeekCache(WEEK_CACHE_SIZE)
+
+
+def clear_occupancy_cache() -> None:
+    """Сбросить кэш (например, после импорта лидов задним числом)."""
+    _week_cache.clear()
+
+
+class OccupancyService:
+    """Отчёты о загрузке занятий: тепловые карты и пере-/недогруженные слоты."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.sessions = ClassSessionRepository(db)
+        self.leads = LeadRepository(db)
+
+    # --- расчёт ---
+
+    def _weekly_demand(self, slots: WeeklySlots, weeks: List[date]):
+        """Спрос по ячейкам для каждой недели: массив (len(weeks), slots.size) + непривязанные."""
+        import numpy as np
+
+        demand = np.zeros((len(weeks), slots.size), dtype=np.float64)
+        unmatched = np.zeros(len(weeks), dtype=np.int64)
+        current_week = week_start(datetime.utcnow().date())
+
+        missing = []
+        for i, week in enumerate(weeks):
+            cached = _week_cache.get((week, slots.digest)) if week <= current_week else None
+            if cached is None:
+                missing.append(i)
+            else:
+                demand[i], unmatched[i] = cached
+        if not missing:
+            return demand, unmatched
+
+        # Один запрос на весь диапазон недостающих недель, дальше — раскладка массивами
+        origin = weeks[missing[0]]
+        last = weeks[missing[-1]] + timedelta(days=7)
+        rows = self.leads.list_demand(
+            datetime.combine(origin, time(0, 0)), datetime.combine(last, time(0, 0))
+        )
+        span = (last - origin).days // 7
+        computed = np.zeros((span, slots.size), dtype=np.float64)
+        computed_unmatched = np.zeros(span, dtype=np.int64)
+        if rows:
+            location, program, minutes = (np.array(column, dtype=np.int64) for column in zip(*rows))
+            week_index = minutes // MINUTES_PER_WEEK
+            cells, matched = slots.attribute(location, program, minutes % MINUTES_PER_WEEK)
+            computed = np.bincount(
+                week_index[matched] * slots.size + cells, minlength=span * slots.size
+            ).reshape(span, slots.size).astype(np.float64)
+            computed_unmatched = np.bincount(week_index[~matched], minlength=span)
+
+        for i in missing:
+            offset = (weeks[i] - origin).days // 7
+            demand[i] = computed[offset]
+            unmatched[i] = computed_unmatched[offset]
+            if weeks[i] <= current_week:
+                ttl = settings.OCCUPANCY_CURRENT_WEEK_TTL_SECONDS if weeks[i] == current_week else None
+                _week_cache.put((weeks[i], slots.digest), computed[offset].copy(), int(unmatched[i]), ttl)
+        return demand, unmatched
+
+    def _totals(self, date_from: date, date_to: date):
+        """(шаблон, суммарный спрос по ячейкам, непривязанные лиды, число недель)."""
+        slots = WeeklySlots(self.sessions.list_active_slots())
+        first, last = week_start(date_from), week_start(date_to)
+        weeks = [first + timedelta(days=7 * i) for i in range(max(0, (last - first).days // 7 + 1))]
+        demand, unmatched = self._weekly_demand(slots, weeks)
+        return slots, demand.sum(axis=0), int(unmatched.sum()), len(weeks)
+
+    @staticmethod
+    def _utilization(demand, capacity, weeks: int):
+        import numpy as np
+
+        total_capacity = capacity * weeks
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(total_capacity > 0, demand / total_capacity, np.nan), total_capacity
+
+    # --- отчёты ---
+
+    def heatmap(self, location_id: int, date_from: date, date_to: date) -> Dict[str, Any]:
+        """
+        Матрицы 7×24 (день недели × час) для одной локации:
+        вместимость и спрос за период, загрузка = спрос / вместимость
+        (None там, где занятий нет).
+        """
+        import numpy as np
+
+        slots, demand, unmatched, weeks = self._totals(date_from, date_to)
+        utilization, capacity = self._utilization(demand, slots.capacity, weeks)
+
+        index = int(slots.location_index(location_id))
+        if index >= 0:
+            window = slice(index * CELLS_PER_LOCATION, (index + 1) * CELLS_PER_LOCATION)
+            capacity, demand, utilization = capacity[window], demand[window], utilization[window]
+        else:
+            capacity = demand = np.zeros(CELLS_PER_LOCATION)
+            utilization = np.full(CELLS_PER_LOCATION, np.nan)
+
+        return {
+            "location_id": location_id,
+            "location_name": get_reference_data(self.db).location_name(location_id),
+            "date_from": date_from,
+            "date_to": date_to,
+            "weeks": weeks,
+            "hours": list(range(HOURS)),
+            "capacity": capacity.reshape(7, HOURS).astype(int).tolist(),
+            "demand": demand.reshape(7, HOURS).astype(int).tolist(),
+            "utilization": [
+                [None if np.isnan(value) else round(float(value), 3) for value in row]
+                for row in utilization.reshape(7, HOURS)
+            ],
+            "unmatched_leads": unmatched,
+        }
+
+    def slots(
+        self,
+        date_from: date,
+        date_to: date,
+        over: float = 0.9,
+        under: float = 0.3,
+        location_id: Optional[int] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Перегруженные (загрузка ≥ over) и недогруженные (≤ under) слоты
+        локация × день недели × час, самые крайние первыми.
+        """
+        import numpy as np
+
+        slots, demand, _, weeks = self._totals(date_from, date_to)
+        utilization, capacity = self._utilization(demand, slots.capacity, weeks)
+
+        has_capacity = capacity > 0
+        if location_id is not None:
+            cell_location = np.arange(slots.size) // CELLS_PER_LOCATION
+            has_capacity &= cell_location == int(slots.location_index(location_id))
+
+        references = get_reference_data(self.db)
+
+        def describe(mask, descending: bool) -> List[Dict[str, Any]]:
+            cells = np.flatnonzero(mask)
+            order = np.argsort(utilization[cells], kind="stable")
+            cells = cells[order[::-1] if descending else order]
+            location_ids = slots.location_ids[cells // CELLS_PER_LOCATION]
+            return [
+                {
+                    "location_id": int(location),
+                    "location_name": references.location_name(int(location)),
+                    "weekday": int(cell % CELLS_PER_LOCATION // HOURS),
+                    "hour": int(cell % HOURS),
+                    "capacity": int(capacity[cell]),
+                    "demand": int(demand[cell]),
+                    "utilization": round(float(utilization[cell]), 3),
+                }
+                for cell, location in zip(cells, location_ids)
+            ]
+
+        return {
+            "over": describe(has_capacity & (utilization >= over), descending=True),
+            "under": describe(has_capacity & (utilization <= under), descending=False),
+        }
@@ -0,0 +1,111 @@
+# app/services/outbox_dispatcher.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.repositories.outbox_repo import OutboxRepository
+from app.services.notifications import NotificationSink
+
+logger = logging.getLogger("cohai")
+
+
+class OutboxDispatcher:
+    """
+    Фоновый разборщик outbox: забирает пачки сообщений,
+    отправляет их во все синки и помечает доставленными.
+
+    Ошибка любого синка → повтор через экспоненциальный backoff
+    (OUTBOX_BACKOFF_SECONDS * 2^attempts, с джиттером и потолком);
+    после OUTBOX_MAX_ATTEMPTS сообщение остаётся в таблице с last_error.
+
+    Outbox пишется в БД шарда вместе с лидом, поэтому диспетчер
+    разбирает одну БД (name — ключ шарда, для логов).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        sinks: List[NotificationSink],
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS,
+        backoff_seconds: float = settings.OUTBOX_BACKOFF_SECONDS,
+        lease_seconds: float = settings.OUTBOX_LEASE_SECONDS,
+        name: str = "primary",
+    ) -> None:
+        self.session_factory = session_factory
+        self.name = name
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.lease_seconds = lease_seconds
+
+    def retry_at(self, attempts: int) -> datetime:
+        if attempts >= self.max_attempts:
+            # больше не пытаемся: сообщение «паркуется» далеко в будущем
+            return datetime.max
+        delay = min(self.backoff_seconds * (2 ** (attempts - 1)), 3600.0)
+        delay *= random.uniform(0.8, 1.2)
+        return datetime.utcnow() + timedelta(seconds=delay)
+
+    def dispatch_once(self) -> int:
+        """Обработать одну пачку. Возвращает число взятых сообщений."""
+        with self.session_factory() as db:
+            repo = OutboxRepository(db)
+            batch = repo.claim_batch(self.batch_size, self.lease_seconds)
+            for message in batch:
+                try:
+                    payload = json.loads(message.payload)
+                    for sink in self.sinks:
+                        sink.send(message.topic, payload)
+                except Exception as exc:
+                    repo.mark_failed(message, repr(exc), self.retry_at(message.attempts + 1))
+                    metrics.inc("outbox.failed")
+                    logger.warning(
+                        "Outbox message %s (%s) failed, attempt %s: %r",
+                        message.id,
+                        message.topic,
+                        message.attempts,
+                        exc,
+                    )
+                else:
+                    repo.mark_sent(message)
+                    metrics.inc("outbox.sent")
+            db.commit()
+            return len(batch)
+
+    async def run_forever(self, poll_seconds: float = settings.OUTBOX_POLL_SECONDS) -> None:
+        """
+        Цикл для lifespan / отдельного процесса: пока есть сообщения —
+        разбираем пачки подряд, когда очередь пуста — спим poll_seconds.
+        """
+        logger.info("Outbox dispatcher started (shard=%s, sinks=%s)", self.name, [s.name for s in self.sinks])
+        while True:
+            try:
+                taken = await asyncio.to_thread(self.dispatch_once)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox dispatcher iteration failed (shard=%s)", self.name)
+                taken = 0
+            if taken < self.batch_size:
+                await asyncio.sleep(poll_seconds)
+
+
+def build_shard_dispatchers() -> List[OutboxDispatcher]:
+    """По диспетчеру на каждый шард (app/db/sharding.py); синки общие."""
+    from app.db.sharding import get_shard_router
+    from app.services.notifications import build_sinks
+
+    router = get_shard_router()
+    sinks = build_sinks(settings.OUTBOX_SINKS)
+    return [OutboxDispatcher(router.sessionmaker(key), sinks, name=key) for key in router.keys()]
@@ -0,0 +1,126 @@
+# app/services/reference_cache.py
+"""
+Справочники в памяти процесса: локации, типы программ, тренеры.
+
+Их единицы-сотни строк, а нужны они почти в каждом запросе — проверить,
+что location_id существует, подставить название в ответ. Держим снимок
+всех трёх таблиц (три запроса целиком) и отвечаем поиском в dict.
+
+Снимок сбрасывается при записи в любую из таблиц в любом воркере
+(app/services/cache_bus.py) и строится заново при следующем обращении.
+Снимков может быть несколько — по одному на engine (primary, реплики).
+
+Снимок реплики, отстающей от primary, не кэшируется (app/services/engine_cache.py):
+версия справочников — сумма их table_versions.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.location import Location
+from app.models.program_type import ProgramType
+from app.models.trainer import Trainer
+from app.repositories.table_version_repo import sum_table_versions
+from app.services.cache_bus import on_tables_changed
+from app.services.engine_cache import EngineCache
+
+REFERENCE_TABLES = ("locations", "program_types", "trainers")
+
+
+class LocationRef(NamedTuple):
+    id: int
+    name: str
+    address: Optional[str]
+
+
+class ProgramTypeRef(NamedTuple):
+    id: int
+    name: str
+    is_group: bool
+
+
+class TrainerRef(NamedTuple):
+    id: int
+    full_name: str
+
+
+class ReferenceData:
+    """Неизменяемый снимок справочников: id → строка."""
+
+    __slots__ = ("locations", "program_types", "trainers", "version")
+
+    def __init__(
+        self,
+        locations: Dict[int, LocationRef],
+        program_types: Dict[int, ProgramTypeRef],
+        trainers: Dict[int, TrainerRef],
+        version: int = 0,
+    ) -> None:
+        self.locations = locations
+        self.program_types = program_types
+        self.trainers = trainers
+        self.version = version
+
+    @classmethod
+    def load(cls, db: Session) -> "ReferenceData":
+        # версия и строки — в одной транзакции сессии
+        conn = db.connection()
+        return cls(
+            {row.id: LocationRef(*row) for row in conn.execute(select(Location.id, Location.name, Location.address))},
+            {row.id: ProgramTypeRef(*row) for row in conn.execute(select(ProgramType.id, ProgramType.name, ProgramType.is_group))},
+            {row.id: TrainerRef(*row) for row in conn.execute(select(Trainer.id, Trainer.full_name))},
+            sum_table_versions(conn, REFERENCE_TABLES),
+        )
+
+    def has_location(self, location_id: int) -> bool:
+        return location_id in self.locations
+
+    def location_name(self, location_id: int) -> Optional[str]:
+        ref = self.locations.get(location_id)
+        return ref.name if ref is not None else None
+
+    def program_type_name(self, program_type_id: int) -> Optional[str]:
+        ref = self.program_types.get(program_type_id)
+        return ref.name if ref is not None else None
+
+    def trainer_name(self, trainer_id: int) -> Optional[str]:
+        ref = self.trainers.get(trainer_id)
+        return ref.full_name if ref is not None else None
+
+    def missing(
+        self,
+        location_id: Optional[int] = None,
+        program_type_id: Optional[int] = None,
+        trainer_id: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """Какие из переданных (не None) id не существуют: {"trainer_id": 7}."""
+        checks = (
+            ("location_id", location_id, self.locations),
+            ("program_type_id", program_type_id, self.program_types),
+            ("trainer_id", trainer_id, self.trainers),
+        )
+        return {field: value for field, value, known in checks if value is not None and value not in known}
+
+
+def _primary_version(primary: Session) -> int:
+    return sum_table_versions(primary.connection(), REFERENCE_TABLES)
+
+
+# engine → снимок
+_cache: "EngineCache[ReferenceData]" = EngineCache(_primary_version)
+
+
+def invalidate_reference_data() -> None:
+    _cache.invalidate()
+
+
+def get_reference_data(db: Session) -> ReferenceData:
+    """Снимок справочников для БД этой сессии; строится при первом обращении."""
+    return _cache.get(db, ReferenceData.load)
+
+
+on_tables_changed(REFERENCE_TABLES, invalidate_reference_data)
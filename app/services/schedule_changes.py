@@ -0,0 +1,217 @@
+# app/services/schedule_changes.py
+"""
+Лента изменений расписания для клиентов: SSE-стрим и long-poll.
+
+Один фоновый опрос на воркер (а не на каждого клиента): раз в
+SCHEDULE_POLL_SECONDS читаем все версии из schedule_versions (каждую —
+из шарда её локации, app/db/sharding.py) и рассылаем
+изменившиеся подписчикам. Коммиты этого же процесса будят опрос сразу,
+изменения из соседних воркеров приходят не позже чем через интервал опроса.
+С push-уведомлениями cache_bus изменения соседей тоже будят опрос сразу.
+Опрос запускается с первым подписчиком и останавливается с последним.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.schedule_version_repo import ScheduleVersionRepository
+from app.services.cache_bus import on_tables_changed
+from app.services.schedule_versions import on_schedule_commit
+
+logger = logging.getLogger("cohai")
+
+# (location_id, version)
+Change = Tuple[int, int]
+
+
+class ScheduleChangeBroadcaster:
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None) -> None:
+        self._session_factory = session_factory
+        self._versions: Dict[int, int] = {}
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    # --- версии ---
+
+    def _load_versions(self) -> Dict[int, int]:
+        if self._session_factory is not None:
+            with self._session_factory() as db:
+                return ScheduleVersionRepository(db).list_all()
+
+        from app.db.sharding import get_shard_router
+
+        # версия локации живёт в её шарде; читаем с primary шарда,
+        # а не с реплики: реплика может отставать
+        router = get_shard_router()
+        versions: Dict[int, int] = {}
+        for key in router.keys():
+            with router.sessionmaker(key)() as db:
+                for location_id, version in ScheduleVersionRepository(db).list_all().items():
+                    if router.shard_for_location(location_id) == key:
+                        versions[location_id] = version
+        return versions
+
+    def _load_version(self, location_id: int) -> int:
+        if self._session_factory is not None:
+            with self._session_factory() as db:
+                return ScheduleVersionRepository(db).get(location_id)
+
+        from app.db.sharding import get_shard_router
+
+        # одна строка с primary шарда локации — без обхода всех шардов
+        router = get_shard_router()
+        with router.sessionmaker(router.shard_for_location(location_id))() as db:
+            return ScheduleVersionRepository(db).get(location_id)
+
+    async def current(self) -> Dict[int, int]:
+        return await asyncio.to_thread(self._load_versions)
+
+    async def version(self, location_id: int) -> int:
+        return await asyncio.to_thread(self._load_version, location_id)
+
+    # --- подписка ---
+
+    def subscribe(self) -> asyncio.Queue:
+        """Очередь изменений (location_id, version) для одного клиента."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+        self._subscribers.add(queue)
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._wakeup is not None:
+            self._wakeup.set()  # опрос увидит, что слушать некому, и завершится
+
+    def notify_local_commit(self, _location_ids: Set[int]) -> None:
+        """Вызывается из потока запроса после коммита — будим опрос."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def _publish(self, change: Change) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                # медленный клиент: важна только последняя версия
+                queue.get_nowait()
+            queue.put_nowait(change)
+
+    async def _run(self) -> None:
+        # Базы нет: первый опрос (сразу) разошлёт все версии, подписчики
+        # отбрасывают уже известные — так не теряются изменения между
+        # чтением клиентом текущей версии и стартом опроса.
+        self._versions = {}
+        self._wakeup.set()
+        try:
+            while self._subscribers:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.SCHEDULE_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                if not self._subscribers:
+                    break
+                try:
+                    versions = await self.current()
+                except Exception:  # БД недоступна — попробуем на следующем тике
+                    logger.exception("Schedule version poll failed")
+                    continue
+                for location_id, version in sorted(versions.items()):
+                    if version != self._versions.get(location_id):
+                        self._publish((location_id, version))
+                self._versions = versions
+        finally:
+            if self._task is asyncio.current_task():
+                self._task = None
+
+    async def stop(self) -> None:
+        task = self._task
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    # --- клиентские сценарии ---
+
+    async def wait_for_change(self, location_id: int, since: int, timeout: float) -> int:
+        """
+        Long-poll: вернуть версию локации, как только она станет != since
+        (или текущую по истечении timeout).
+        """
+        queue = self.subscribe()
+        try:
+            version = await self.version(location_id)
+            if version != since:
+                return version
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    changed_location, changed_version = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if changed_location == location_id and changed_version != since:
+                    return changed_version
+            return version
+        finally:
+            self.unsubscribe(queue)
+
+    async def stream(self, location_id: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Server-Sent Events: сначала текущие версии, затем каждое изменение.
+        Пустой комментарий раз в SCHEDULE_STREAM_HEARTBEAT_SECONDS держит
+        соединение живым через прокси.
+        """
+        queue = self.subscribe()
+        try:
+            sent: Dict[int, int] = {}
+            if location_id is not None:
+                current = {location_id: await self.version(location_id)}
+            else:
+                current = await self.current()
+            for change in sorted(current.items()):
+                sent[change[0]] = change[1]
+                yield format_event(change)
+
+            while True:
+                try:
+                    change = await asyncio.wait_for(queue.get(), settings.SCHEDULE_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                changed_location, version = change
+                if location_id is not None and changed_location != location_id:
+                    continue
+                if sent.get(changed_location) == version:
+                    continue
+                sent[changed_location] = version
+                yield format_event(change)
+        finally:
+            self.unsubscribe(queue)
+
+
+def format_event(change: Change) -> str:
+    location_id, version = change
+    data = json.dumps({"location_id": location_id, "version": version})
+    return f"event: schedule-version\nid: {location_id}:{version}\ndata: {data}\n\n"
+
+
+# Один broadcaster на процесс (воркер)
+schedule_changes = ScheduleChangeBroadcaster()
+on_schedule_commit(schedule_changes.notify_local_commit)
+on_tables_changed({"class_sessions"}, lambda: schedule_changes.notify_local_commit(set()))
@@ -0,0 +1,355 @@
+# app/services/schedule_import.py
+"""
+Импорт расписания сезона из CSV одной транзакцией.
+
+Формат (заголовок обязателен, порядок колонок любой):
+
+    id,location_id,program_type_id,trainer_id,weekday,start_time,end_time,capacity,is_active
+    ,1,1,3,mon,18:00,19:00,10,1
+    42,1,2,5,2,10:30,11:25,2,0
+
+- id — необязателен: с id обновляем это занятие, без id ищем существующее
+  по ключу (локация, день недели, начало, программа), иначе создаём новое;
+- weekday — 0..6 (0 = понедельник) или mon..sun;
+- membership_plan_id, is_active (по умолчанию 1) — необязательны.
+
+Порядок работы: разобрать и проверить ВСЕ строки (ссылки проверяются
+пачкой, по одному запросу на таблицу), найти конфликты (дубли в файле,
+пересечения занятий одного тренера), и только если всё чисто — записать
+одним executemany INSERT и одним executemany UPDATE.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.class_session import ClassSession
+from app.models.membership import MembershipPlan
+from app.repositories.class_session_repo import ClassSessionRepository
+from app.schemas.class_session import ScheduleImportIssue, ScheduleImportReport
+from app.services.cache_bus import mark_tables_written
+from app.services.reference_cache import get_reference_data
+from app.services.schedule_versions import mark_schedule_written
+
+REQUIRED_COLUMNS = ("location_id", "program_type_id", "trainer_id", "weekday", "start_time", "end_time", "capacity")
+OPTIONAL_COLUMNS = ("id", "membership_plan_id", "is_active")
+WEEKDAY_NAMES = {name: i for i, name in enumerate(("mon", "tue", "wed", "thu", "fri", "sat", "sun"))}
+
+# Колонки, которые импорт пишет в class_sessions
+WRITE_COLUMNS = (
+    "location_id", "program_type_id", "trainer_id", "membership_plan_id",
+    "weekday", "start_time", "end_time", "capacity", "is_active",
+)
+
+
+def session_anchor(weekday: int, start: time, end: time, season_start: date) -> Tuple[datetime, datetime]:
+    """starts_at/ends_at первого занятия сезона (первый такой день недели не раньше season_start)."""
+    day = season_start + timedelta(days=(weekday - season_start.weekday()) % 7)
+    starts_at = datetime.combine(day, start)
+    ends_at = datetime.combine(day, end)
+    if ends_at <= starts_at:
+        ends_at += timedelta(days=1)
+    return starts_at, ends_at
+
+
+@dataclass
+class ImportRow:
+    line: int
+    values: Dict[str, object]
+    existing: Optional[ClassSession] = None
+
+    @property
+    def key(self) -> Tuple:
+        v = self.values
+        return (v["location_id"], v["weekday"], v["start_time"], v["program_type_id"])
+
+
+@dataclass
+class ImportPlan:
+    rows: List[ImportRow] = field(default_factory=list)
+    errors: List[ScheduleImportIssue] = field(default_factory=list)
+    conflicts: List[ScheduleImportIssue] = field(default_factory=list)
+
+
+# --- разбор значений ---
+
+def _parse_int(raw: str) -> int:
+    return int(raw.strip())
+
+
+def _parse_optional_int(raw: str) -> Optional[int]:
+    return int(raw) if raw.strip() else None
+
+
+def _parse_weekday(raw: str) -> int:
+    value = raw.strip().lower()
+    weekday = WEEKDAY_NAMES.get(value[:3]) if not value.isdigit() else int(value)
+    if weekday is None or not 0 <= weekday <= 6:
+        raise ValueError(f"weekday must be 0..6 or mon..sun, got {raw!r}")
+    return weekday
+
+
+def _parse_time(raw: str) -> time:
+    return time.fromisoformat(raw.strip())
+
+
+def _parse_bool(raw: str) -> bool:
+    value = raw.strip().lower()
+    if value in ("", "1", "true", "yes", "y"):
+        return True
+    if value in ("0", "false", "no", "n"):
+        return False
+    raise ValueError(f"expected 1/0/true/false, got {raw!r}")
+
+
+PARSERS = {
+    "id": _parse_optional_int,
+    "location_id": _parse_int,
+    "program_type_id": _parse_int,
+    "trainer_id": _parse_int,
+    "membership_plan_id": _parse_optional_int,
+    "weekday": _parse_weekday,
+    "start_time": _parse_time,
+    "end_time": _parse_time,
+    "capacity": _parse_int,
+    "is_active": _parse_bool,
+}
+
+
+def _minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def import_location_ids(text: str) -> Set[int]:
+    """
+    location_id всех строк файла — без проверок (их делает импорт),
+    чтобы заранее выбрать шард (app/api/v1/deps.py).
+    """
+    ids: Set[int] = set()
+    for raw in csv.DictReader(io.StringIO(text.lstrip("﻿"))):
+        value = next((v for k, v in raw.items() if (k or "").strip() == "location_id"), None)
+        try:
+            ids.add(_parse_int(value or ""))
+        except ValueError:
+            continue
+    return ids
+
+
+class ScheduleImporter:
+    def __init__(self, db: Session, max_rows: int):
+        self.db = db
+        self.repo = ClassSessionRepository(db)
+        self.max_rows = max_rows
+
+    # --- 1. разбор ---
+
+    def parse(self, text: str) -> ImportPlan:
+        plan = ImportPlan()
+        reader = csv.DictReader(io.StringIO(text.lstrip("﻿")))
+        header = [name.strip() for name in (reader.fieldnames or [])]
+        missing = [name for name in REQUIRED_COLUMNS if name not in header]
+        if missing:
+            plan.errors.append(ScheduleImportIssue(
+                line=1, code="MISSING_COLUMNS", message=f"Missing columns: {', '.join(missing)}",
+            ))
+            return plan
+
+        for offset, raw in enumerate(reader):
+            line = offset + 2
+            if offset >= self.max_rows:
+                plan.errors.append(ScheduleImportIssue(
+                    line=line, code="TOO_MANY_ROWS", message=f"At most {self.max_rows} rows per import",
+                ))
+                break
+            raw = {(k or "").strip(): (v or "") for k, v in raw.items()}
+            values: Dict[str, object] = {}
+            for column in (*REQUIRED_COLUMNS, *OPTIONAL_COLUMNS):
+                try:
+                    values[column] = PARSERS[column](raw.get(column, ""))
+                except ValueError as exc:
+                    plan.errors.append(ScheduleImportIssue(
+                        line=line, code="INVALID_VALUE", message=f"{column}: {exc}",
+                    ))
+                    values = {}
+                    break
+            if not values:
+                continue
+            if values["capacity"] < 1:
+                plan.errors.append(ScheduleImportIssue(line=line, code="INVALID_VALUE", message="capacity must be >= 1"))
+                continue
+            if values["start_time"] == values["end_time"]:
+                plan.errors.append(ScheduleImportIssue(line=line, code="INVALID_VALUE", message="start_time == end_time"))
+                continue
+            plan.rows.append(ImportRow(line=line, values=values))
+        return plan
+
+    # --- 2. проверка ссылок и сопоставление с существующими занятиями ---
+
+    def _existing_ids(self, model, ids: Set[int]) -> Set[int]:
+        if not ids:
+            return set()
+        return set(self.db.scalars(select(model.id).where(model.id.in_(ids))))
+
+    def resolve(self, plan: ImportPlan) -> None:
+        # локации, программы, тренеры — из справочника в памяти, тарифы — одним запросом
+        references = get_reference_data(self.db)
+        plans = self._existing_ids(
+            MembershipPlan, {r.values["membership_plan_id"] for r in plan.rows if r.values["membership_plan_id"] is not None}
+        )
+        valid_rows = []
+        for row in plan.rows:
+            v = row.values
+            missing = references.missing(
+                location_id=v["location_id"], program_type_id=v["program_type_id"], trainer_id=v["trainer_id"],
+            )
+            if v["membership_plan_id"] is not None and v["membership_plan_id"] not in plans:
+                missing["membership_plan_id"] = v["membership_plan_id"]
+            if missing:
+                plan.errors.append(ScheduleImportIssue(
+                    line=row.line,
+                    code="UNKNOWN_REFERENCE",
+                    message="Unknown " + ", ".join(f"{field}={value}" for field, value in missing.items()),
+                ))
+            else:
+                valid_rows.append(row)
+        plan.rows = valid_rows
+
+        # существующие занятия: по id и по ключу — два запроса на весь файл
+        explicit_ids = {r.values["id"] for r in plan.rows if r.values["id"] is not None}
+        by_id = {s.id: s for s in self.db.scalars(select(ClassSession).where(ClassSession.id.in_(explicit_ids)))}
+        by_key: Dict[Tuple, ClassSession] = {}
+        for session in sorted(self.repo.list_by_locations({r.values["location_id"] for r in plan.rows}), key=lambda s: s.id):
+            by_key.setdefault((session.location_id, session.weekday, session.start_time, session.program_type_id), session)
+
+        seen_ids: Dict[int, int] = {}
+        seen_keys: Dict[Tuple, int] = {}
+        resolved = []
+        for row in plan.rows:
+            session_id = row.values["id"]
+            if session_id is not None:
+                row.existing = by_id.get(session_id)
+                if row.existing is None:
+                    plan.errors.append(ScheduleImportIssue(
+                        line=row.line, code="UNKNOWN_REFERENCE", message=f"Unknown class session id={session_id}",
+                    ))
+                    continue
+            else:
+                row.existing = by_key.get(row.key)
+
+            target_id = row.existing.id if row.existing is not None else None
+            if target_id is not None and target_id in seen_ids:
+                plan.errors.append(ScheduleImportIssue(
+                    line=row.line, code="DUPLICATE_ROW", other_line=seen_ids[target_id],
+                    message=f"Class session id={target_id} is updated twice",
+                ))
+                continue
+            if row.key in seen_keys:
+                plan.errors.append(ScheduleImportIssue(
+                    line=row.line, code="DUPLICATE_ROW", other_line=seen_keys[row.key],
+                    message="Same location, weekday, start_time and program_type as another row",
+                ))
+                continue
+            if target_id is not None:
+                seen_ids[target_id] = row.line
+            seen_keys[row.key] = row.line
+            resolved.append(row)
+        plan.rows = resolved
+
+    # --- 3. конфликты: один тренер в два места одновременно ---
+
+    def find_conflicts(self, plan: ImportPlan) -> None:
+        replaced = {row.existing.id for row in plan.rows if row.existing is not None}
+        # (trainer_id, weekday) → [(start, end, line, session_id)]
+        slots: Dict[Tuple[int, int], List[Tuple[int, int, Optional[int], Optional[int]]]] = defaultdict(list)
+
+        for row in plan.rows:
+            v = row.values
+            if v["is_active"]:
+                end = _minutes(v["end_time"]) if v["end_time"] > v["start_time"] else 24 * 60
+                slots[(v["trainer_id"], v["weekday"])].append((_minutes(v["start_time"]), end, row.line, None))
+
+        trainer_ids = {trainer_id for trainer_id, _ in slots}
+        for session in self.repo.list_by_trainers(trainer_ids):
+            if session.id in replaced or (session.trainer_id, session.weekday) not in slots:
+                continue
+            end = _minutes(session.end_time) if session.end_time > session.start_time else 24 * 60
+            slots[(session.trainer_id, session.weekday)].append(
+                (_minutes(session.start_time), end, None, session.id)
+            )
+
+        for (trainer_id, weekday), intervals in slots.items():
+            intervals.sort()
+            latest = intervals[0]
+            for current in intervals[1:]:
+                if current[0] < latest[1] and (current[2] is not None or latest[2] is not None):
+                    file_side, other = (current, latest) if current[2] is not None else (latest, current)
+                    plan.conflicts.append(ScheduleImportIssue(
+                        line=file_side[2],
+                        code="TRAINER_OVERLAP",
+                        message=f"Trainer id={trainer_id} has overlapping sessions on weekday {weekday}",
+                        other_line=other[2],
+                        other_session_id=other[3],
+                    ))
+                if current[1] > latest[1]:
+                    latest = current
+
+    # --- 4. запись ---
+
+    def apply(self, plan: ImportPlan, season_start: date) -> Tuple[int, int, int]:
+        inserts: List[Dict] = []
+        updates: List[Dict] = []
+        unchanged = 0
+        touched: Set[int] = set()
+
+        for row in plan.rows:
+            values = {column: row.values[column] for column in WRITE_COLUMNS}
+            values["starts_at"], values["ends_at"] = session_anchor(
+                values["weekday"], values["start_time"], values["end_time"], season_start,
+            )
+            existing = row.existing
+            if existing is None:
+                inserts.append(values)
+                touched.add(values["location_id"])
+            elif any(getattr(existing, column) != values[column] for column in WRITE_COLUMNS):
+                updates.append({"id": existing.id, **values})
+                touched.update({existing.location_id, values["location_id"]})
+            else:
+                unchanged += 1
+
+        self.repo.bulk_insert(inserts)
+        self.repo.bulk_update(updates)
+        # bulk-запись идёт мимо flush-событий — версии поднимаем сами
+        mark_schedule_written(self.db, touched)
+        if inserts or updates:
+            mark_tables_written(self.db, {"class_sessions"})
+        return len(inserts), len(updates), unchanged
+
+    def run(self, text: str, season_start: date, dry_run: bool, allow_conflicts: bool) -> ScheduleImportReport:
+        plan = self.parse(text)
+        if not any(issue.code == "MISSING_COLUMNS" for issue in plan.errors):
+            self.resolve(plan)
+            self.find_conflicts(plan)
+
+        report = ScheduleImportReport(
+            rows=len(plan.rows) + len({issue.line for issue in plan.errors}),
+            dry_run=dry_run,
+            errors=sorted(plan.errors, key=lambda issue: issue.line),
+            conflicts=sorted(plan.conflicts, key=lambda issue: issue.line),
+        )
+        if report.errors or (report.conflicts and not allow_conflicts):
+            return report
+
+        report.created, report.updated, report.unchanged = self.apply(plan, season_start)
+        if dry_run:
+            self.db.rollback()
+        else:
+            self.db.commit()
+        return report
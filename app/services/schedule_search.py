@@ -0,0 +1,151 @@
+# app/services/schedule_search.py
+"""
+Поиск занятий по всем локациям: «вечерний групповой стретчинг по будням
+где угодно в городе».
+
+Инвертированные индексы поверх снимка расписания (schedule_snapshot):
+на каждое значение атрибута (программа, тренер, локация, день недели) —
+битсет позиций занятий (Python int, бит i = занятие i). Запрос — OR
+внутри атрибута и AND между атрибутами, т.е. несколько операций над
+целыми длиной N/8 байт, независимо от сочетания фильтров.
+
+Позиции упорядочены по (день недели, начало, локация, id), поэтому:
+- занятия одного дня с началом в [from, to] — непрерывный диапазон бит
+  (границы — bisect), отдельный индекс по времени не нужен;
+- возрастающий порядок бит — уже готовая сортировка выдачи.
+
+Индекс строится один раз на снимок и живёт, пока жив снимок.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.repositories.read_models import ClassSessionRow
+from app.services.schedule_snapshot import ScheduleSnapshot, get_schedule_snapshot
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _bitset(mask) -> int:
+    """Булев массив numpy → int с битами на позициях True."""
+    import numpy as np
+
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+def _range_bits(start: int, stop: int) -> int:
+    """Биты [start, stop)."""
+    return ((1 << stop) - 1) ^ ((1 << start) - 1) if stop > start else 0
+
+
+class ScheduleSearchIndex:
+    def __init__(self, snapshot: ScheduleSnapshot) -> None:
+        import numpy as np
+
+        # позиция в индексе → строка снимка, в порядке выдачи
+        order = np.lexsort((
+            np.fromiter((row.id for row in snapshot.rows), dtype=np.int64, count=len(snapshot)),
+            snapshot.location,
+            snapshot.start_minute,
+            snapshot.weekday,
+        ))
+        self.rows: List[ClassSessionRow] = [snapshot.rows[i] for i in order.tolist()]
+        self.size = len(self.rows)
+
+        def index(column) -> Dict[int, int]:
+            values = column[order]
+            return {int(value): _bitset(values == value) for value in np.unique(values)}
+
+        self.by_location = index(snapshot.location)
+        self.by_program_type = index(snapshot.program_type)
+        self.by_trainer = index(snapshot.trainer)
+        self.active = _bitset(snapshot.active[order])
+        self.all = _range_bits(0, self.size)
+
+        # по дням недели: диапазон позиций и отсортированные минуты начала
+        weekdays = snapshot.weekday[order]
+        starts = snapshot.start_minute[order]
+        self.day_span: Dict[int, Tuple[int, int]] = {}
+        self.day_starts: Dict[int, List[int]] = {}
+        for weekday in range(7):
+            positions = np.flatnonzero(weekdays == weekday)
+            if len(positions):
+                first, last = int(positions[0]), int(positions[-1]) + 1
+                self.day_span[weekday] = (first, last)
+                self.day_starts[weekday] = starts[first:last].tolist()
+
+    @staticmethod
+    def _any_of(index: Dict[int, int], values: Optional[Iterable[int]]) -> Optional[int]:
+        if values is None:
+            return None
+        bits = 0
+        for value in values:
+            bits |= index.get(value, 0)
+        return bits
+
+    def _time_bits(self, weekdays: Optional[Iterable[int]], start_from: int, start_to: int) -> int:
+        bits = 0
+        for weekday in (range(7) if weekdays is None else weekdays):
+            span = self.day_span.get(weekday)
+            if span is None:
+                continue
+            starts = self.day_starts[weekday]
+            lo = bisect_left(starts, start_from)
+            hi = bisect_right(starts, start_to)
+            bits |= _range_bits(span[0] + lo, span[0] + hi)
+        return bits
+
+    def search(
+        self,
+        location_ids: Optional[Iterable[int]] = None,
+        program_type_ids: Optional[Iterable[int]] = None,
+        trainer_ids: Optional[Iterable[int]] = None,
+        weekdays: Optional[Iterable[int]] = None,
+        start_from: int = 0,
+        start_to: int = MINUTES_PER_DAY - 1,
+        limit: Optional[int] = None,
+    ) -> List[ClassSessionRow]:
+        """Активные занятия по фильтрам (None — без ограничения), по дню и времени начала."""
+        import numpy as np
+
+        bits = self.active
+        for part in (
+            self._any_of(self.by_location, location_ids),
+            self._any_of(self.by_program_type, program_type_ids),
+            self._any_of(self.by_trainer, trainer_ids),
+        ):
+            if part is not None:
+                bits &= part
+        if weekdays is not None or start_from > 0 or start_to < MINUTES_PER_DAY - 1:
+            bits &= self._time_bits(weekdays, start_from, start_to)
+        if not bits:
+            return []
+
+        raw = np.frombuffer(bits.to_bytes((self.size + 7) // 8, "little"), dtype=np.uint8)
+        positions = np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+        if limit is not None:
+            positions = positions[:limit]
+        rows = self.rows
+        return [rows[i] for i in positions.tolist()]
+
+
+_indexes: "weakref.WeakKeyDictionary[ScheduleSnapshot, ScheduleSearchIndex]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def get_search_index(db: Session) -> ScheduleSearchIndex:
+    """Индекс поиска для текущего снимка расписания (строится один раз на снимок)."""
+    snapshot = get_schedule_snapshot(db)
+    index = _indexes.get(snapshot)
+    if index is None:
+        with _lock:
+            index = _indexes.get(snapshot)
+            if index is None:
+                index = _indexes[snapshot] = ScheduleSearchIndex(snapshot)
+    return index
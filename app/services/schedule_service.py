@@ -1,33 +1,184 @@
 # app/services/schedule_service.py
 
+from datetime import date, time
+from typing import Any, Dict, List, Optional
+
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.exceptions import AppError
+from app.models.class_session import ClassSession
+from app.models.membership import MembershipPlan
 from app.repositories.class_session_repo import ClassSessionRepository
+from app.repositories.read_models import ClassSessionRow
+from app.schemas.class_session import ScheduleImportReport
+from app.services.reference_cache import get_reference_data
+from app.services.schedule_import import ScheduleImporter, session_anchor
+from app.services.schedule_search import MINUTES_PER_DAY, get_search_index
+from app.services.schedule_snapshot import get_schedule_snapshot
 
 
 class ScheduleService:
     """
     Сервис для работы с расписанием (ClassSession).
 
-    Сейчас минимальная версия: только то, что нужно для
-    публичного эндпоинта /schedule.
+    Публичное чтение (/schedule, iCalendar-фид) и админские
+    CRUD / импорт расписания сезона из CSV.
     """
 
     def __init__(self, db: Session):
         self.db = db
         self.repo = ClassSessionRepository(db)
 
-    def get_schedule_for_location(self, location_id: int):
+    def get_schedule_for_location(
+        self,
+        location_id: int,
+        weekday: Optional[int] = None,
+        program_type_id: Optional[int] = None,
+        trainer_id: Optional[int] = None,
+    ) -> List[ClassSessionRow]:
         """
         Вернуть список занятий для конкретной локации.
 
         Используется в:
             app.api.v1.public.get_schedule()
+
+        Отвечаем из снимка расписания в памяти (см.
+        app.services.schedule_snapshot), БД — только при его перестройке.
+        """
+        return get_schedule_snapshot(self.db).select(
+            location_id=location_id,
+            weekday=weekday,
+            program_type_id=program_type_id,
+            trainer_id=trainer_id,
+        )
+
+    def search(
+        self,
+        location_ids: Optional[List[int]] = None,
+        program_type_ids: Optional[List[int]] = None,
+        trainer_ids: Optional[List[int]] = None,
+        weekdays: Optional[List[int]] = None,
+        start_from: Optional[time] = None,
+        start_to: Optional[time] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
         """
-        # Если в репозитории есть более подходящий метод — можно
-        # использовать его. Пока делаем типовую заглушку.
-        return self.repo.list_for_location(location_id)
-        # Если такого метода нет, можно временно сделать, например:
-        # return self.repo.list_all_for_location(location_id)
-        # или даже:
-        # return self.repo.list_all()
+        Активные занятия по всем локациям (app.services.schedule_search)
+        с названиями локации, программы и тренера из справочника в памяти.
+        """
+        rows = get_search_index(self.db).search(
+            location_ids=location_ids,
+            program_type_ids=program_type_ids,
+            trainer_ids=trainer_ids,
+            weekdays=weekdays,
+            start_from=start_from.hour * 60 + start_from.minute if start_from else 0,
+            start_to=start_to.hour * 60 + start_to.minute if start_to else MINUTES_PER_DAY - 1,
+            limit=limit,
+        )
+        references = get_reference_data(self.db)
+        return [
+            {
+                **{name: getattr(row, name) for name in row.__slots__},
+                "location_name": references.location_name(row.location_id),
+                "program_type_name": references.program_type_name(row.program_type_id),
+                "trainer_name": references.trainer_name(row.trainer_id),
+            }
+            for row in rows
+        ]
+
+    def list_for_feed(
+        self,
+        location_id: Optional[int] = None,
+        trainer_id: Optional[int] = None,
+        program_type_id: Optional[int] = None,
+    ):
+        """Активные занятия для iCalendar-фида (см. app.services.ical_feed)."""
+        return self.repo.list_for_feed(location_id, trainer_id, program_type_id)
+
+    # --- админка ---
+
+    def list_sessions(self, location_id: int):
+        """Все занятия локации, включая неактивные."""
+        return sorted(self.repo.list_by_locations([location_id]), key=lambda s: (s.weekday, s.start_time, s.id))
+
+    def get_session(self, session_id: int) -> ClassSession:
+        session = self.repo.get_by_id(session_id)
+        if session is None:
+            raise AppError(
+                code="CLASS_SESSION_NOT_FOUND",
+                message=f"Class session id={session_id} not found",
+                http_status=404,
+            )
+        return session
+
+    def _validate(self, values: Dict[str, Any]) -> None:
+        """Проверка занятия целиком (после применения PATCH к текущим значениям)."""
+        if not 0 <= values["weekday"] <= 6:
+            raise AppError(code="INVALID_WEEKDAY", message="weekday must be 0..6", http_status=422)
+        if values["start_time"] == values["end_time"]:
+            raise AppError(code="INVALID_TIME", message="start_time must differ from end_time", http_status=422)
+        if values["capacity"] < 1:
+            raise AppError(code="INVALID_CAPACITY", message="capacity must be >= 1", http_status=422)
+        if values.get("trainer_id") is None:
+            raise AppError(code="TRAINER_REQUIRED", message="trainer_id is required", http_status=422)
+        missing = get_reference_data(self.db).missing(
+            location_id=values["location_id"],
+            program_type_id=values["program_type_id"],
+            trainer_id=values["trainer_id"],
+        )
+        plan_id = values.get("membership_plan_id")
+        if plan_id is not None and self.db.get(MembershipPlan, plan_id) is None:
+            missing["membership_plan_id"] = plan_id
+        if missing:
+            raise AppError(
+                code="UNKNOWN_REFERENCE",
+                message="Unknown " + ", ".join(f"{field}={value}" for field, value in missing.items()),
+                http_status=422,
+                extra=missing,
+            )
+
+    def create_session(self, data: Dict[str, Any], season_start: Optional[date] = None) -> ClassSession:
+        self._validate(data)
+        data = dict(data)
+        data["starts_at"], data["ends_at"] = session_anchor(
+            data["weekday"], data["start_time"], data["end_time"], season_start or date.today(),
+        )
+        session = self.repo.add(data)
+        self.db.commit()
+        self.db.refresh(session)
+        return session
+
+    def update_session(self, session_id: int, data: Dict[str, Any]) -> ClassSession:
+        session = self.get_session(session_id)
+        values = {column: getattr(session, column) for column in ClassSession.__table__.columns.keys()}
+        values.update(data)
+        self._validate(values)
+        if {"weekday", "start_time", "end_time"} & data.keys():
+            # якорь сдвигаем в пределах той же недели сезона
+            season_start = session.starts_at.date() if session.starts_at else date.today()
+            data = dict(data)
+            data["starts_at"], data["ends_at"] = session_anchor(
+                values["weekday"], values["start_time"], values["end_time"],
+                date.fromordinal(season_start.toordinal() - season_start.weekday()),
+            )
+        for column, value in data.items():
+            setattr(session, column, value)
+        self.db.commit()
+        self.db.refresh(session)
+        return session
+
+    def delete_session(self, session_id: int) -> None:
+        self.db.delete(self.get_session(session_id))
+        self.db.commit()
+
+    def import_csv(
+        self,
+        text: str,
+        season_start: date,
+        dry_run: bool = False,
+        allow_overlaps: bool = False,
+    ) -> ScheduleImportReport:
+        """Импорт недельного расписания сезона (см. app.services.schedule_import)."""
+        importer = ScheduleImporter(self.db, max_rows=settings.SCHEDULE_IMPORT_MAX_ROWS)
+        return importer.run(text, season_start, dry_run=dry_run, allow_conflicts=allow_overlaps)
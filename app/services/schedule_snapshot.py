@@ -0,0 +1,132 @@
+# app/services/schedule_snapshot.py
+"""
+Снимок расписания всех локаций в памяти процесса.
+
+Недельный шаблон — сотни-тысячи строк, поэтому /schedule отвечает из
+памяти, без обращения к БД:
+
+- колонки (локация, день недели, минуты начала/конца, тренер, программа,
+  вместимость, активность) — компактные массивы numpy;
+- строки отсортированы по (локация, id), у каждой локации — срез
+  [start, stop) в offsets: выборка по локации — это срез, а фильтры
+  внутри него — векторные маски;
+- готовые DTO ответа (ClassSessionRow) лежат рядом в том же порядке,
+  ответ собирается по индексам, без создания объектов на запрос.
+
+Снимок неизменяем. Запись в class_sessions в любом воркере сбрасывает
+его (app/services/cache_bus.py), следующий запрос строит новый — версия
+расписания и строки читаются в одной транзакции — и подменяет ссылку
+целиком: читатели старого снимка видят его согласованным до конца.
+
+Снимок реплики, которая ещё не догнала запись, вызвавшую сброс, не
+кэшируется (app/services/engine_cache.py).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.repositories.read_models import ClassSessionRow, ReadModelRepository
+from app.repositories.schedule_version_repo import ScheduleVersionRepository
+from app.services.cache_bus import on_tables_changed
+from app.services.engine_cache import EngineCache
+
+# Отсутствующий тренер / тариф в целочисленных колонках
+NO_ID = -1
+
+
+def _minutes(value) -> int:
+    return value.hour * 60 + value.minute
+
+
+class ScheduleSnapshot:
+    def __init__(self, rows: Sequence[ClassSessionRow], version: int = 0) -> None:
+        import numpy as np  # numpy грузим лениво: импорт app.main остаётся дешёвым
+
+        self.version = version
+        self.rows: List[ClassSessionRow] = sorted(rows, key=lambda row: (row.location_id, row.id))
+        n = len(self.rows)
+
+        def column(values, dtype):
+            return np.fromiter(values, dtype=dtype, count=n)
+
+        rows = self.rows
+        self.location = column((r.location_id for r in rows), np.int32)
+        self.weekday = column((r.weekday for r in rows), np.int8)
+        self.start_minute = column((_minutes(r.start_time) for r in rows), np.int16)
+        self.end_minute = column((_minutes(r.end_time) for r in rows), np.int16)
+        self.trainer = column((NO_ID if r.trainer_id is None else r.trainer_id for r in rows), np.int32)
+        self.program_type = column((r.program_type_id for r in rows), np.int32)
+        self.capacity = column((r.capacity for r in rows), np.int32)
+        self.active = column((bool(r.is_active) for r in rows), np.bool_)
+
+        location_ids, starts = np.unique(self.location, return_index=True)
+        stops = np.append(starts[1:], n)
+        self.offsets: Dict[int, Tuple[int, int]] = {
+            int(location_id): (int(start), int(stop))
+            for location_id, start, stop in zip(location_ids, starts, stops)
+        }
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def load(cls, db: Session) -> "ScheduleSnapshot":
+        # версия и строки — в одной транзакции сессии
+        version = ScheduleVersionRepository(db).total()
+        return cls(ReadModelRepository(db).list_all_sessions(), version)
+
+    def span(self, location_id: Optional[int]) -> Tuple[int, int]:
+        if location_id is None:
+            return 0, len(self.rows)
+        return self.offsets.get(location_id, (0, 0))
+
+    def select(
+        self,
+        location_id: Optional[int] = None,
+        weekday: Optional[int] = None,
+        program_type_id: Optional[int] = None,
+        trainer_id: Optional[int] = None,
+        active_only: bool = False,
+    ) -> List[ClassSessionRow]:
+        """Занятия по фильтрам (в порядке локация, id)."""
+        import numpy as np
+
+        start, stop = self.span(location_id)
+        if weekday is None and program_type_id is None and trainer_id is None and not active_only:
+            return self.rows[start:stop]
+
+        window = slice(start, stop)
+        mask = np.ones(stop - start, dtype=np.bool_)
+        if weekday is not None:
+            mask &= self.weekday[window] == weekday
+        if program_type_id is not None:
+            mask &= self.program_type[window] == program_type_id
+        if trainer_id is not None:
+            mask &= self.trainer[window] == trainer_id
+        if active_only:
+            mask &= self.active[window]
+        rows = self.rows
+        return [rows[start + i] for i in np.flatnonzero(mask).tolist()]
+
+
+def _primary_version(primary: Session) -> int:
+    return ScheduleVersionRepository(primary).total()
+
+
+# engine → снимок (primary, реплики и БД тестов — каждый со своим)
+_cache: "EngineCache[ScheduleSnapshot]" = EngineCache(_primary_version)
+
+
+def invalidate_schedule_snapshot() -> None:
+    _cache.invalidate()
+
+
+def get_schedule_snapshot(db: Session) -> ScheduleSnapshot:
+    """Текущий снимок расписания для БД этой сессии; строится при первом обращении."""
+    return _cache.get(db, ScheduleSnapshot.load)
+
+
+on_tables_changed({"class_sessions"}, invalidate_schedule_snapshot)
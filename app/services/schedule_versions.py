@@ -0,0 +1,76 @@
+# app/services/schedule_versions.py
+"""
+Версии расписания: счётчик на локацию (таблица schedule_versions),
+растёт в той же транзакции, что и любая запись ClassSession этой локации.
+
+Так версия общая для всех воркеров и переживает рестарты: клиенты
+перезапрашивают /schedule только при её изменении, кэши производных
+представлений (iCalendar-фиды и т.п.) включают её в ключ.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, List, Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.class_session import ClassSession
+from app.repositories.schedule_version_repo import ScheduleVersionRepository, bump_versions
+
+# Кого разбудить после коммита с изменением расписания (локально, в этом процессе)
+_commit_listeners: List[Callable[[Set[int]], None]] = []
+
+
+def get_schedule_version(db: Session, location_id: Optional[int] = None) -> int:
+    """Версия расписания локации; без location_id — всего расписания."""
+    repo = ScheduleVersionRepository(db)
+    return repo.total() if location_id is None else repo.get(location_id)
+
+
+def on_schedule_commit(listener: Callable[[Set[int]], None]) -> None:
+    """Подписаться на коммиты этого процесса, менявшие расписание."""
+    _commit_listeners.append(listener)
+
+
+def _touched_locations(obj: ClassSession) -> Set[int]:
+    """Локации, чьё расписание задел объект (при переносе — обе)."""
+    touched = {obj.location_id} if obj.location_id is not None else set()
+    history = inspect(obj).attrs.location_id.history
+    touched.update(value for value in history.deleted if value is not None)
+    return touched
+
+
+def mark_schedule_written(session: Session, location_ids: Set[int]) -> None:
+    """
+    Поднять версии локаций в текущей транзакции сессии.
+
+    Вызывается автоматически после flush-а ClassSession; set-based запись
+    мимо unit of work (bulk insert/update) должна вызвать её сама.
+    """
+    if location_ids:
+        bump_versions(session.connection(), location_ids)
+        session.info.setdefault("schedule_locations", set()).update(location_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_flush(session: Session, _flush_context) -> None:
+    # session.new/dirty/deleted и история атрибутов здесь ещё «до flush»
+    touched: Set[int] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, ClassSession):
+            touched.update(_touched_locations(obj))
+    mark_schedule_written(session, touched)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_after_commit(session: Session) -> None:
+    touched = session.info.pop("schedule_locations", None)
+    if touched:
+        for listener in _commit_listeners:
+            listener(touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop("schedule_locations", None)
@@ -0,0 +1,48 @@
+# app/tools/backfill_lead_stats.py
+"""
+Пересборка роллапа воронки лидов (lead_daily_stats) из таблицы leads.
+
+Идёт чанками по id лидов в одной транзакции: отчёты до commit видят
+прежний роллап, а запись новых лидов ждёт конца пересборки. Запускать
+из корня проекта:
+
+    python app/tools/backfill_lead_stats.py
+    python app/tools/backfill_lead_stats.py --chunk-size 50000
+"""
+
+from __future__ import annotations
+
+# ===== A. Фиксируем sys.path, чтобы `import app` всегда работал =====
+import sys
+from pathlib import Path
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[2]  # app/tools/backfill_lead_stats.py -> корень
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# ===== B. Остальной код =====
+
+import argparse
+import time
+
+from app.db.schema import ensure_schema
+from app.db.session import get_engine, get_sessionmaker
+from app.services.analytics_service import AnalyticsService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пересобрать lead_daily_stats.")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Лидов на один INSERT … SELECT.")
+    args = parser.parse_args()
+
+    ensure_schema(get_engine())
+    started = time.perf_counter()
+    with get_sessionmaker()() as db:
+        chunks = AnalyticsService(db).rebuild(chunk_size=args.chunk_size, log=print)
+    print(f"✅ Rollup rebuilt: {chunks} chunk(s) in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
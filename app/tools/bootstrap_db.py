@@ -5,6 +5,14 @@
 Запускать из корня проекта:
 
     ./.venv/Scripts/python app/tools/bootstrap_db.py
+
+Режим генератора для нагрузочных тестов — воспроизводимый (по seed)
+датасет «боевого» масштаба, вставляемый bulk-insert-ами Core чанками:
+
+    python app/tools/bootstrap_db.py generate \
+        --database-url sqlite:///./load.db --reset \
+        --locations 20 --trainers 80 --sessions-per-week 70 \
+        --leads 1000000 --days 365 --seed 42
 """
 
 from __future__ import annotations
@@ -21,10 +29,18 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # ===== B. Остальной код =====
 
-from datetime import datetime, timedelta
+import argparse
+import random
+import time as time_module
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.engine import Engine
 
 from app.db.base import Base
-from app.db.session import engine, SessionLocal
+from app.db.schema import ensure_schema
+from app.db.session import DATABASE_URL, engine, SessionLocal
 
 from app.models.location import Location
 from app.models.program_type import ProgramType
@@ -35,7 +51,7 @@ from app.models.class_session import ClassSession
 
 def reset_and_create_tables() -> None:
     """На всякий случай создаём таблицы (без дропа)."""
-    Base.metadata.create_all(bind=engine)
+    ensure_schema(engine)
 
 
 def is_already_bootstrapped(session) -> bool:
@@ -56,12 +72,16 @@ def bootstrap_data() -> None:
         loc_center = Location(
             name="Cohai Center",
             address="Main Street 1",
+            latitude=47.0245,
+            longitude=28.8323,
             # если в модели Location НЕТ поля city – убери эту строку
             # city="Chisinau",
         )
         loc_west = Location(
             name="Cohai West",
             address="West Avenue 21",
+            latitude=47.0335,
+            longitude=28.7645,
             # city="Chisinau",
         )
         db.add_all([loc_center, loc_west])
@@ -99,6 +119,7 @@ def bootstrap_data() -> None:
             description="Pack of 10 personal stretching sessions.",
             price=300,
             duration_days=90,
+            visits_limit=10,
             location_id=loc_west.id,
         )
         db.add_all([m1, m2, m3])
@@ -170,7 +191,320 @@ def bootstrap_data() -> None:
         db.close()
 
 
+# ===== C. Генератор датасетов для нагрузочных тестов =====
+
+PROGRAM_TYPES = [
+    ("Group Stretching", "Group stretching class for 8–10 people.", True),
+    ("Personal Stretching", "1-on-1 personal stretching session.", False),
+    ("Splits", "Group class focused on front and side splits.", True),
+    ("Healthy Back", "Mobility and back care class.", True),
+    ("Pilates", "Mat pilates for core strength.", True),
+    ("Duo Stretching", "Stretching session for two people.", False),
+]
+
+PLAN_TEMPLATES = [
+    ("Trial Week", "Unlimited group classes for 7 days.", 25, 7, None),
+    ("8 Classes", "8 group classes within 30 days.", 70, 30, 8),
+    ("Monthly Unlimited", "Unlimited group classes for 30 days.", 90, 30, None),
+    ("Quarter Unlimited", "Unlimited group classes for 90 days.", 240, 90, None),
+    ("10 Personal Sessions", "Pack of 10 personal stretching sessions.", 300, 90, 10),
+]
+
+DISTRICTS = [
+    "Center", "Botanica", "Buiucani", "Ciocana", "Riscani", "Telecentru",
+    "Durlesti", "Codru", "Sculeni", "Posta Veche", "Malina Mica", "Valea Morilor",
+]
+CITY_CENTER = (47.0245, 28.8323)  # Кишинёв: локации генерируются вокруг
+STREETS = ["Stefan cel Mare", "Dacia", "Alba Iulia", "Mircea cel Batran", "Puskin", "Ismail", "Decebal"]
+FIRST_NAMES = [
+    "Anna", "Maria", "Elena", "Olga", "Irina", "Natalia", "Daria", "Victoria",
+    "Alina", "Cristina", "Ion", "Dmitry", "Andrei", "Sergiu", "Mihai", "Pavel",
+]
+LAST_NAMES = [
+    "Rusu", "Ceban", "Popa", "Ivanova", "Smirnova", "Lungu", "Munteanu",
+    "Cojocaru", "Petrova", "Sirbu", "Moraru", "Volkova", "Bivol", "Ursu",
+]
+LEAD_SOURCES = ["site", "site", "site", "instagram", "instagram", "facebook", "referral", "google"]
+
+# Популярность часов начала занятий: утро, обед и особенно вечер
+START_HOURS = [8, 9, 10, 11, 12, 13, 17, 18, 19, 20]
+START_HOUR_WEIGHTS = [3, 4, 4, 2, 3, 2, 6, 9, 9, 5]
+
+
+def _sqlite_bulk_load_pragmas(dbapi_conn, _record) -> None:
+    # На время загрузки отключаем fsync: датасет всегда можно пересоздать
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA cache_size=-200000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def create_bulk_engine(database_url: str) -> Engine:
+    """Отдельный engine для генерации (с «быстрыми» PRAGMA для SQLite)."""
+    bulk_engine = create_engine(database_url, future=True)
+    if bulk_engine.dialect.name == "sqlite":
+        event.listen(bulk_engine, "connect", _sqlite_bulk_load_pragmas)
+    return bulk_engine
+
+
+def _insert_chunked(
+    target: Engine,
+    table,
+    rows: Iterator[dict],
+    chunk_size: int,
+) -> int:
+    """Вставить строки executemany-пачками, одна транзакция на пачку."""
+    total = 0
+    stmt = insert(table)
+    chunk: List[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            with target.begin() as conn:
+                conn.execute(stmt, chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        with target.begin() as conn:
+            conn.execute(stmt, chunk)
+        total += len(chunk)
+    return total
+
+
+def _lead_rows(
+    rng: random.Random,
+    count: int,
+    location_ids: List[int],
+    program_type_ids: List[int],
+    end: datetime,
+    days: int,
+) -> Iterator[dict]:
+    """Лиды, равномерно размазанные по `days` дням до `end`."""
+    span_seconds = days * 24 * 3600
+    # Локации неравномерно популярны — как в жизни
+    location_weights = [rng.uniform(0.3, 1.0) for _ in location_ids]
+    locations = rng.choices(location_ids, weights=location_weights, k=count)
+    rand = rng.random
+    choice = rng.choice
+    randint = rng.randint
+    for i in range(count):
+        age = rand()
+        created_at = end - timedelta(seconds=int(age * span_seconds))
+        # старые лиды почти все обработаны, свежие — почти нет
+        is_processed = rand() < 0.2 + 0.75 * age
+        yield {
+            "id": i + 1,
+            "full_name": f"{choice(FIRST_NAMES)} {choice(LAST_NAMES)}",
+            "phone": f"+3736{randint(0, 9999999):07d}",
+            "source": choice(LEAD_SOURCES),
+            "location_id": locations[i],
+            "program_type_id": choice(program_type_ids),
+            "is_processed": is_processed,
+            "created_at": created_at,
+            # обработка: от нескольких минут до пары суток
+            "processed_at": created_at + timedelta(seconds=int(rand() ** 3 * 172800) + 300)
+            if is_processed else None,
+        }
+
+
+def generate_dataset(
+    target: Engine,
+    *,
+    locations: int = 10,
+    trainers: int = 40,
+    sessions_per_week: int = 60,
+    leads: int = 100_000,
+    days: int = 365,
+    seed: int = 42,
+    end_date: Optional[date] = None,
+    chunk_size: int = 50_000,
+    log: Callable[[str], None] = print,
+) -> Dict[str, int]:
+    """
+    Сгенерировать воспроизводимый датасет в пустую БД `target`.
+
+    Одинаковые параметры (включая seed и end_date) → одинаковые данные.
+    Id проставляются явно (1..N), поэтому вставка идёт без RETURNING.
+
+    Returns:
+        словарь {таблица: кол-во вставленных строк}.
+    """
+    from app.models import ClassSession, Lead, Location, MembershipPlan, ProgramType, Trainer
+
+    rng = random.Random(seed)
+    end = datetime.combine(end_date or date.today(), time(0, 0))
+    counts: Dict[str, int] = {}
+
+    def load(model, rows) -> None:
+        started = time_module.perf_counter()
+        counts[model.__tablename__] = _insert_chunked(target, model.__table__, rows, chunk_size)
+        log(
+            f"  {model.__tablename__:<18} {counts[model.__tablename__]:>10} rows "
+            f"in {time_module.perf_counter() - started:.2f}s"
+        )
+
+    # --- LOCATIONS ---
+    location_ids = list(range(1, locations + 1))
+    # координаты — отдельным генератором, чтобы не сдвигать остальной датасет
+    geo_rng = random.Random(seed + 1)
+    load(Location, (
+        {
+            "id": loc_id,
+            "name": f"Cohai {DISTRICTS[(loc_id - 1) % len(DISTRICTS)]}"
+                    + (f" {(loc_id - 1) // len(DISTRICTS) + 1}" if loc_id > len(DISTRICTS) else ""),
+            "address": f"{rng.choice(STREETS)} {rng.randint(1, 200)}",
+            "latitude": round(CITY_CENTER[0] + geo_rng.uniform(-0.06, 0.06), 6),
+            "longitude": round(CITY_CENTER[1] + geo_rng.uniform(-0.09, 0.09), 6),
+        }
+        for loc_id in location_ids
+    ))
+
+    # --- PROGRAM TYPES ---
+    program_type_ids = list(range(1, len(PROGRAM_TYPES) + 1))
+    load(ProgramType, (
+        {"id": pt_id, "name": name, "description": description, "is_group": is_group}
+        for pt_id, (name, description, is_group) in zip(program_type_ids, PROGRAM_TYPES)
+    ))
+
+    # --- MEMBERSHIP PLANS (все шаблоны в каждой локации, цены с разбросом) ---
+    plan_rows = []
+    for loc_id in location_ids:
+        for name, description, price, duration_days, visits_limit in PLAN_TEMPLATES:
+            plan_rows.append({
+                "id": len(plan_rows) + 1,
+                "name": name,
+                "description": description,
+                "price": int(price * rng.uniform(0.85, 1.2)),
+                "duration_days": duration_days,
+                "visits_limit": visits_limit,
+                "is_active": rng.random() > 0.05,
+                "location_id": loc_id,
+            })
+    load(MembershipPlan, plan_rows)
+
+    # --- TRAINERS ---
+    trainer_ids = list(range(1, trainers + 1))
+    load(Trainer, (
+        {
+            "id": t_id,
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "phone": f"+3736{rng.randint(0, 9999999):07d}",
+            "email": f"trainer{t_id}@cohai.example",
+        }
+        for t_id in trainer_ids
+    ))
+
+    # --- CLASS SESSIONS: недельный шаблон на каждую локацию ---
+    week_start = end - timedelta(days=end.weekday())
+    session_rows = []
+    for loc_id in location_ids:
+        # у каждой локации своя «команда» тренеров
+        team = rng.sample(trainer_ids, k=min(len(trainer_ids), max(3, len(trainer_ids) // 4)))
+        hours = rng.choices(START_HOURS, weights=START_HOUR_WEIGHTS, k=sessions_per_week)
+        for hour in hours:
+            weekday = rng.randrange(7)
+            program_type_id = rng.choice(program_type_ids)
+            is_group = PROGRAM_TYPES[program_type_id - 1][2]
+            starts_at = week_start + timedelta(days=weekday, hours=hour, minutes=rng.choice((0, 30)))
+            ends_at = starts_at + timedelta(minutes=rng.choice((55, 60, 90)))
+            session_rows.append({
+                "id": len(session_rows) + 1,
+                "location_id": loc_id,
+                "program_type_id": program_type_id,
+                "trainer_id": rng.choice(team),
+                "membership_plan_id": None,
+                "starts_at": starts_at,
+                "ends_at": ends_at,
+                "weekday": weekday,
+                "start_time": starts_at.time(),
+                "end_time": ends_at.time(),
+                "capacity": rng.choice((8, 10, 12)) if is_group else rng.choice((1, 2)),
+                "is_active": rng.random() > 0.03,
+            })
+    load(ClassSession, session_rows)
+
+    # --- LEADS ---
+    load(Lead, _lead_rows(rng, leads, location_ids, program_type_ids, end, days))
+
+    # --- РОЛЛАП ВОРОНКИ (bulk-вставка его не обновляет) ---
+    from sqlalchemy.orm import Session
+
+    from app.models.lead_stats import LeadDailyStat
+    from app.services.analytics_service import AnalyticsService
+
+    started = time_module.perf_counter()
+    with Session(target) as db:
+        AnalyticsService(db).rebuild(chunk_size=max(chunk_size, 200_000))
+        counts[LeadDailyStat.__tablename__] = db.query(LeadDailyStat).count()
+    log(
+        f"  {LeadDailyStat.__tablename__:<18} {counts[LeadDailyStat.__tablename__]:>10} rows "
+        f"in {time_module.perf_counter() - started:.2f}s"
+    )
+
+    return counts
+
+
+def generate_main(args: argparse.Namespace) -> None:
+    target = create_bulk_engine(args.database_url)
+    import app.models  # noqa: F401  — все таблицы, включая служебные
+
+    if args.reset:
+        Base.metadata.drop_all(bind=target)
+    ensure_schema(target)
+
+    from app.models import Location
+    with target.connect() as conn:
+        if conn.execute(Location.__table__.select().limit(1)).first() is not None:
+            print("⚠ DB already has data; use --reset to regenerate.")
+            return
+
+    print(f"▶ Generating dataset into {args.database_url} (seed={args.seed})…")
+    started = time_module.perf_counter()
+    counts = generate_dataset(
+        target,
+        locations=args.locations,
+        trainers=args.trainers,
+        sessions_per_week=args.sessions_per_week,
+        leads=args.leads,
+        days=args.days,
+        seed=args.seed,
+        end_date=args.end_date,
+        chunk_size=args.chunk_size,
+    )
+    elapsed = time_module.perf_counter() - started
+    print(f"✅ {sum(counts.values())} rows generated in {elapsed:.1f}s.")
+    target.dispose()
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Заполнение БД тестовыми данными.")
+    sub = parser.add_subparsers(dest="cmd")
+
+    gen = sub.add_parser("generate", help="Сгенерировать датасет для нагрузочных тестов.")
+    gen.add_argument("--database-url", default=DATABASE_URL, help="Куда писать (по умолчанию — БД приложения).")
+    gen.add_argument("--reset", action="store_true", help="Удалить и пересоздать все таблицы.")
+    gen.add_argument("--locations", type=int, default=10)
+    gen.add_argument("--trainers", type=int, default=40)
+    gen.add_argument("--sessions-per-week", type=int, default=60, help="Занятий в неделю на локацию.")
+    gen.add_argument("--leads", type=int, default=100_000)
+    gen.add_argument("--days", type=int, default=365, help="На сколько дней назад размазать лиды.")
+    gen.add_argument("--seed", type=int, default=42)
+    gen.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        default=None,
+        help="Последний день датасета (YYYY-MM-DD), по умолчанию сегодня.",
+    )
+    gen.add_argument("--chunk-size", type=int, default=50_000, help="Строк на одну транзакцию.")
+
+    args = parser.parse_args()
+
+    if args.cmd == "generate":
+        generate_main(args)
+        return
+
     reset_and_create_tables()
     bootstrap_data()
 
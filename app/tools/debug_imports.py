@@ -14,11 +14,22 @@ or just:
 Скрипт:
 - добавляет корень проекта в sys.path
 - проверяет импорты моделей, репозиториев, схем, сервисов, api и main
+
+Режим замера времени старта (аналог `python -X importtime`):
+
+    python app/tools/debug_imports.py --importtime --top 20
+
+- печатает самые дорогие модули (self / cumulative, мс),
+- замеряет полный холодный старт: import app.main + startup lifespan,
+- завершается с кодом 1, если старт дольше бюджета
+  (settings.STARTUP_BUDGET_MS или --budget-ms).
 """
 
 from __future__ import annotations
 
+import argparse
 import importlib
+import subprocess
 import sys
 import traceback
 from pathlib import Path
@@ -64,9 +75,109 @@ def check_block(title: str, modules: list[str]) -> bool:
     return all_ok
 
 
-# ===== C. Main routine =====
+# ===== C. Import-time profiling =====
 
-def main() -> None:
+# Снипет для подпроцесса: импорт + прогон startup-части lifespan,
+# печатает полное время старта в миллисекундах.
+_STARTUP_SNIPPET = """
+import asyncio, time
+t0 = time.perf_counter()
+import {module} as m
+
+async def _startup():
+    async with m.app.router.lifespan_context(m.app):
+        print(round((time.perf_counter() - t0) * 1000, 1), flush=True)
+
+asyncio.run(_startup())
+"""
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """
+    Разобрать вывод `-X importtime`.
+
+    Returns:
+        список (module, self_us, cumulative_us) в порядке вывода.
+    """
+    rows: list[tuple[str, int, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, name = parts
+        try:
+            rows.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            # строка-заголовок "self [us] | cumulative | imported package"
+            continue
+    return rows
+
+
+def measure_import_time(module: str) -> list[tuple[str, int, int]]:
+    """Импортировать `module` в чистом интерпретаторе под -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr)
+        raise RuntimeError(f"import {module} failed in subprocess")
+    return parse_importtime(proc.stderr)
+
+
+def measure_startup_ms(module: str) -> float:
+    """Полный холодный старт: импорт модуля + startup lifespan, мс."""
+    proc = subprocess.run(
+        [sys.executable, "-c", _STARTUP_SNIPPET.format(module=module)],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr)
+        raise RuntimeError(f"startup of {module} failed in subprocess")
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def report_import_time(module: str, top: int, budget_ms: float) -> bool:
+    """
+    Напечатать топ самых медленных импортов и сравнить старт с бюджетом.
+
+    Returns:
+        True, если старт уложился в бюджет.
+    """
+    rows = measure_import_time(module)
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+
+    print(f"\n===== IMPORT TIME: {module} ({len(rows)} modules, {total_ms:.1f} ms) =====")
+
+    print(f"\n--- top {top} by self time ---")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[1], reverse=True)[:top]:
+        print(f"{self_us / 1000:9.1f} ms  {cumulative_us / 1000:9.1f} ms  {name}")
+
+    print(f"\n--- top {top} app.* modules by cumulative time ---")
+    own = [r for r in rows if r[0] == "app" or r[0].startswith("app.")]
+    for name, self_us, cumulative_us in sorted(own, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"{self_us / 1000:9.1f} ms  {cumulative_us / 1000:9.1f} ms  {name}")
+
+    startup_ms = measure_startup_ms(module)
+    print("\n===== STARTUP BUDGET =====")
+    print(f"import + lifespan startup: {startup_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+
+    if startup_ms > budget_ms:
+        print("Startup budget EXCEEDED ❌")
+        return False
+    print("Startup within budget ✅")
+    return True
+
+
+# ===== D. Main routine =====
+
+def check_all_imports() -> None:
     everything_ok = True
 
     # 1. MODELS
@@ -145,5 +256,32 @@ def main() -> None:
         print("Some imports FAILED ❌  (см. выше трассировки)")
 
 
+def main() -> None:
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description="Проверка импортов backend-а.")
+    parser.add_argument(
+        "--importtime",
+        action="store_true",
+        help="Замерить время импорта по модулям и холодный старт приложения.",
+    )
+    parser.add_argument("--module", default="app.main", help="Модуль для замера (по умолчанию app.main).")
+    parser.add_argument("--top", type=int, default=15, help="Сколько самых медленных модулей показать.")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=settings.STARTUP_BUDGET_MS,
+        help="Бюджет холодного старта, мс (по умолчанию settings.STARTUP_BUDGET_MS).",
+    )
+    args = parser.parse_args()
+
+    if not args.importtime:
+        check_all_imports()
+        return
+
+    if not report_import_time(args.module, args.top, args.budget_ms):
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,317 @@
+# app/tools/load_test.py
+"""
+Локальный нагрузочный тест: поднимает uvicorn на сгенерированной БД
+и гоняет смесь публичных GET-ов и POST /leads/guest-visit asyncio-клиентами.
+
+Запускать из корня проекта, например:
+
+    python app/tools/load_test.py --workers 4 --concurrency 64 --duration 30
+
+    # своя смесь запросов (веса) и готовая БД
+    python app/tools/load_test.py --database-url sqlite:///./load.db \\
+        --mix schedule=5,memberships=3,locations=1,program-types=1,guest-visit=2
+
+Отчёт: RPS и p50/p95/p99 по каждому маршруту, коды ответов и счётчики
+блокировок БД (db.lock_waits / db.lock_errors), собранные со всех воркеров
+через /api/v1/admin/metrics/. Всё работает офлайн на одной Linux-машине.
+"""
+
+from __future__ import annotations
+
+# ===== A. Фиксируем sys.path, чтобы `import app` всегда работал =====
+import sys
+from pathlib import Path
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[2]  # app/tools/load_test.py -> корень
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# ===== B. Остальной код =====
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy.engine import make_url
+
+from app.db.base import Base
+from app.tools.bootstrap_db import create_bulk_engine, generate_dataset
+
+DEFAULT_MIX = "schedule=4,memberships=3,locations=1,program-types=1,guest-visit=1"
+
+# Маршрут → функция, строящая (method, url, json) для очередного запроса
+RouteBuilder = Callable[[random.Random], Tuple[str, str, Optional[dict]]]
+
+
+def build_routes(locations: int, program_types: int) -> Dict[str, RouteBuilder]:
+    def location_id(rng: random.Random) -> int:
+        return rng.randint(1, locations)
+
+    def guest_visit(rng: random.Random):
+        return "POST", "/api/v1/leads/guest-visit", {
+            "first_name": "Load",
+            "last_name": f"Test{rng.randint(1, 10**6)}",
+            "phone": f"+3736{rng.randint(0, 9999999):07d}",
+            "location_id": location_id(rng),
+            "program_type_id": rng.randint(1, program_types),
+        }
+
+    return {
+        "locations": lambda rng: ("GET", "/api/v1/locations", None),
+        "program-types": lambda rng: ("GET", "/api/v1/program-types", None),
+        "schedule": lambda rng: ("GET", f"/api/v1/schedule?location_id={location_id(rng)}", None),
+        "schedule-ics": lambda rng: ("GET", f"/api/v1/schedule.ics?location_id={location_id(rng)}", None),
+        "memberships": lambda rng: ("GET", f"/api/v1/memberships?location_id={location_id(rng)}", None),
+        "guest-visit": guest_visit,
+    }
+
+
+def parse_mix(raw: str, known: List[str]) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in raw.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in known:
+            raise SystemExit(f"Unknown route in --mix: {name!r} (known: {', '.join(known)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+# ===== C. Сервер =====
+
+def absolute_sqlite_url(url: str) -> str:
+    """
+    sqlite:///./load.db → абсолютный путь от текущей папки: сервер
+    запускается с cwd во временной папке и иначе создал бы там пустую БД.
+    """
+    parsed = make_url(url)
+    database = parsed.database
+    if parsed.get_backend_name() != "sqlite" or not database or database == ":memory:":
+        return url
+    if database.startswith("file:") or Path(database).is_absolute():
+        return url
+    return parsed.set(database=str(Path(database).resolve())).render_as_string(hide_password=False)
+
+
+def prepare_database(args: argparse.Namespace, workdir: Path) -> str:
+    if args.database_url:
+        return absolute_sqlite_url(args.database_url)
+
+    url = f"sqlite:///{workdir / 'load.db'}"
+    print(f"▶ Generating dataset ({args.leads} leads, {args.locations} locations)…")
+    target = create_bulk_engine(url)
+    Base.metadata.create_all(bind=target)
+    generate_dataset(
+        target,
+        locations=args.locations,
+        trainers=args.trainers,
+        sessions_per_week=args.sessions_per_week,
+        leads=args.leads,
+        seed=args.seed,
+        end_date=date.today(),
+        log=lambda _msg: None,
+    )
+    target.dispose()
+    return url
+
+
+def start_server(args: argparse.Namespace, database_url: str, workdir: Path) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "COHAI_DATABASE_URL": database_url,
+        "COHAI_LOG_TO_CONSOLE": "0",
+        "PYTHONPATH": str(PROJECT_ROOT),
+        # иначе все клиенты с 127.0.0.1 упрутся в лимит по IP
+        "COHAI_RATE_LIMIT_ENABLED": "1" if args.rate_limit else "0",
+    })
+    # cwd — временная папка, чтобы логи прогона не мешались с логами проекта
+    cmd = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--app-dir", str(PROJECT_ROOT),
+        "--host", "127.0.0.1",
+        "--port", str(args.port),
+        "--workers", str(args.workers),
+        "--log-level", "warning",
+        "--no-access-log",
+    ]
+    print(f"▶ Starting uvicorn ({args.workers} workers) on :{args.port}")
+    return subprocess.Popen(cmd, cwd=workdir, env=env)
+
+
+async def wait_ready(base_url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get("/ready")
+                if response.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise SystemExit(f"Server at {base_url} did not become ready in {timeout:.0f}s")
+
+
+async def collect_worker_metrics(base_url: str, workers: int) -> Dict[int, Dict[str, int]]:
+    """
+    Снять счётчики со всех воркеров: каждый запрос — новое соединение,
+    ядро раскидывает их по воркерам, пока не увидим все pid (или сдадимся).
+    """
+    seen: Dict[int, Dict[str, int]] = {}
+    for _ in range(workers * 20):
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            data = (await client.get("/api/v1/admin/metrics/")).json()
+        seen[data["pid"]] = data["counters"]
+        if len(seen) >= workers:
+            break
+    return seen
+
+
+# ===== D. Клиенты =====
+
+class RouteStats:
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+
+
+async def run_clients(
+    base_url: str,
+    routes: Dict[str, RouteBuilder],
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    max_requests: Optional[int],
+    seed: int,
+) -> Tuple[Dict[str, RouteStats], float]:
+    stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    budget = {"left": max_requests if max_requests is not None else float("inf")}
+    deadline = time.monotonic() + duration
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+        async def worker(worker_id: int) -> None:
+            rng = random.Random(seed * 1000 + worker_id)
+            while time.monotonic() < deadline and budget["left"] > 0:
+                budget["left"] -= 1
+                name = rng.choices(names, weights=weights)[0]
+                method, url, payload = routes[name](rng)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, url, json=payload)
+                    status = str(response.status_code)
+                except httpx.HTTPError as exc:
+                    status = type(exc).__name__
+                stats[name].latencies.append((time.perf_counter() - started) * 1000)
+                stats[name].statuses[status] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return stats, elapsed
+
+
+def print_report(stats: Dict[str, RouteStats], elapsed: float, worker_metrics: Dict[int, Dict[str, int]], workers: int) -> None:
+    print(f"\n===== RESULTS ({elapsed:.1f}s) =====")
+    header = f"{'route':<15}{'count':>8}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}  statuses"
+    print(header)
+    print("-" * len(header))
+
+    total = 0
+    for name in sorted(stats):
+        route = stats[name]
+        values = sorted(route.latencies)
+        total += len(values)
+        statuses = ", ".join(f"{k}×{v}" for k, v in sorted(route.statuses.items()))
+        print(
+            f"{name:<15}{len(values):>8}{len(values) / elapsed:>9.1f}"
+            f"{percentile(values, 50):>9.1f}{percentile(values, 95):>9.1f}"
+            f"{percentile(values, 99):>9.1f}{values[-1] if values else 0:>9.1f}  {statuses}"
+        )
+    print("-" * len(header))
+    print(f"{'TOTAL':<15}{total:>8}{total / elapsed:>9.1f}")
+
+    print("\n===== DB LOCKS (server side) =====")
+    summed: Counter = Counter()
+    for counters in worker_metrics.values():
+        summed.update(counters)
+    print(f"workers reporting: {len(worker_metrics)}/{workers}")
+    print(f"db.lock_waits:  {summed.get('db.lock_waits', 0)}")
+    print(f"db.lock_errors: {summed.get('db.lock_errors', 0)}")
+    print(f"db.errors:      {summed.get('db.errors', 0)}")
+
+
+# ===== E. Main =====
+
+async def run(args: argparse.Namespace, base_url: str) -> None:
+    routes = build_routes(args.locations, program_types=args.program_types)
+    mix = parse_mix(args.mix, list(routes))
+
+    await wait_ready(base_url, args.ready_timeout)
+    print(f"▶ Load: {args.concurrency} clients, {args.duration:.0f}s, mix={mix}")
+    stats, elapsed = await run_clients(
+        base_url, routes, mix, args.concurrency, args.duration, args.requests, args.seed,
+    )
+    worker_metrics = await collect_worker_metrics(base_url, args.workers)
+    print_report(stats, elapsed, worker_metrics, args.workers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Локальный нагрузочный тест API.")
+    parser.add_argument("--database-url", default=None, help="Готовая БД; по умолчанию генерируется во временную папку.")
+    parser.add_argument("--workers", type=int, default=1, help="Воркеров uvicorn.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=32, help="Одновременных asyncio-клиентов.")
+    parser.add_argument("--duration", type=float, default=15.0, help="Длительность нагрузки, секунд.")
+    parser.add_argument("--requests", type=int, default=None, help="Ограничить общее число запросов.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Веса маршрутов (по умолчанию {DEFAULT_MIX}).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--ready-timeout", type=float, default=60.0)
+    parser.add_argument("--rate-limit", action="store_true", help="Не отключать rate limiting заявок на сервере.")
+    # параметры генерации (если --database-url не задан)
+    parser.add_argument("--locations", type=int, default=10)
+    parser.add_argument("--trainers", type=int, default=40)
+    parser.add_argument("--sessions-per-week", type=int, default=60)
+    parser.add_argument("--leads", type=int, default=100_000)
+    parser.add_argument("--program-types", type=int, default=6, help="Сколько program_type_id есть в БД.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="cohai-load-") as tmp:
+        workdir = Path(tmp)
+        database_url = prepare_database(args, workdir)
+        server = start_server(args, database_url, workdir)
+        try:
+            asyncio.run(run(args, f"http://127.0.0.1:{args.port}"))
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# app/tools/outbox_worker.py
+"""
+Отдельный процесс-диспетчер outbox-уведомлений.
+
+Удобен, когда в API-воркерах диспетчер выключен
+(COHAI_OUTBOX_DISPATCHER_ENABLED=0). Запускать из корня проекта:
+
+    python app/tools/outbox_worker.py
+    python app/tools/outbox_worker.py --once      # одна пачка и выход
+    COHAI_OUTBOX_SINKS=stdout python app/tools/outbox_worker.py
+"""
+
+from __future__ import annotations
+
+# ===== A. Фиксируем sys.path, чтобы `import app` всегда работал =====
+import sys
+from pathlib import Path
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[2]  # app/tools/outbox_worker.py -> корень
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# ===== B. Остальной код =====
+
+import argparse
+import asyncio
+
+from app.core.logging import setup_logging
+from app.db.schema import ensure_schema
+from app.db.session import get_engine
+from app.services.outbox_dispatcher import build_shard_dispatchers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Диспетчер outbox-уведомлений.")
+    parser.add_argument("--once", action="store_true", help="Разобрать одну пачку и выйти.")
+    args = parser.parse_args()
+
+    setup_logging()
+    ensure_schema(get_engine())
+    dispatchers = build_shard_dispatchers()
+
+    if args.once:
+        print(f"Dispatched {sum(d.dispatch_once() for d in dispatchers)} message(s).")
+        return
+
+    async def run_all() -> None:
+        await asyncio.gather(*(dispatcher.run_forever() for dispatcher in dispatchers))
+
+    try:
+        asyncio.run(run_all())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
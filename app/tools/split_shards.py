@@ -0,0 +1,137 @@
+# app/tools/split_shards.py
+"""
+Разнести существующую БД по шардам (см. app/db/sharding.py).
+
+Источник — DATABASE_URL (primary). Для каждого шарда из COHAI_SHARDS:
+- справочники (locations, program_types, trainers) копируются целиком;
+- строки таблиц локаций (тарифы, расписание, лиды, роллап воронки,
+  версии расписания) — только с location_id из диапазонов шарда
+  (COHAI_SHARD_LOCATION_RANGES).
+
+Запись — upsert чанками, поэтому повторный запуск безопасен и заодно
+досинхронизирует справочники. С --prune перенесённые строки удаляются из
+primary (справочники остаются). Перед запуском остановите приложение
+и outbox-воркер. Запускать из корня проекта:
+
+    COHAI_SHARDS=balti=sqlite:///./cohai_balti.db \\
+    COHAI_SHARD_LOCATION_RANGES=1000-1999=balti \\
+    python app/tools/split_shards.py --prune
+"""
+
+from __future__ import annotations
+
+# ===== A. Фиксируем sys.path, чтобы `import app` всегда работал =====
+import sys
+from pathlib import Path
+
+THIS_FILE = Path(__file__).resolve()
+PROJECT_ROOT = THIS_FILE.parents[2]  # app/tools/split_shards.py -> корень
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# ===== B. Остальной код =====
+
+import argparse
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Table, delete, or_, select
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.base import Base
+from app.db.schema import ensure_schema
+from app.db.sharding import PRIMARY_SHARD, ShardRouter
+from app.db.upsert import insert_for
+
+CATALOG_TABLES = ("locations", "program_types", "trainers")
+# в порядке внешних ключей
+LOCATION_TABLES = ("membership_plans", "class_sessions", "leads", "lead_daily_stats", "schedule_versions")
+
+
+def _in_ranges(table: Table, ranges: List[Tuple[int, int]]):
+    return or_(*(table.c.location_id.between(lo, hi) for lo, hi in ranges))
+
+
+def _copy(src: Connection, dst: Connection, table: Table, where, chunk_size: int) -> int:
+    """Upsert строк table (по where) из src в dst чанками; вернуть число строк."""
+    key = [column.name for column in table.primary_key.columns]
+    values = [column.name for column in table.columns if column.name not in key]
+    query = select(table) if where is None else select(table).where(where)
+    copied = 0
+    result = src.execution_options(yield_per=chunk_size).execute(query)
+    for chunk in result.partitions():
+        stmt = insert_for(dst)(table)
+        if values:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=key, set_={name: stmt.excluded[name] for name in values}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=key)
+        dst.execute(stmt, [dict(row._mapping) for row in chunk])
+        copied += len(chunk)
+    return copied
+
+
+def split_database(
+    source: Engine,
+    router: ShardRouter,
+    prune: bool = False,
+    chunk_size: int = 10_000,
+    only: Optional[str] = None,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Dict[str, int]]:
+    """Скопировать данные из source в шарды router; вернуть {шард: {таблица: строк}}."""
+    tables = Base.metadata.tables
+    report: Dict[str, Dict[str, int]] = {}
+    for key in router.keys():
+        if key == PRIMARY_SHARD or (only is not None and key != only):
+            continue
+        ranges = router.location_ranges(key)
+        if not ranges:
+            log(f"[{key}] no location ranges — skipped")
+            continue
+
+        target = router.engine(key)
+        ensure_schema(target)
+        counts = report[key] = {}
+        with source.connect() as src, target.begin() as dst:
+            for name in CATALOG_TABLES:
+                counts[name] = _copy(src, dst, tables[name], None, chunk_size)
+            for name in LOCATION_TABLES:
+                counts[name] = _copy(src, dst, tables[name], _in_ranges(tables[name], ranges), chunk_size)
+        log(f"[{key}] " + ", ".join(f"{name}={count}" for name, count in counts.items()))
+
+        if prune:
+            # только после commit в шард: при сбое данные остаются в primary
+            with source.begin() as conn:
+                for name in reversed(LOCATION_TABLES):
+                    conn.execute(delete(tables[name]).where(_in_ranges(tables[name], ranges)))
+            log(f"[{key}] pruned from primary")
+    return report
+
+
+def main() -> None:
+    from app.db.session import get_engine
+    from app.db.sharding import get_shard_router
+
+    parser = argparse.ArgumentParser(description="Разнести БД по шардам.")
+    parser.add_argument("--prune", action="store_true", help="Удалить перенесённые строки из primary.")
+    parser.add_argument("--shard", default=None, help="Только этот шард.")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Строк на один INSERT.")
+    args = parser.parse_args()
+
+    router = get_shard_router()
+    if not router.sharded:
+        sys.exit("COHAI_SHARDS is empty — nothing to split")
+    if args.shard is not None and not router.has_shard(args.shard):
+        sys.exit(f"Unknown shard {args.shard!r}")
+
+    ensure_schema(get_engine())
+    started = time.perf_counter()
+    split_database(get_engine(), router, prune=args.prune, chunk_size=args.chunk_size, only=args.shard)
+    print(f"✅ Split done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# tests/benchmarks/conftest.py
+"""
+Бенчмарки репозиториев, сервисов и эндпоинтов (pytest-benchmark).
+
+По умолчанию НЕ собираются (обычный `pytest` остаётся быстрым).
+Запуск:
+
+    COHAI_BENCHMARKS=1 python -m pytest tests/benchmarks --benchmark-autosave
+
+Размеры датасетов (через запятую): COHAI_BENCH_SIZES=small,medium,large
+Каждый датасет генерируется app/tools/bootstrap_db.generate_dataset
+во временную SQLite-базу один раз на сессию.
+
+Результаты пишутся в .benchmarks/ (JSON). Сравнение с прошлым прогоном
+и падение сборки при регрессии:
+
+    COHAI_BENCHMARKS=1 python -m pytest tests/benchmarks \\
+        --benchmark-autosave --benchmark-compare \\
+        --benchmark-compare-fail=mean:20%
+"""
+import os
+from datetime import date
+from typing import Dict, Generator
+
+import pytest
+
+if os.getenv("COHAI_BENCHMARKS") != "1":
+    collect_ignore_glob = ["test_*.py"]
+else:
+    pytest.importorskip("pytest_benchmark")
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.v1.deps import get_db, get_guest_visit_db, get_membership_read_db, get_read_db
+from app.core.config import settings
+from app.db.base import Base
+from app.main import app
+from app.tools.bootstrap_db import create_bulk_engine, generate_dataset
+
+# Параметры generate_dataset для каждого размера
+DATASET_SIZES: Dict[str, dict] = {
+    "small": {"locations": 2, "trainers": 6, "sessions_per_week": 20, "leads": 1_000},
+    "medium": {"locations": 10, "trainers": 40, "sessions_per_week": 60, "leads": 50_000},
+    "large": {"locations": 20, "trainers": 80, "sessions_per_week": 70, "leads": 1_000_000},
+}
+
+SELECTED_SIZES = [
+    s.strip() for s in os.getenv("COHAI_BENCH_SIZES", "small,medium").split(",") if s.strip()
+]
+
+
+class Dataset:
+    """Сгенерированная БД одного размера."""
+
+    def __init__(self, size: str, engine, counts: Dict[str, int]) -> None:
+        self.size = size
+        self.engine = engine
+        self.counts = counts
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="session", params=SELECTED_SIZES)
+def dataset(request, tmp_path_factory) -> Generator[Dataset, None, None]:
+    size = request.param
+    path = tmp_path_factory.mktemp("bench") / f"{size}.db"
+    engine = create_bulk_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    counts = generate_dataset(
+        engine,
+        seed=42,
+        end_date=date(2026, 1, 1),
+        log=lambda _msg: None,
+        **DATASET_SIZES[size],
+    )
+    yield Dataset(size, engine, counts)
+    engine.dispose()
+
+
+@pytest.fixture()
+def db(dataset: Dataset) -> Generator[Session, None, None]:
+    session = dataset.session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture()
+def client(dataset: Dataset, monkeypatch) -> Generator[TestClient, None, None]:
+    # бенчмарк шлёт тысячи заявок с одного «IP» — лимитер тут только мешает
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+
+    def override_get_db() -> Generator[Session, None, None]:
+        session = dataset.session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_guest_visit_db] = override_get_db
+    app.dependency_overrides[get_membership_read_db] = override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_read_db, None)
+        app.dependency_overrides.pop(get_guest_visit_db, None)
+        app.dependency_overrides.pop(get_membership_read_db, None)
+
+
+@pytest.fixture(autouse=True)
+def _bench_group(request, benchmark, dataset: Dataset) -> None:
+    # группируем результаты по размеру датасета — так их удобнее сравнивать
+    benchmark.group = f"{dataset.size}: {request.node.module.__name__.split('.')[-1]}"
+    benchmark.extra_info["dataset"] = dataset.counts
@@ -0,0 +1,36 @@
+# tests/benchmarks/test_bench_endpoints.py
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/api/v1/locations",
+        "/api/v1/program-types",
+        "/api/v1/schedule?location_id=1",
+        "/api/v1/memberships",
+        "/api/v1/memberships?location_id=1",
+        "/api/v1/memberships/1",
+    ],
+)
+def test_public_get(benchmark, client, url):
+    response = benchmark(client.get, url)
+    assert response.status_code == 200
+
+
+def test_public_guest_visit(benchmark, client):
+    payload = {
+        "first_name": "Bench",
+        "last_name": "Client",
+        "phone": "+37360000000",
+        "location_id": 1,
+        "program_type_id": 1,
+    }
+    response = benchmark(client.post, "/api/v1/leads/guest-visit", json=payload)
+    assert response.status_code == 200
+
+
+def test_admin_list_leads(benchmark, client):
+    response = benchmark.pedantic(client.get, args=("/api/v1/admin/leads/",), rounds=3, iterations=1)
+    assert response.status_code == 200
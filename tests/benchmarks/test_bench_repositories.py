@@ -0,0 +1,108 @@
+# tests/benchmarks/test_bench_repositories.py
+
+import tracemalloc
+
+import pytest
+
+from app.repositories.class_session_repo import ClassSessionRepository
+from app.repositories.lead_repo import LeadRepository
+from app.repositories.location_repo import LocationRepository
+from app.repositories.membership_repo import MembershipRepository
+from app.repositories.program_type_repo import ProgramTypeRepository
+from app.repositories.read_models import ReadModelRepository
+
+
+def test_location_list_all(benchmark, db, dataset):
+    result = benchmark(LocationRepository(db).list_all)
+    assert len(result) == dataset.counts["locations"]
+
+
+def test_location_get_by_id(benchmark, db):
+    assert benchmark(LocationRepository(db).get_by_id, 1) is not None
+
+
+def test_program_type_list_all(benchmark, db):
+    assert benchmark(ProgramTypeRepository(db).list_all)
+
+
+def test_membership_list_all(benchmark, db, dataset):
+    result = benchmark(MembershipRepository(db).list_all)
+    assert len(result) == dataset.counts["membership_plans"]
+
+
+def test_membership_list_for_location(benchmark, db):
+    assert benchmark(MembershipRepository(db).list_for_location, 1)
+
+
+def test_membership_get_by_id(benchmark, db):
+    assert benchmark(MembershipRepository(db).get_by_id, 1) is not None
+
+
+def test_class_session_list_for_location(benchmark, db):
+    assert benchmark(ClassSessionRepository(db).list_for_location, 1)
+
+
+def test_lead_list_all(benchmark, db, dataset):
+    # тяжёлый запрос на больших датасетах — ограничиваем число раундов
+    result = benchmark.pedantic(LeadRepository(db).list_all, rounds=3, iterations=1)
+    assert len(result) >= dataset.counts["leads"]
+
+
+def test_lead_create_guest_visit(benchmark, db):
+    repo = LeadRepository(db)
+    data = {
+        "full_name": "Bench Lead",
+        "phone": "+37360000000",
+        "source": "benchmark",
+        "location_id": 1,
+        "program_type_id": 1,
+    }
+    lead = benchmark(lambda: repo.create_guest_visit(dict(data)))
+    assert lead.id is not None
+
+
+def test_lead_mark_processed(benchmark, db):
+    benchmark(LeadRepository(db).mark_processed, 1)
+
+
+# --- ORM против read-моделей (app/repositories/read_models.py) ---
+
+READ_MODEL_CASES = {
+    "locations": (lambda db: LocationRepository(db).list_all(), lambda db: ReadModelRepository(db).list_locations()),
+    "memberships": (
+        lambda db: MembershipRepository(db).list_all(),
+        lambda db: ReadModelRepository(db).list_memberships(),
+    ),
+    "schedule": (
+        lambda db: ClassSessionRepository(db).list_for_location(1),
+        lambda db: ReadModelRepository(db).list_schedule(1),
+    ),
+}
+
+
+def _allocated_bytes(fetch, db) -> int:
+    """Пик памяти Python на один вызов (tracemalloc), после expunge прошлых объектов."""
+    db.expunge_all()
+    tracemalloc.start()
+    try:
+        fetch(db)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("kind", ["orm", "read_model"])
+@pytest.mark.parametrize("case", sorted(READ_MODEL_CASES))
+def test_read_model_vs_orm(benchmark, db, case, kind):
+    orm_fetch, read_fetch = READ_MODEL_CASES[case]
+    fetch = orm_fetch if kind == "orm" else read_fetch
+
+    def run():
+        # иначе ORM отдаёт уже загруженные объекты из identity map
+        db.expunge_all()
+        return fetch(db)
+
+    rows = benchmark(run)
+    assert rows
+    benchmark.extra_info["rows"] = len(rows)
+    benchmark.extra_info["peak_bytes_per_row"] = _allocated_bytes(fetch, db) // len(rows)
@@ -0,0 +1,48 @@
+# tests/benchmarks/test_bench_services.py
+
+from datetime import date, timedelta
+
+from app.schemas.lead import LeadCreateGuestVisit
+from app.services.lead_service import LeadService
+from app.services.membership_service import MembershipService
+from app.services.occupancy_service import OccupancyService
+from app.services.schedule_service import ScheduleService
+
+
+def test_membership_service_list_all(benchmark, db):
+    assert benchmark(MembershipService(db).list_all, only_active=True)
+
+
+def test_membership_service_list_for_location(benchmark, db):
+    assert benchmark(MembershipService(db).list_for_location, 1)
+
+
+def test_membership_service_get(benchmark, db):
+    assert benchmark(MembershipService(db).get, 1) is not None
+
+
+def test_schedule_service_for_location(benchmark, db):
+    assert benchmark(ScheduleService(db).get_schedule_for_location, 1)
+
+
+def test_lead_service_create_guest_visit(benchmark, db):
+    payload = LeadCreateGuestVisit(
+        first_name="Bench",
+        last_name="Lead",
+        phone="+37360000000",
+        location_id=1,
+        program_type_id=1,
+    )
+    lead = benchmark(LeadService(db).create_guest_visit, payload)
+    assert lead.full_name == "Bench Lead"
+
+
+def test_lead_service_list_leads(benchmark, db, dataset):
+    result = benchmark.pedantic(LeadService(db).list_leads, rounds=3, iterations=1)
+    assert len(result) >= dataset.counts["leads"]
+
+
+def test_occupancy_service_heatmap_year(benchmark, db):
+    # первый вызов считает год истории, дальше — недели из кэша
+    heatmap = benchmark(OccupancyService(db).heatmap, 1, date(2026, 1, 1) - timedelta(days=365), date(2026, 1, 1))
+    assert heatmap["weeks"] >= 52
@@ -8,3 +8,55 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 # Добавляем корень проекта в sys.path, если его там ещё нет
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1 import deps
+from app.db.schema import ensure_schema
+from app.main import app
+
+# Все зависимости, открывающие сессию БД: в тестах их заменяет client
+DB_DEPENDENCIES = (
+    deps.get_db,
+    deps.get_read_db,
+    deps.get_catalog_db,
+    deps.get_guest_visit_db,
+    deps.get_class_session_db,
+    deps.get_class_session_read_db,
+    deps.get_class_session_row_db,
+    deps.get_class_session_update_db,
+    deps.get_schedule_import_db,
+    deps.get_membership_read_db,
+)
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    """
+    Пустая SQLite-база теста со схемой. Тестовый файл добавляет свои строки,
+    переопределив фикстуру: def session_factory(session_factory): ...
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    ensure_schema(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture()
+def client(session_factory):
+    """TestClient, у которого все сессии БД — из session_factory."""
+
+    def override():
+        with session_factory() as db:
+            yield db
+
+    for dependency in DB_DEPENDENCIES:
+        app.dependency_overrides[dependency] = override
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -0,0 +1,116 @@
+# tests/test_admin_schedule.py
+
+from datetime import datetime, time
+
+import pytest
+
+from app.models import ClassSession, Location, ProgramType, Trainer
+from app.services.schedule_versions import get_schedule_version
+
+HEADER = "id,location_id,program_type_id,trainer_id,weekday,start_time,end_time,capacity\n"
+
+
+@pytest.fixture()
+def session_factory(session_factory):
+    with session_factory() as db:
+        db.add_all([
+            Location(id=1, name="Center"),
+            Location(id=2, name="Riscani"),
+            ProgramType(id=1, name="Group Stretching"),
+            Trainer(id=1, full_name="Anna"),
+            Trainer(id=2, full_name="Ion"),
+            ClassSession(
+                id=1, location_id=1, program_type_id=1, trainer_id=1,
+                starts_at=datetime(2026, 3, 2, 18, 0), ends_at=datetime(2026, 3, 2, 19, 0),
+                weekday=0, start_time=time(18, 0), end_time=time(19, 0), capacity=10,
+            ),
+        ])
+        db.commit()
+    return session_factory
+
+
+def test_catalog_crud_and_delete_guard(client):
+    created = client.post("/api/v1/admin/trainers", json={"full_name": "Maria"})
+    assert created.status_code == 201
+    trainer_id = created.json()["id"]
+
+    patched = client.patch(f"/api/v1/admin/trainers/{trainer_id}", json={"phone": "+37360000000"})
+    assert patched.json()["full_name"] == "Maria" and patched.json()["phone"] == "+37360000000"
+
+    in_use = client.delete("/api/v1/admin/trainers/1")
+    assert in_use.status_code == 409
+    assert in_use.json()["code"] == "TRAINER_IN_USE"
+
+    assert client.delete(f"/api/v1/admin/trainers/{trainer_id}").status_code == 204
+    assert client.patch(f"/api/v1/admin/trainers/{trainer_id}", json={}).status_code == 404
+
+
+def test_class_session_validation(client):
+    payload = {
+        "location_id": 1, "program_type_id": 1, "trainer_id": 99,
+        "weekday": 1, "start_time": "10:00", "end_time": "11:00", "capacity": 5,
+    }
+    response = client.post("/api/v1/admin/class-sessions/", json=payload)
+    assert response.status_code == 422
+    assert response.json()["code"] == "UNKNOWN_REFERENCE"
+
+    payload["trainer_id"] = 2
+    created = client.post("/api/v1/admin/class-sessions/?season_start=2026-09-01", json=payload)
+    assert created.status_code == 201
+    assert client.patch(f"/api/v1/admin/class-sessions/{created.json()['id']}", json={"weekday": 9}).status_code == 422
+
+
+def test_class_session_patch_rejects_null_for_required_fields(client):
+    for field in ("capacity", "weekday", "location_id", "start_time", "is_active"):
+        response = client.patch("/api/v1/admin/class-sessions/1", json={field: None})
+        assert response.status_code == 422, (field, response.text)
+
+    response = client.patch("/api/v1/admin/class-sessions/1", json={"trainer_id": None})
+    assert response.status_code == 422 and response.json()["code"] == "TRAINER_REQUIRED"
+
+    # тариф необязателен — его можно очистить
+    response = client.patch("/api/v1/admin/class-sessions/1", json={"membership_plan_id": None})
+    assert response.status_code == 200
+    assert response.json()["membership_plan_id"] is None
+
+
+def test_import_upserts_in_one_transaction(client, session_factory):
+    with session_factory() as db:
+        before = get_schedule_version(db, 1)
+
+    csv_body = (
+        HEADER
+        + ",1,1,1,mon,18:00,19:00,12\n"    # существующее занятие по ключу: меняется вместимость
+        + ",1,1,2,wed,10:00,11:00,8\n"     # новое
+        + ",2,1,2,fri,09:00,10:00,6\n"     # новое в другой локации
+    )
+    response = client.post("/api/v1/admin/class-sessions/import?season_start=2026-09-01", content=csv_body)
+
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert (report["created"], report["updated"], report["unchanged"]) == (2, 1, 0)
+    with session_factory() as db:
+        assert db.get(ClassSession, 1).capacity == 12
+        assert db.query(ClassSession).count() == 3
+        assert get_schedule_version(db, 1) > before
+
+    again = client.post("/api/v1/admin/class-sessions/import?season_start=2026-09-01", content=csv_body)
+    assert again.json()["unchanged"] == 3
+
+
+def test_import_reports_errors_and_overlaps_without_writing(client, session_factory):
+    csv_body = (
+        HEADER
+        + ",1,1,2,tue,10:00,11:00,8\n"
+        + ",2,1,2,tue,10:30,11:30,8\n"     # тот же тренер в другой студии
+        + ",1,7,1,tue,12:00,13:00,8\n"     # неизвестный тип программы
+        + ",1,1,1,xyz,12:00,13:00,8\n"     # некорректный день недели
+    )
+    response = client.post("/api/v1/admin/class-sessions/import", content=csv_body)
+
+    assert response.status_code == 422
+    report = response.json()
+    assert [(e["line"], e["code"]) for e in report["errors"]] == [(4, "UNKNOWN_REFERENCE"), (5, "INVALID_VALUE")]
+    assert [(c["line"], c["other_line"]) for c in report["conflicts"]] == [(3, 2)]
+    with session_factory() as db:
+        assert db.query(ClassSession).count() == 1
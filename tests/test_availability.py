@@ -0,0 +1,86 @@
+# tests/test_availability.py
+
+from datetime import datetime, time
+
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import AppError
+from app.models import ClassSession, Location, ProgramType, Trainer
+from app.services.availability import (
+    AvailabilityService,
+    merge_intervals,
+    parse_working_hours,
+    subtract_intervals,
+)
+
+
+def test_interval_arithmetic():
+    assert merge_intervals([(50, 60), (0, 10), (5, 20), (20, 30), (70, 70)]) == [(0, 30), (50, 60)]
+    assert subtract_intervals([(0, 100), (200, 300)], [(-10, 5), (20, 30), (90, 210), (290, 400)]) == [
+        (5, 20), (30, 90), (210, 290),
+    ]
+    assert subtract_intervals([(0, 100)], []) == [(0, 100)]
+
+
+def test_parse_working_hours():
+    hours = parse_working_hours("mon-fri 08:00-21:00; sat 09:00-15:00")
+    assert hours[0] == hours[4] == [(480, 1260)]
+    assert hours[5] == [(540, 900)]
+    assert hours[6] == []
+    with pytest.raises(ValueError):
+        parse_working_hours("xyz 08:00-21:00")
+
+
+@pytest.fixture
+def db(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "WORKING_HOURS", "mon-fri 08:00-21:00")
+    monkeypatch.setattr(settings, "AVAILABILITY_STEP_MINUTES", 30)
+    monkeypatch.setattr(settings, "AVAILABILITY_BUFFER_MINUTES", 15)
+    monkeypatch.setattr(settings, "AVAILABILITY_MIN_LEAD_MINUTES", 120)
+
+    def session(session_id, location_id, trainer_id, start_hour, end_hour):
+        return ClassSession(
+            id=session_id, location_id=location_id, program_type_id=1, trainer_id=trainer_id, weekday=0,
+            starts_at=datetime(2026, 3, 2, start_hour), ends_at=datetime(2026, 3, 2, end_hour),
+            start_time=time(start_hour), end_time=time(end_hour), capacity=10, is_active=True,
+        )
+
+    with session_factory() as db:
+        db.add_all([
+            Location(id=1, name="Center"), Location(id=2, name="Riscani"),
+            ProgramType(id=1, name="Group Stretching", is_group=True),
+            ProgramType(id=2, name="Personal", is_group=False),
+            Trainer(id=1, full_name="Anna"), Trainer(id=2, full_name="Olga"),
+            # у тренера 1 занятие и в другой студии — оно тоже занимает время
+            session(1, 1, 1, 10, 11), session(2, 2, 1, 14, 15), session(3, 1, 2, 8, 12),
+        ])
+        db.commit()
+        yield db
+
+
+def test_next_free_slots_skips_busy_time_with_buffer(db):
+    # понедельник 06:00 + 2 часа на запись → с 08:00
+    slots = AvailabilityService(db).next_free_slots(1, program_type_id=2, limit=6, now=datetime(2026, 3, 2, 6))
+
+    assert [(slot.starts_at.strftime("%H:%M"), slot.trainer_id) for slot in slots] == [
+        ("08:00", 1), ("08:30", 1), ("11:30", 1), ("12:00", 1), ("12:30", 1), ("12:30", 2),
+    ]
+    assert all(slot.location_id == 1 and (slot.ends_at - slot.starts_at).seconds == 3600 for slot in slots)
+
+
+def test_next_free_slots_for_trainer_rolls_over_to_next_day(db):
+    slots = AvailabilityService(db).next_free_slots(
+        1, trainer_id=1, duration_minutes=90, limit=2, now=datetime(2026, 3, 2, 19, 10)
+    )
+    assert [slot.starts_at for slot in slots] == [datetime(2026, 3, 3, 8), datetime(2026, 3, 3, 8, 30)]
+
+
+def test_next_free_slots_rejects_group_program_and_unknown_ids(db):
+    service = AvailabilityService(db)
+    with pytest.raises(AppError) as exc:
+        service.next_free_slots(1, program_type_id=1)
+    assert exc.value.code == "PROGRAM_IS_GROUP"
+    with pytest.raises(AppError) as exc:
+        service.next_free_slots(1, trainer_id=99)
+    assert exc.value.code == "UNKNOWN_REFERENCE"
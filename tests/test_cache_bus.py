@@ -0,0 +1,100 @@
+# tests/test_cache_bus.py
+
+from datetime import datetime, time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.schema import ensure_schema
+from app.models import ClassSession, Location, ProgramType, Trainer
+from app.services.cache_bus import CacheBus
+
+
+@pytest.fixture()
+def db_path(tmp_path):
+    path = tmp_path / "bus.db"
+    ensure_schema(create_engine(f"sqlite:///{path}"))
+    return path
+
+
+def test_version_check_sees_writes_of_another_worker(db_path):
+    bus = CacheBus()
+    calls = []
+    bus.subscribe({"locations"}, lambda: calls.append("locations"))
+    bus.subscribe({"trainers"}, lambda: calls.append("trainers"))
+    bus.start(create_engine(f"sqlite:///{db_path}"))
+    try:
+        # «другой воркер» — отдельный engine со своими соединениями
+        other = sessionmaker(bind=create_engine(f"sqlite:///{db_path}"))
+        assert bus.check() == set()
+
+        with other() as db:
+            db.add(Location(name="Center"))
+            db.commit()
+
+        assert bus.check() == {"locations"}
+        assert calls == ["locations"]
+        # без новых коммитов — только PRAGMA data_version, без сброса
+        assert bus.check() == set()
+    finally:
+        bus.stop()
+
+
+def test_version_check_covers_every_shard(tmp_path, db_path):
+    shard_path = tmp_path / "shard.db"
+    ensure_schema(create_engine(f"sqlite:///{shard_path}"))
+    bus = CacheBus()
+    calls = []
+    bus.subscribe({"class_sessions"}, lambda: calls.append("class_sessions"))
+    bus.start({
+        "primary": create_engine(f"sqlite:///{db_path}"),
+        "balti": create_engine(f"sqlite:///{shard_path}"),
+    })
+    try:
+        shard = sessionmaker(bind=create_engine(f"sqlite:///{shard_path}"))
+        with shard() as db:
+            db.add_all([Location(id=100, name="Balti"), ProgramType(id=1, name="Yoga"),
+                        Trainer(id=1, full_name="Anna")])
+            db.flush()
+            db.add(ClassSession(
+                location_id=100, program_type_id=1, trainer_id=1, weekday=0,
+                starts_at=datetime(2026, 3, 2, 18), ends_at=datetime(2026, 3, 2, 19),
+                start_time=time(18), end_time=time(19), capacity=10,
+            ))
+            db.commit()
+
+        assert bus.check() == {"locations", "program_types", "trainers", "class_sessions"}
+        assert calls == ["class_sessions"]
+        assert bus.check() == set()
+    finally:
+        bus.stop()
+
+
+def test_socket_push_reaches_other_worker(tmp_path, db_path):
+    sender, receiver = CacheBus(), CacheBus()
+    calls = []
+    receiver.subscribe({"trainers"}, lambda: calls.append("trainers"))
+    sender.start(create_engine(f"sqlite:///{db_path}"), str(tmp_path / "bus"))
+    receiver.start(create_engine(f"sqlite:///{db_path}"), str(tmp_path / "bus"))
+    try:
+        sender.publish({"trainers", "leads"})
+        assert receiver.drain() == {"trainers"}  # чужие таблицы отбрасываются
+        assert calls == ["trainers"]
+    finally:
+        sender.stop()
+        receiver.stop()
+
+
+def test_flush_bumps_table_versions(db_path):
+    factory = sessionmaker(bind=create_engine(f"sqlite:///{db_path}"))
+    with factory() as db:
+        db.add(Trainer(full_name="Anna"))
+        db.commit()
+        db.add(Trainer(full_name="Ion"))
+        db.rollback()
+
+    from app.repositories.table_version_repo import load_table_versions
+
+    with factory() as db:
+        assert load_table_versions(db.connection()) == {"trainers": 1}
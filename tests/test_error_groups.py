@@ -0,0 +1,110 @@
+# tests/test_error_groups.py
+
+import json
+import logging
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.error_groups import ErrorGroups, error_groups
+from app.core.exceptions import UnhandledErrorMiddleware
+from app.main import app as main_app
+
+
+def fail(kind):
+    if kind == "key":
+        return {}["missing"]
+    raise RuntimeError(f"db is down ({kind})")
+
+
+def caught(kind):
+    try:
+        fail(kind)
+    except Exception as exc:
+        return exc
+
+
+def test_groups_by_type_and_frames_and_limits_traces():
+    groups = ErrorGroups(window_seconds=60, traces_per_window=2, max_groups=10, frames=3)
+
+    # сообщение разное, место и тип одинаковые — одна группа
+    first = [groups.record(caught(f"attempt {i}")) for i in range(5)]
+    assert len({o.group.fingerprint for o in first}) == 1
+    assert [o.log_trace for o in first] == [True, True, False, False, False]
+    assert groups.record(caught("key")).group.fingerprint != first[0].group.fingerprint
+
+    # новое окно: стек снова пишется, в лог уходит число подавленных
+    first[0].group.window_started -= 60
+    rolled = groups.record(caught("later"))
+    assert rolled.log_trace and rolled.repeated == 3
+
+    (runtime, key_error) = groups.snapshot()
+    assert key_error["exc_type"] == "builtins.KeyError" and key_error["count"] == 1
+    assert runtime["count"] == 6 and "in fail" in runtime["where"]
+
+
+def parse(text):
+    return json.loads(text)  # ошибка вылетает в модуле json, а не здесь
+
+
+def parse_caught(text):
+    try:
+        parse(text)
+    except Exception as exc:
+        return exc
+
+
+def test_fingerprint_uses_project_frames():
+    # «проект» — каталог тестов: кадры json/decoder.py в отпечаток не идут
+    groups = ErrorGroups(window_seconds=60, traces_per_window=1, max_groups=10, frames=1,
+                         root=os.path.dirname(os.path.abspath(__file__)))
+    first = groups.record(parse_caught("{"))
+    second = groups.record(parse_caught("["))
+    assert first.group is second.group
+    assert first.group.where.startswith("test_error_groups.py:") and first.group.where.endswith("in parse")
+
+
+def test_flush_logs_repeats_after_the_outage_ends(caplog):
+    groups = ErrorGroups(window_seconds=60, traces_per_window=1, max_groups=10, frames=3)
+    occurrences = [groups.record(caught("outage")) for _ in range(4)]
+    assert groups.flush() == 0  # окно ещё идёт
+
+    occurrences[0].group.window_started -= 60
+    with caplog.at_level(logging.ERROR, logger="cohai"):
+        assert groups.flush() == 1
+    assert "repeated 3 more time(s)" in caplog.records[-1].getMessage()
+    assert groups.flush(force=True) == 0  # уже сброшено
+
+
+def test_groups_are_bounded():
+    groups = ErrorGroups(window_seconds=60, traces_per_window=1, max_groups=1, frames=3)
+    groups.record(caught("a"))
+    groups.record(caught("key"))
+    assert [g["exc_type"] for g in groups.snapshot()] == ["builtins.KeyError"]
+
+
+def test_handler_logs_trace_only_for_first_occurrences(caplog, monkeypatch):
+    error_groups.reset()
+    monkeypatch.setattr(error_groups, "traces_per_window", 2)
+    app = FastAPI()
+    app.add_middleware(UnhandledErrorMiddleware)
+
+    @app.get("/boom")
+    def boom():
+        fail("outage")
+
+    # ошибка не пробрасывается серверу: TestClient поднял бы её здесь
+    client = TestClient(app)
+    with caplog.at_level(logging.ERROR, logger="cohai"):
+        responses = [client.get("/boom") for _ in range(10)]
+
+    assert {r.status_code for r in responses} == {500}
+    assert len({r.json()["error_group"] for r in responses}) == 1
+    traces = [r for r in caplog.records if r.getMessage().startswith("Unhandled error") and r.exc_info]
+    assert len(traces) == 2
+
+    groups = TestClient(main_app).get("/api/v1/admin/metrics/errors").json()
+    assert groups[0]["count"] == 10 and groups[0]["suppressed_in_window"] == 8
+    assert groups[0]["last_path"] == "GET /boom"
+    error_groups.reset()
@@ -0,0 +1,91 @@
+# tests/test_job_scheduler.py
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.metrics import metrics
+from app.db.schema import ensure_schema
+from app.repositories.job_lease_repo import JobLeaseRepository
+from app.services.job_scheduler import CronTrigger, IntervalTrigger, JobScheduler
+
+
+def test_cron_next_after():
+    at = datetime(2026, 10, 19, 14, 7, 30)  # понедельник
+    assert CronTrigger("*/15 * * * *").next_after(at) == datetime(2026, 10, 19, 14, 15)
+    assert CronTrigger("30 3 * * *").next_after(at) == datetime(2026, 10, 20, 3, 30)
+    assert CronTrigger("0 9 * * 6,7").next_after(at) == datetime(2026, 10, 24, 9, 0)
+    assert CronTrigger("0 0 1 1 *").next_after(at) == datetime(2027, 1, 1, 0, 0)
+    # день месяца ИЛИ день недели, как в cron
+    assert CronTrigger("0 12 25 * 3").next_after(at) == datetime(2026, 10, 21, 12, 0)
+    with pytest.raises(ValueError):
+        CronTrigger("61 * * * *")
+    with pytest.raises(ValueError):
+        CronTrigger("* * *")
+
+
+def test_interval_slots_are_aligned_across_workers():
+    trigger = IntervalTrigger(3600)
+    assert trigger.next_after(datetime(2026, 10, 19, 14, 7)) == datetime(2026, 10, 19, 15, 0)
+    assert trigger.next_after(datetime(2026, 10, 19, 15, 0)) == datetime(2026, 10, 19, 16, 0)
+
+
+@pytest.fixture
+def factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    ensure_schema(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_slot_runs_once_across_workers(factory):
+    calls = []
+    workers = [JobScheduler(factory), JobScheduler(factory)]
+    for scheduler in workers:
+        scheduler.add("cleanup", lambda: calls.append(1), every=60, timeout=5, jitter=0)
+
+    slot = datetime(2026, 10, 19, 14, 0)
+
+    async def run(slot_at):
+        return await asyncio.gather(*(s.run_once(s.jobs["cleanup"], slot_at) for s in workers))
+
+    assert sorted(asyncio.run(run(slot))) == ["ok", "skipped"]
+    assert len(calls) == 1
+    # следующий слот снова берёт кто-то один
+    assert sorted(asyncio.run(run(datetime(2026, 10, 19, 14, 1)))) == ["ok", "skipped"]
+    assert len(calls) == 2
+
+    with factory() as db:
+        (lease,) = JobLeaseRepository(db).list_all()
+    assert lease.status == "ok" and lease.slot_at == datetime(2026, 10, 19, 14, 1)
+
+
+def test_timeout_keeps_lease_and_failure_is_recorded(factory):
+    metrics.reset()
+    scheduler = JobScheduler(factory, lease_margin_seconds=60)
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    def broken():
+        raise RuntimeError("boom")
+
+    scheduler.add("slow", slow, every=60, timeout=0.05, jitter=0)
+    scheduler.add("broken", broken, cron="* * * * *", timeout=5, jitter=0)
+
+    async def run():
+        first = await scheduler.run_once(scheduler.jobs["slow"], datetime(2026, 10, 19, 14, 0))
+        # аренда не снята после таймаута: следующий слот ждёт её истечения
+        second = await scheduler.run_once(scheduler.jobs["slow"], datetime(2026, 10, 19, 14, 1))
+        third = await scheduler.run_once(scheduler.jobs["broken"], datetime(2026, 10, 19, 14, 0))
+        return first, second, third
+
+    assert asyncio.run(run()) == ("timeout", "skipped", "failed")
+    counters = metrics.snapshot()["counters"]
+    assert counters["jobs.slow.timeouts"] == 1 and counters["jobs.slow.skipped"] == 1
+    assert counters["jobs.broken.failed"] == 1
+    assert "boom" in scheduler.jobs["broken"].last_error
+    leases = {lease["name"]: lease for lease in scheduler.leases()}
+    assert leases["broken"]["status"] == "failed" and leases["slow"]["status"] == "running"
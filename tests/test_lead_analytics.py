@@ -0,0 +1,83 @@
+# tests/test_lead_analytics.py
+
+from datetime import date
+
+from app.models import LeadDailyStat
+from app.schemas.lead import LeadCreateGuestVisit
+from app.services.analytics_service import AnalyticsService
+from app.services.lead_service import LeadService
+
+
+def rollup(db):
+    return sorted(
+        (str(s.day), s.location_id, s.program_type_id, s.leads_count, s.processed_count, round(s.process_seconds_total, 1))
+        for s in db.query(LeadDailyStat)
+    )
+
+
+def test_incremental_rollup_matches_rebuild(session_factory):
+    with session_factory() as db:
+        service = LeadService(db)
+        ids = []
+        for location_id, program_type_id in [(1, 1), (1, 1), (2, 1), (2, 3)]:
+            payload = LeadCreateGuestVisit(
+                first_name="Anna", phone="+37360000000",
+                location_id=location_id, program_type_id=program_type_id,
+            )
+            ids.append(service.create_guest_visit(payload).id)
+        service.mark_processed(ids[0])
+        service.mark_processed(ids[0])  # повторная обработка не считается
+        service.mark_processed(ids[2])
+
+        incremental = rollup(db)
+        AnalyticsService(db).rebuild(chunk_size=2)
+        assert rollup(db) == incremental
+
+        today = date.today()
+        [total] = AnalyticsService(db).summary(today, today)
+        assert total["leads"] == 4
+        assert total["processed"] == 2
+        assert total["processed_ratio"] == 0.5
+
+        by_location = AnalyticsService(db).summary(today, today, group_by="location")
+        assert [(row["location_id"], row["leads"]) for row in by_location] == [(1, 2), (2, 2)]
+
+
+def test_rebuild_is_a_single_transaction(session_factory):
+    with session_factory() as db:
+        service = LeadService(db)
+        for _ in range(5):
+            service.create_guest_visit(LeadCreateGuestVisit(
+                first_name="Anna", phone="+37360000000", location_id=1, program_type_id=1,
+            ))
+        before = rollup(db)
+
+        commits = []
+        original = db.commit
+        db.commit = lambda: (commits.append(1), original())[1]
+        assert AnalyticsService(db).rebuild(chunk_size=2) == 3
+        assert commits == [1]
+        assert rollup(db) == before
+
+
+def test_average_process_time_ignores_leads_without_processed_at(session_factory):
+    from datetime import datetime, timedelta
+
+    from app.models import Lead
+
+    created = datetime.utcnow().replace(microsecond=0) - timedelta(hours=4)
+    with session_factory() as db:
+        db.add_all([
+            Lead(full_name="Timed", phone="1", location_id=1, created_at=created,
+                 is_processed=True, processed_at=created + timedelta(hours=2)),
+            # старый лид: обработан, но без processed_at
+            Lead(full_name="Legacy", phone="2", location_id=1, created_at=created, is_processed=True),
+        ])
+        db.commit()
+        AnalyticsService(db).rebuild()
+
+        [total] = AnalyticsService(db).summary(created.date(), created.date())
+        assert total["processed"] == 2
+        assert total["avg_process_hours"] == 2.0
+        [row] = AnalyticsService(db).daily(created.date(), created.date())
+        assert row["avg_process_hours"] == 2.0
@@ -0,0 +1,89 @@
+# tests/test_membership_compare.py
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.schema import ensure_schema
+from app.models import Location, MembershipPlan
+from app.repositories.read_models import MembershipPlanRow
+from app.services.membership_compare import PlanCatalog, get_plan_catalog
+
+
+def plan(plan_id, price, days, limit=None, is_active=True):
+    return MembershipPlanRow((plan_id, f"Plan {plan_id}", None, price, days, limit, 1, is_active))
+
+
+def test_rank_accounts_for_visits_limit():
+    catalog = PlanCatalog([
+        plan(1, 25, 7),             # пробная неделя
+        plan(2, 70, 30, limit=8),   # 8 занятий
+        plan(3, 90, 30),            # безлимит на месяц
+        plan(4, 10, 30, is_active=False),
+    ])
+
+    rare = catalog.rank(1)
+    assert [s.plan.id for s in rare] == [2, 3, 1]
+    assert rare[0].expected_visits == 4.3
+
+    # 3 раза в неделю лимит в 8 занятий уже мешает — выгоднее безлимит
+    often = catalog.rank(3)
+    assert [s.plan.id for s in often] == [3, 1, 2]
+    assert often[0].cost_per_visit == 7.0 and often[0].cost_per_day == 3.0
+    assert often[2].expected_visits == 8.0 and often[2].cost_per_visit == 8.75
+    assert catalog.rank(3) is often
+
+
+def test_compare_endpoint(client, session_factory):
+    with session_factory() as db:
+        db.add_all([
+            Location(id=1, name="Center"),
+            MembershipPlan(id=1, name="8 Classes", price=70, duration_days=30, visits_limit=8, location_id=1),
+            MembershipPlan(id=2, name="Monthly Unlimited", price=90, duration_days=30, location_id=1),
+        ])
+        db.commit()
+
+    response = client.get("/api/v1/memberships/compare", params={"location_id": 1, "visits_per_week": 3})
+    missing = client.get("/api/v1/memberships/compare", params={"location_id": 42})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["recommended_plan_id"] == 2
+    assert [(p["id"], p["rank"], p["cost_per_visit"]) for p in data["plans"]] == [(2, 1, 7.0), (1, 2, 8.75)]
+    assert missing.status_code == 404
+
+
+def test_lagging_replica_catalog_is_not_cached(session_factory, tmp_path, monkeypatch):
+    from app.db import session as db_session
+
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    ensure_schema(replica)
+    for factory in (session_factory, sessionmaker(bind=replica)):
+        with factory() as db:
+            db.add_all([Location(id=1, name="Center"),
+                        MembershipPlan(id=1, name="Monthly", price=90, duration_days=30, location_id=1)])
+            db.commit()
+    monkeypatch.setattr(db_session, "_session_factory", session_factory)
+
+    with session_factory() as db:
+        db.get(MembershipPlan, 1).price = 80
+        db.commit()  # сброс кэша; реплика эту запись ещё не получила
+
+    def replica_session():
+        db = sessionmaker(bind=replica)()
+        db.info["replica"] = "replica"
+        return db
+
+    with replica_session() as db:
+        stale = get_plan_catalog(db, 1)
+        assert stale.plans[0].price == 90
+    with replica_session() as db:
+        assert get_plan_catalog(db, 1) is not stale
+
+    # реплика догнала primary — её каталог снова кэшируется
+    with sessionmaker(bind=replica)() as db:
+        db.get(MembershipPlan, 1).price = 80
+        db.commit()
+    with replica_session() as db:
+        fresh = get_plan_catalog(db, 1)
+    with replica_session() as db:
+        assert get_plan_catalog(db, 1) is fresh
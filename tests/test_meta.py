@@ -0,0 +1,31 @@
+# tests/test_meta.py
+
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def test_root_is_alive():
+    """Liveness-эндпоинт отвечает всегда, без прогрева."""
+    client = TestClient(app)
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.json()["docs"] == "/docs"
+
+
+def test_ready_after_warmup():
+    """После старта lifespan /ready переходит из 503 в 200."""
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 10
+        response = client.get("/ready")
+        while response.status_code != 200 and time.monotonic() < deadline:
+            assert response.json()["status"] == "warming"
+            time.sleep(0.05)
+            response = client.get("/ready")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert "locations" in data["stats"]
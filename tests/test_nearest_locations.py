@@ -0,0 +1,47 @@
+# tests/test_nearest_locations.py
+
+import math
+import random
+
+from app.models import Location
+from app.services.location_index import KDTree, get_location_index, invalidate_location_index, to_unit_vector
+
+
+def test_kdtree_matches_brute_force():
+    rng = random.Random(7)
+    # включая точки у полюса и по обе стороны 180-го меридиана
+    coords = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(500)]
+    coords += [(89.9, 10.0), (0.0, 179.9), (0.0, -179.9)]
+    points = [to_unit_vector(lat, lon) for lat, lon in coords]
+    tree = KDTree(points, list(range(len(points))))
+
+    for lat, lon in [(0.0, 179.95), (89.0, -170.0)] + [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(50)]:
+        target = to_unit_vector(lat, lon)
+        expected = sorted(range(len(points)), key=lambda i: math.dist(points[i], target))[:7]
+        assert [item for _, item in tree.nearest(target, 7)] == expected
+
+
+def test_index_rebuilt_after_location_commit(session_factory):
+    invalidate_location_index()
+
+    with session_factory() as db:
+        db.add_all([
+            Location(name="Center", latitude=47.0245, longitude=28.8323),
+            Location(name="West", latitude=47.0335, longitude=28.7645),
+            Location(name="No coordinates"),
+        ])
+        db.commit()
+
+    with session_factory() as db:
+        nearest = get_location_index(db).nearest(47.03, 28.77, limit=5)
+        assert [loc.name for loc, _ in nearest] == ["West", "Center"]
+        assert nearest[0][1] < 1.0
+
+    with session_factory() as db:
+        db.add(Location(name="Botanica", latitude=47.03, longitude=28.771))
+        db.commit()
+
+    with session_factory() as db:
+        [(location, distance_km)] = get_location_index(db).nearest(47.03, 28.77, limit=1)
+        assert location.name == "Botanica"
+    invalidate_location_index()
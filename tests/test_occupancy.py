@@ -0,0 +1,89 @@
+# tests/test_occupancy.py
+
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app.models import ClassSession, Lead, Location, ProgramType, Trainer
+from app.services.occupancy_service import (
+    CELLS_PER_LOCATION, OccupancyService, WeeklySlots, clear_occupancy_cache,
+)
+
+MONDAY = date(2026, 3, 2)
+
+
+def session_row(weekday, hour, capacity, program_type_id=1, location_id=1):
+    starts_at = datetime.combine(MONDAY + timedelta(days=weekday), time(hour, 0))
+    return ClassSession(
+        location_id=location_id, program_type_id=program_type_id, trainer_id=1,
+        starts_at=starts_at, ends_at=starts_at + timedelta(hours=1),
+        weekday=weekday, start_time=time(hour, 0), end_time=time(hour + 1, 0),
+        capacity=capacity, is_active=True,
+    )
+
+
+def lead_row(created_at, program_type_id=1, location_id=1):
+    return Lead(
+        full_name="Anna", phone="+37360000000", location_id=location_id,
+        program_type_id=program_type_id, created_at=created_at,
+    )
+
+
+@pytest.fixture()
+def db(session_factory):
+    clear_occupancy_cache()
+    with session_factory() as session:
+        session.add_all([Location(id=1, name="Center"), ProgramType(id=1, name="Stretch"),
+                         ProgramType(id=2, name="Yoga"), Trainer(id=1, full_name="Olga")])
+        # понедельник 18:00 и среда 10:00, по 2 места
+        session.add_all([session_row(0, 18, 2), session_row(2, 10, 2)])
+        session.add_all([
+            lead_row(datetime.combine(MONDAY, time(9, 0))),                       # → пн 18:00
+            lead_row(datetime.combine(MONDAY, time(17, 59))),                     # → пн 18:00
+            lead_row(datetime.combine(MONDAY + timedelta(days=1), time(12, 0))),  # → ср 10:00
+            lead_row(datetime.combine(MONDAY + timedelta(days=6), time(20, 0))),  # → пн 18:00 (перенос)
+            lead_row(datetime.combine(MONDAY, time(9, 0)), program_type_id=2),    # нет занятий
+        ])
+        session.commit()
+        yield session
+
+
+def test_heatmap_attributes_leads_to_next_session(db):
+    heatmap = OccupancyService(db).heatmap(1, MONDAY, MONDAY + timedelta(days=6))
+
+    assert heatmap["weeks"] == 1
+    assert heatmap["capacity"][0][18] == 2
+    assert heatmap["demand"][0][18] == 3
+    assert heatmap["utilization"][0][18] == 1.5
+    assert heatmap["demand"][2][10] == 1
+    assert heatmap["utilization"][3][12] is None
+    assert heatmap["unmatched_leads"] == 1
+
+    # повтор из кэша недели даёт тот же результат
+    assert OccupancyService(db).heatmap(1, MONDAY, MONDAY) == {**heatmap, "date_to": MONDAY}
+
+
+def test_slots_split_over_and_under(db):
+    result = OccupancyService(db).slots(MONDAY, MONDAY, over=1.0, under=0.5)
+    assert [(s["weekday"], s["hour"]) for s in result["over"]] == [(0, 18)]
+    assert [(s["weekday"], s["hour"], s["utilization"]) for s in result["under"]] == [(2, 10, 0.5)]
+
+
+def test_sparse_location_ids_use_compact_cells(db):
+    db.add_all([Location(id=2500, name="Balti"), session_row(4, 9, 1, location_id=2500)])
+    db.add(lead_row(datetime.combine(MONDAY, time(8, 0)), location_id=2500))  # → пт 09:00
+    db.commit()
+
+    slots = WeeklySlots(OccupancyService(db).sessions.list_active_slots())
+    assert slots.size == 2 * CELLS_PER_LOCATION
+
+    heatmap = OccupancyService(db).heatmap(2500, MONDAY, MONDAY)
+    assert heatmap["demand"][4][9] == 1
+    assert heatmap["utilization"][4][9] == 1.0
+    assert OccupancyService(db).heatmap(1500, MONDAY, MONDAY)["demand"][4][9] == 0
+
+    result = OccupancyService(db).slots(MONDAY, MONDAY, over=1.0, under=0.5, location_id=2500)
+    assert [(s["location_id"], s["location_name"], s["weekday"], s["hour"]) for s in result["over"]] == [
+        (2500, "Balti", 4, 9),
+    ]
+    assert result["under"] == []
@@ -0,0 +1,68 @@
+# tests/test_outbox.py
+
+import json
+
+from app.models import Lead, OutboxMessage
+from app.schemas.lead import LeadCreateGuestVisit
+from app.services.lead_service import LeadService
+from app.services.notifications import FileSink
+from app.services.outbox_dispatcher import OutboxDispatcher
+
+
+def create_lead(session_factory):
+    with session_factory() as db:
+        payload = LeadCreateGuestVisit(
+            first_name="Anna", phone="+37360000000", location_id=1, program_type_id=1,
+        )
+        return LeadService(db).create_guest_visit(payload).id
+
+
+class FlakySink:
+    name = "flaky"
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.sent = []
+
+    def send(self, topic, payload):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("smtp down")
+        self.sent.append((topic, payload))
+
+
+def test_lead_and_outbox_written_together(session_factory):
+    lead_id = create_lead(session_factory)
+    with session_factory() as db:
+        assert db.get(Lead, lead_id) is not None
+        message = db.query(OutboxMessage).one()
+        assert message.topic == "lead.created"
+        assert json.loads(message.payload)["lead_id"] == lead_id
+
+
+def test_dispatcher_delivers_to_file_sink(session_factory, tmp_path):
+    create_lead(session_factory)
+    sink_path = tmp_path / "notifications.jsonl"
+    dispatcher = OutboxDispatcher(session_factory, [FileSink(str(sink_path))])
+
+    assert dispatcher.dispatch_once() == 1
+    assert dispatcher.dispatch_once() == 0  # уже доставлено
+
+    line = json.loads(sink_path.read_text(encoding="utf-8"))
+    assert line["topic"] == "lead.created"
+
+
+def test_failed_delivery_is_retried_with_backoff(session_factory):
+    create_lead(session_factory)
+    sink = FlakySink(failures=1)
+    dispatcher = OutboxDispatcher(session_factory, [sink], backoff_seconds=0)
+
+    assert dispatcher.dispatch_once() == 1
+    assert sink.sent == []
+    with session_factory() as db:
+        message = db.query(OutboxMessage).one()
+        assert message.attempts == 1 and message.sent_at is None
+        assert "smtp down" in message.last_error
+
+    assert dispatcher.dispatch_once() == 1
+    assert len(sink.sent) == 1
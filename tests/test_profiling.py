@@ -0,0 +1,57 @@
+# tests/test_profiling.py
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import profiling
+from app.core.config import settings
+from app.main import app
+
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    """Профили тестов — во временный каталог, а не в logs/profiles репозитория."""
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path / "profiles")
+    return tmp_path / "profiles"
+
+
+def test_profile_header_saves_and_lists_profile(monkeypatch, profile_dir):
+    """Запрос с админским заголовком профилируется и доступен в админке."""
+    monkeypatch.setattr(settings, "PROFILE_TOKEN", "secret")
+
+    response = client.get("/api/v1/locations", headers={settings.PROFILE_HEADER: "secret"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    names = [p["name"] for p in client.get("/api/v1/admin/profiles/").json()]
+    assert f"{profile_id}.collapsed.txt" in names
+    assert (profile_dir / f"{profile_id}.collapsed.txt").is_file()
+
+    speedscope = client.get(f"/api/v1/admin/profiles/{profile_id}.speedscope.json")
+    assert speedscope.status_code == 200
+    assert speedscope.json()["profiles"][0]["type"] == "sampled"
+
+
+def test_wrong_profile_token_is_ignored(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_TOKEN", "secret")
+    response = client.get("/", headers={settings.PROFILE_HEADER: "guess"})
+    assert "X-Profile-Id" not in response.headers
+
+
+def test_download_rejects_unknown_names():
+    assert client.get("/api/v1/admin/profiles/..%2Fapp.log").status_code == 404
+
+
+def test_profiling_is_skipped_while_other_requests_are_in_flight(monkeypatch):
+    """Профайлер видит все потоки: при чужих запросах в обработке профиль не снимаем."""
+    monkeypatch.setattr(settings, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "_in_flight", 1)
+
+    response = client.get("/api/v1/locations", headers={settings.PROFILE_HEADER: "secret"})
+    assert response.status_code == 200
+    assert response.headers["X-Profile-Skipped"] == "busy"
+    assert "X-Profile-Id" not in response.headers
+    assert profiling._in_flight == 1
@@ -0,0 +1,100 @@
+# tests/test_rate_limit.py
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import MemoryBackend, RateLimiter, SqliteBackend
+from app.main import app
+
+
+def test_memory_bucket_refills_and_expires():
+    backend = MemoryBackend(sweep_every=0)
+    assert backend.take("k", capacity=2, refill_per_sec=1, now=100.0) == 0.0
+    assert backend.take("k", capacity=2, refill_per_sec=1, now=100.0) == 0.0
+    assert backend.take("k", capacity=2, refill_per_sec=1, now=100.0) == pytest.approx(1.0)
+    # через полсекунды набежало полтокена — всё ещё рано
+    assert backend.take("k", capacity=2, refill_per_sec=1, now=100.5) == pytest.approx(0.5)
+    assert backend.take("k", capacity=2, refill_per_sec=1, now=101.0) == 0.0
+    # ведро наполнилось — ключ выкидывается при уборке
+    backend.take("other", capacity=2, refill_per_sec=1, now=200.0)
+    assert len(backend) == 1
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "buckets.db")
+    first, second = SqliteBackend(path), SqliteBackend(path)
+    assert first.take("ip:1", capacity=1, refill_per_sec=0.1, now=10.0) == 0.0
+    assert second.take("ip:1", capacity=1, refill_per_sec=0.1, now=10.0) > 0
+
+
+def test_guest_visit_limited_by_phone_before_validation(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_limiter", RateLimiter(MemoryBackend()))
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_PHONE_CAPACITY", 2)
+    client = TestClient(app)
+
+    # неполная заявка: пока лимит не исчерпан — обычная 422 от валидации
+    payload = {"phone": "+373 (60) 000-000"}
+    assert client.post("/api/v1/leads/guest-visit", json=payload).status_code == 422
+    assert client.post("/api/v1/leads/guest-visit", json={"phone": "37360000000"}).status_code == 422
+
+    response = client.post("/api/v1/leads/guest-visit", json=payload)
+    assert response.status_code == 429
+    assert response.json()["code"] == "RATE_LIMITED"
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def test_oversized_body_is_rejected_before_buffering(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_limiter", RateLimiter(MemoryBackend()))
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_MAX_BODY_BYTES", 64)
+    client = TestClient(app)
+
+    response = client.post("/api/v1/leads/guest-visit", json={"phone": "1", "notes": "x" * 100})
+    assert response.status_code == 413
+    assert response.json()["code"] == "PAYLOAD_TOO_LARGE"
+
+
+def test_sqlite_backend_runs_off_the_event_loop(tmp_path, monkeypatch):
+    limiter = RateLimiter(SqliteBackend(str(tmp_path / "buckets.db")))
+    monkeypatch.setattr(rate_limit, "_limiter", limiter)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    calls = []
+    check = limiter.check
+
+    def spy(ip, phone):
+        calls.append(threading.get_ident())
+        return check(ip, phone)
+
+    monkeypatch.setattr(limiter, "check", spy)
+
+    async def downstream(scope, receive, send):
+        await receive()
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def run():
+        loop_thread = threading.get_ident()
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b'{"phone": "37360000001"}', "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http", "method": "POST", "path": settings.RATE_LIMIT_PATHS[0],
+            "headers": [], "client": ("127.0.0.1", 1),
+        }
+        await rate_limit.RateLimitMiddleware(downstream)(scope, receive, send)
+        return loop_thread, sent[0]["status"]
+
+    loop_thread, status = asyncio.run(run())
+    assert status == 204
+    assert calls and loop_thread not in calls
@@ -0,0 +1,52 @@
+# tests/test_read_models.py
+
+from datetime import datetime, time
+
+import pytest
+
+from app.models import ClassSession, Location, MembershipPlan, ProgramType, Trainer
+from app.schemas.class_session import ClassSessionRead
+from app.schemas.location import LocationRead
+from app.schemas.membership import MembershipPlanRead
+from app.schemas.program_type import ProgramTypeRead
+
+
+@pytest.fixture()
+def session_factory(session_factory):
+    with session_factory() as db:
+        db.add_all([
+            Location(id=1, name="Center", address="Main Street 1", latitude=47.02, longitude=28.83),
+            Location(id=2, name="Riscani"),
+            ProgramType(id=1, name="Group Stretching", description="60 min"),
+            Trainer(id=1, full_name="Anna"),
+            MembershipPlan(id=1, name="8 visits", price=900, duration_days=30, location_id=1),
+            MembershipPlan(id=2, name="Unlimited", price=1500, duration_days=30, location_id=2),
+            ClassSession(
+                id=1, location_id=1, program_type_id=1, trainer_id=1,
+                starts_at=datetime(2026, 3, 2, 18, 0), ends_at=datetime(2026, 3, 2, 19, 0),
+                weekday=0, start_time=time(18, 0), end_time=time(19, 0), capacity=10,
+            ),
+        ])
+        db.commit()
+    return session_factory
+
+
+@pytest.mark.parametrize(
+    "url, model, schema",
+    [
+        ("/api/v1/locations", Location, LocationRead),
+        ("/api/v1/program-types", ProgramType, ProgramTypeRead),
+        ("/api/v1/memberships?location_id=1", MembershipPlan, MembershipPlanRead),
+        ("/api/v1/schedule?location_id=1", ClassSession, ClassSessionRead),
+    ],
+)
+def test_read_models_match_orm_serialization(client, session_factory, url, model, schema):
+    with session_factory() as db:
+        rows = db.query(model).order_by(model.id).all()
+        if model in (MembershipPlan, ClassSession):
+            rows = [row for row in rows if row.location_id == 1]
+        expected = [schema.model_validate(row, from_attributes=True).model_dump(mode="json") for row in rows]
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.json() == expected
@@ -0,0 +1,61 @@
+# tests/test_read_replicas.py
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import routing, session as db_session
+from app.db.base import Base
+from app.main import app
+from app.models import Location
+
+
+def make_db(path, location_name):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(Location(name=location_name, address="-"))
+        db.commit()
+    return engine
+
+
+@pytest.fixture()
+def replica_setup(tmp_path, monkeypatch):
+    """Primary и реплика — два разных SQLite-файла с разными данными."""
+    primary = make_db(tmp_path / "primary.db", "Primary")
+    make_db(tmp_path / "replica.db", "Replica")
+
+    monkeypatch.setattr(db_session, "_engine", primary)
+    monkeypatch.setattr(db_session, "_session_factory", sessionmaker(bind=primary))
+
+    def use_replicas(*urls):
+        monkeypatch.setattr(routing, "_router", routing.ReplicaRouter(list(urls), retry_seconds=30))
+
+    use_replicas(f"sqlite:///{tmp_path / 'replica.db'}")
+    yield use_replicas
+    routing.dispose_replicas()
+
+
+def location_names(client):
+    return [loc["name"] for loc in client.get("/api/v1/locations").json()]
+
+
+def test_get_reads_from_replica(replica_setup):
+    assert location_names(TestClient(app)) == ["Replica"]
+
+
+def test_read_your_writes_after_post(replica_setup):
+    client = TestClient(app)
+    response = client.post(
+        "/api/v1/leads/guest-visit",
+        json={"first_name": "Ann", "phone": "+37360000000", "location_id": 1, "program_type_id": 1},
+    )
+    assert response.status_code == 200
+    # клиент только что писал → читает с primary
+    assert location_names(client) == ["Primary"]
+
+
+def test_unreachable_replica_falls_back_to_primary(replica_setup, tmp_path):
+    replica_setup(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    assert location_names(TestClient(app)) == ["Primary"]
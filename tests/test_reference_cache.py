@@ -0,0 +1,78 @@
+# tests/test_reference_cache.py
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.schema import ensure_schema
+from app.models import Location, ProgramType, Trainer
+from app.services.reference_cache import get_reference_data
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'refs.db'}")
+    ensure_schema(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all([Location(id=1, name="Center"), ProgramType(id=1, name="Yoga"), Trainer(id=1, full_name="Anna")])
+        db.commit()
+    return engine
+
+
+def test_lookups_hit_memory_until_a_write(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    factory = sessionmaker(bind=engine)
+
+    with factory() as db:
+        refs = get_reference_data(db)
+        assert refs.location_name(1) == "Center" and refs.trainer_name(1) == "Anna"
+        assert refs.missing(location_id=1, program_type_id=2, trainer_id=None) == {"program_type_id": 2}
+    loaded = len(statements)
+
+    with factory() as db:
+        assert get_reference_data(db) is refs
+    assert len(statements) == loaded  # повторная проверка — без запросов в БД
+
+    with factory() as db:
+        db.get(Location, 1).name = "Centru"
+        db.commit()
+    with factory() as db:
+        assert get_reference_data(db).location_name(1) == "Centru"
+
+
+def test_lagging_replica_snapshot_is_not_cached(engine, tmp_path, monkeypatch):
+    from app.db import session as db_session
+
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    ensure_schema(replica)
+    with sessionmaker(bind=replica)() as db:
+        db.add(Location(id=1, name="Center"))
+        db.commit()
+    monkeypatch.setattr(db_session, "_session_factory", sessionmaker(bind=engine))
+
+    with sessionmaker(bind=engine)() as db:
+        db.get(Location, 1).name = "Centru"
+        db.commit()  # сброс кэша; реплика эту запись ещё не получила
+
+    def replica_session():
+        db = sessionmaker(bind=replica)()
+        db.info["replica"] = "replica"
+        return db
+
+    with replica_session() as db:
+        stale = get_reference_data(db)
+        assert stale.location_name(1) == "Center"
+    with replica_session() as db:
+        assert get_reference_data(db) is not stale
+
+    # реплика догнала primary — её снимок снова кэшируется
+    with sessionmaker(bind=replica)() as db:
+        db.get(Location, 1).name = "Centru"
+        db.add(Trainer(id=1, full_name="Anna"))
+        db.add(ProgramType(id=1, name="Yoga"))
+        db.commit()
+    with replica_session() as db:
+        fresh = get_reference_data(db)
+    with replica_session() as db:
+        assert get_reference_data(db) is fresh
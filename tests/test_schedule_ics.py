@@ -0,0 +1,74 @@
+# tests/test_schedule_ics.py
+
+from datetime import datetime, time
+
+import pytest
+
+from app.models import ClassSession, Location, ProgramType, Trainer
+from app.services.ical_feed import feed_cache, fold_line
+
+
+@pytest.fixture()
+def session_factory(session_factory):
+    with session_factory() as db:
+        db.add_all([
+            Location(id=1, name="Center", address="Main Street 1"),
+            ProgramType(id=1, name="Group Stretching"),
+            Trainer(id=1, full_name="Anna"),
+            ClassSession(
+                id=1, location_id=1, program_type_id=1, trainer_id=1,
+                starts_at=datetime(2026, 3, 2, 18, 0), ends_at=datetime(2026, 3, 2, 19, 0),
+                weekday=2, start_time=time(18, 0), end_time=time(19, 0), capacity=10,
+            ),
+        ])
+        db.commit()
+    feed_cache.clear()
+    return session_factory
+
+
+def test_fold_line_keeps_utf8_characters_whole():
+    line = "SUMMARY:" + "Растяжка " * 20
+    folded = fold_line(line)
+    assert all(len(part.encode("utf-8")) <= 75 for part in folded.split("\r\n"))
+    assert folded.replace("\r\n ", "").rstrip("\r\n") == line
+
+
+def test_feed_renders_weekly_rrule(client):
+    response = client.get("/api/v1/schedule.ics?location_id=1")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/calendar")
+    body = response.text
+    assert body.startswith("BEGIN:VCALENDAR\r\n") and body.endswith("END:VCALENDAR\r\n")
+    # якорь 2 марта (пн) сдвигается на первую среду
+    assert "DTSTART:20260304T180000\r\n" in body
+    assert "RRULE:FREQ=WEEKLY;BYDAY=WE\r\n" in body
+    assert "LOCATION:Center\\, Main Street 1\r\n" in body
+
+
+def test_feed_etag_changes_after_schedule_write(client, session_factory):
+    first = client.get("/api/v1/schedule.ics?location_id=1")
+    etag = first.headers["etag"]
+    assert client.get("/api/v1/schedule.ics?location_id=1", headers={"If-None-Match": etag}).status_code == 304
+
+    with session_factory() as db:
+        db.get(ClassSession, 1).start_time = time(19, 0)
+        db.commit()
+
+    second = client.get("/api/v1/schedule.ics?location_id=1", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+    assert "DTSTART:20260304T190000\r\n" in second.text
+
+
+def test_feed_etag_changes_after_location_rename(client, session_factory):
+    etag = client.get("/api/v1/schedule.ics?location_id=1").headers["etag"]
+
+    with session_factory() as db:
+        db.get(Location, 1).name = "Downtown"
+        db.commit()
+
+    second = client.get("/api/v1/schedule.ics?location_id=1", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+    assert "LOCATION:Downtown\\, Main Street 1\r\n" in second.text
@@ -0,0 +1,70 @@
+# tests/test_schedule_search.py
+
+import random
+from datetime import datetime, time
+
+from app.models import ClassSession, Location, ProgramType, Trainer
+from app.services.schedule_search import ScheduleSearchIndex
+from app.services.schedule_snapshot import ScheduleSnapshot
+from tests.test_schedule_snapshot import make_rows
+
+
+def minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def test_bitset_search_matches_brute_force():
+    rows = make_rows(800, seed=11)
+    index = ScheduleSearchIndex(ScheduleSnapshot(rows))
+    rng = random.Random(3)
+
+    for _ in range(300):
+        locations = rng.choice([None, rng.sample(range(1, 7), rng.randint(1, 3))])
+        programs = rng.choice([None, rng.sample(range(1, 4), rng.randint(1, 2))])
+        trainers = rng.choice([None, rng.sample([1, 2, 3, 9], rng.randint(1, 2))])
+        weekdays = rng.choice([None, rng.sample(range(7), rng.randint(1, 5))])
+        start_from = rng.choice([0, 17 * 60, 8 * 60 + 15])
+        start_to = rng.choice([24 * 60 - 1, 21 * 60, 12 * 60])
+
+        expected = sorted(
+            (
+                r for r in rows
+                if r.is_active
+                and (locations is None or r.location_id in locations)
+                and (programs is None or r.program_type_id in programs)
+                and (trainers is None or r.trainer_id in trainers)
+                and (weekdays is None or r.weekday in weekdays)
+                and start_from <= minutes(r.start_time) <= start_to
+            ),
+            key=lambda r: (r.weekday, minutes(r.start_time), r.location_id, r.id),
+        )
+        got = index.search(locations, programs, trainers, weekdays, start_from, start_to)
+        assert [r.id for r in got] == [r.id for r in expected]
+
+
+def test_search_endpoint_across_locations(client, session_factory):
+
+    def session(session_id, location_id, weekday, hour, is_active=True):
+        return ClassSession(
+            id=session_id, location_id=location_id, program_type_id=1, trainer_id=1, weekday=weekday,
+            starts_at=datetime(2026, 3, 2, hour), ends_at=datetime(2026, 3, 2, hour + 1),
+            start_time=time(hour), end_time=time(hour + 1), capacity=10, is_active=is_active,
+        )
+
+    with session_factory() as db:
+        db.add_all([
+            Location(id=1, name="Center"), Location(id=2, name="Riscani"),
+            ProgramType(id=1, name="Group Stretching"), Trainer(id=1, full_name="Anna"),
+            session(1, 1, 0, 19), session(2, 2, 0, 18), session(3, 2, 5, 19),
+            session(4, 1, 2, 10), session(5, 1, 2, 20, is_active=False),
+        ])
+        db.commit()
+
+    response = client.get(
+        "/api/v1/schedule/search",
+        params={"program_type_id": 1, "weekday": [0, 1, 2, 3, 4], "start_from": "17:00"},
+    )
+
+    assert response.status_code == 200
+    assert [(s["id"], s["location_name"]) for s in response.json()] == [(2, "Riscani"), (1, "Center")]
+    assert response.json()[0]["trainer_name"] == "Anna"
@@ -0,0 +1,110 @@
+# tests/test_schedule_snapshot.py
+
+import random
+from datetime import datetime, time
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.schema import ensure_schema
+from app.models import ClassSession, Location, ProgramType, Trainer
+from app.repositories.read_models import ClassSessionRow
+from app.services.schedule_service import ScheduleService
+from app.services.schedule_snapshot import ScheduleSnapshot
+
+
+def make_rows(count, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for session_id in range(1, count + 1):
+        start = rng.randrange(8 * 60, 21 * 60, 15)
+        rows.append(ClassSessionRow((
+            session_id, rng.randint(1, 5), rng.randint(1, 3), rng.choice([None, 1, 2, 3]), None,
+            rng.randint(0, 6), time(start // 60, start % 60), time((start + 55) // 60, (start + 55) % 60),
+            rng.randint(1, 12), rng.random() > 0.2,
+        )))
+    return rows
+
+
+def test_masks_match_brute_force():
+    rows = make_rows(500)
+    snapshot = ScheduleSnapshot(rows)
+
+    for location_id in (1, 3, 99):
+        for weekday in (None, 2):
+            for trainer_id in (None, 2):
+                expected = sorted(
+                    (r for r in rows
+                     if r.location_id == location_id
+                     and (weekday is None or r.weekday == weekday)
+                     and (trainer_id is None or r.trainer_id == trainer_id)
+                     and r.is_active),
+                    key=lambda r: r.id,
+                )
+                got = snapshot.select(location_id, weekday=weekday, trainer_id=trainer_id, active_only=True)
+                assert [r.id for r in got] == [r.id for r in expected]
+
+
+@pytest.fixture()
+def factory(session_factory):
+    with session_factory() as db:
+        db.add_all([Location(id=1, name="Center"), ProgramType(id=1, name="Yoga"), Trainer(id=1, full_name="Anna")])
+        db.add_all([
+            ClassSession(
+                id=i, location_id=1, program_type_id=1, trainer_id=1, weekday=i % 7,
+                starts_at=datetime(2026, 3, 2, 18, 0), ends_at=datetime(2026, 3, 2, 19, 0),
+                start_time=time(18, 0), end_time=time(19, 0), capacity=10,
+            )
+            for i in range(1, 15)
+        ])
+        db.commit()
+    return session_factory
+
+
+def test_served_from_memory_until_schedule_write(factory):
+    statements = []
+    engine = factory.kw["bind"]
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    with factory() as db:
+        assert len(ScheduleService(db).get_schedule_for_location(1, weekday=1)) == 2
+    built = len(statements)
+    with factory() as db:
+        assert len(ScheduleService(db).get_schedule_for_location(1)) == 14
+    assert len(statements) == built  # без запросов в БД
+
+    with factory() as db:
+        db.get(ClassSession, 1).weekday = 3
+        db.commit()
+    with factory() as db:
+        assert len(ScheduleService(db).get_schedule_for_location(1, weekday=1)) == 1
+
+
+def test_lagging_replica_snapshot_is_not_cached(factory, tmp_path, monkeypatch):
+    from app.db import session as db_session
+    from app.services.schedule_snapshot import get_schedule_snapshot
+
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    ensure_schema(replica)
+    monkeypatch.setattr(db_session, "_session_factory", factory)
+
+    with factory() as db:
+        db.get(ClassSession, 1).weekday = 3
+        db.commit()  # сброс снимка; реплика (пустая) эту запись не получила
+
+    def replica_session():
+        db = sessionmaker(bind=replica)()
+        db.info["replica"] = "replica"
+        return db
+
+    with replica_session() as db:
+        stale = get_schedule_snapshot(db)
+        assert len(stale) == 0
+    with replica_session() as db:
+        assert get_schedule_snapshot(db) is not stale
+
+    with factory() as db:
+        fresh = get_schedule_snapshot(db)
+    with factory() as db:
+        assert get_schedule_snapshot(db) is fresh
@@ -0,0 +1,76 @@
+# tests/test_schedule_versions.py
+
+import asyncio
+import json
+from datetime import datetime, time
+
+import pytest
+
+from app.core.config import settings
+from app.models import ClassSession, Location, ProgramType, Trainer
+from app.services.schedule_changes import ScheduleChangeBroadcaster
+from app.services.schedule_versions import get_schedule_version
+
+
+@pytest.fixture()
+def session_factory(session_factory):
+    with session_factory() as db:
+        db.add_all([
+            Location(id=1, name="Center"), Location(id=2, name="West"),
+            ProgramType(id=1, name="Stretch"), Trainer(id=1, full_name="Anna"),
+        ])
+        db.commit()
+    return session_factory
+
+
+def add_session(factory, location_id=1):
+    with factory() as db:
+        session = ClassSession(
+            location_id=location_id, program_type_id=1, trainer_id=1,
+            starts_at=datetime(2026, 3, 2, 18), ends_at=datetime(2026, 3, 2, 19),
+            weekday=0, start_time=time(18), end_time=time(19), capacity=10,
+        )
+        db.add(session)
+        db.commit()
+        return session.id
+
+
+def test_versions_bumped_in_same_transaction(session_factory):
+    session_id = add_session(session_factory)
+    with session_factory() as db:
+        assert get_schedule_version(db, 1) == 1
+        assert get_schedule_version(db, 2) == 0
+
+        # перенос в другую локацию меняет версии обеих
+        db.get(ClassSession, session_id).location_id = 2
+        db.commit()
+        assert (get_schedule_version(db, 1), get_schedule_version(db, 2)) == (2, 1)
+
+        # откат — версия не меняется
+        db.get(ClassSession, session_id).capacity = 99
+        db.flush()
+        db.rollback()
+        assert get_schedule_version(db, 2) == 1
+        assert get_schedule_version(db) == 3
+
+
+def test_stream_and_long_poll_see_changes(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULE_POLL_SECONDS", 0.05)
+    broadcaster = ScheduleChangeBroadcaster(session_factory)
+
+    async def scenario():
+        stream = broadcaster.stream(location_id=1)
+        first = await stream.__anext__()
+        assert json.loads(first.splitlines()[2][len("data: "):]) == {"location_id": 1, "version": 0}
+
+        waiter = asyncio.create_task(broadcaster.wait_for_change(1, since=0, timeout=5))
+        await asyncio.sleep(0.1)
+        await asyncio.to_thread(add_session, session_factory, 1)
+
+        event = await asyncio.wait_for(stream.__anext__(), 5)
+        assert '"version": 1' in event
+        assert await waiter == 1
+        await stream.aclose()
+        await broadcaster.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,285 @@
+# tests/test_sharding.py
+
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import session as db_session, sharding
+from app.db.base import Base
+from app.db.sharding import PRIMARY_SHARD, ShardRouter, parse_location_ranges, parse_shard_urls
+from app.main import app
+from app.models import ClassSession, Lead, Location, MembershipPlan, OutboxMessage, ProgramType, Trainer
+from app.services.job_scheduler import purge_delivered_outbox
+from app.services.outbox_dispatcher import build_shard_dispatchers
+from app.tools.split_shards import split_database
+
+
+def test_router_maps_location_ranges():
+    router = ShardRouter(
+        parse_shard_urls("balti=sqlite://, cahul=sqlite://"),
+        parse_location_ranges("100-199=balti,200-299=cahul,300=balti"),
+    )
+    assert router.keys() == [PRIMARY_SHARD, "balti", "cahul"]
+    assert [router.shard_for_location(i) for i in (1, 100, 199, 200, 299, 300, 301, None)] == [
+        PRIMARY_SHARD, "balti", "balti", "cahul", "cahul", "balti", PRIMARY_SHARD, PRIMARY_SHARD,
+    ]
+    assert router.location_ranges("balti") == [(100, 199), (300, 300)]
+
+    with pytest.raises(ValueError):
+        ShardRouter({"balti": "sqlite://"}, parse_location_ranges("100-199=balti,150-250=balti"))
+    with pytest.raises(ValueError):
+        ShardRouter({}, parse_location_ranges("100-199=nowhere"))
+
+
+@pytest.fixture()
+def shards(tmp_path, monkeypatch):
+    """primary (локации 1..99) и шард balti (100..199) — два SQLite-файла."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    Base.metadata.create_all(bind=primary)
+    with sessionmaker(bind=primary)() as db:
+        db.add_all([
+            Location(id=1, name="Chisinau Center"), Location(id=100, name="Balti Center"),
+            ProgramType(id=1, name="Group Stretching"), Trainer(id=1, full_name="Anna"),
+        ])
+        db.commit()
+
+    monkeypatch.setattr(db_session, "_engine", primary)
+    monkeypatch.setattr(db_session, "_session_factory", sessionmaker(bind=primary))
+    router = ShardRouter({"balti": f"sqlite:///{tmp_path / 'balti.db'}"}, [(100, 199, "balti")])
+    monkeypatch.setattr(sharding, "_router", router)
+    yield primary, router
+    router.dispose()
+
+
+def lead_names(engine):
+    with sessionmaker(bind=engine)() as db:
+        return sorted(lead.full_name for lead in db.query(Lead))
+
+
+def test_split_then_route_writes_and_fan_out_reads(shards):
+    primary, router = shards
+    with sessionmaker(bind=primary)() as db:
+        db.add_all([
+            Lead(full_name="Old Balti", phone="1", location_id=100, created_at=datetime(2026, 1, 2)),
+            Lead(full_name="Old Chisinau", phone="2", location_id=1, created_at=datetime(2026, 1, 1)),
+            ClassSession(
+                location_id=100, program_type_id=1, trainer_id=1, weekday=0, capacity=10,
+                starts_at=datetime(2026, 1, 5, 18), ends_at=datetime(2026, 1, 5, 19),
+                start_time=datetime(2026, 1, 5, 18).time(), end_time=datetime(2026, 1, 5, 19).time(),
+            ),
+        ])
+        db.commit()
+
+    report = split_database(primary, router, prune=True, log=lambda message: None)
+    assert report["balti"]["leads"] == 1 and report["balti"]["locations"] == 2
+    balti = router.engine("balti")
+    assert lead_names(primary) == ["Old Chisinau"]
+    assert lead_names(balti) == ["Old Balti"]
+    # повторный запуск — upsert, без дублей
+    split_database(primary, router, log=lambda message: None)
+    assert lead_names(balti) == ["Old Balti"]
+
+    client = TestClient(app)
+    for name, location_id in (("New Balti", 100), ("New Chisinau", 1)):
+        response = client.post(
+            "/api/v1/leads/guest-visit",
+            json={"first_name": name, "phone": "+37360000000", "location_id": location_id, "program_type_id": 1},
+        )
+        assert response.status_code == 200
+    assert lead_names(balti) == ["New Balti", "Old Balti"]
+    assert lead_names(primary) == ["New Chisinau", "Old Chisinau"]
+
+    # расписание читается из шарда по location_id
+    assert len(client.get("/api/v1/schedule", params={"location_id": 100}).json()) == 1
+
+    # админка видит лиды всех шардов, новые первыми
+    names = [lead["full_name"] for lead in client.get("/api/v1/admin/leads/").json()]
+    assert names[2:] == ["Old Balti", "Old Chisinau"]
+    assert sorted(names[:2]) == ["New Balti", "New Chisinau"]
+
+
+def test_unknown_city_header_is_rejected(shards):
+    response = TestClient(app).get("/api/v1/locations", headers={"X-Cohai-City": "nowhere"})
+    assert response.status_code == 404
+    assert response.json()["code"] == "UNKNOWN_SHARD"
+
+
+def test_schedule_writes_route_by_body_location(shards):
+    primary, router = shards
+    split_database(primary, router, log=lambda message: None)  # схема и справочники шарда
+    client = TestClient(app)
+
+    response = client.post("/api/v1/admin/class-sessions/", json={
+        "location_id": 100, "program_type_id": 1, "trainer_id": 1,
+        "weekday": 0, "start_time": "18:00", "end_time": "19:00", "capacity": 10,
+    })
+    assert response.status_code == 201, response.text
+
+    header = "location_id,program_type_id,trainer_id,weekday,start_time,end_time,capacity\n"
+    mixed = client.post(
+        "/api/v1/admin/class-sessions/import",
+        content=header + "100,1,1,tue,18:00,19:00,10\n1,1,1,wed,18:00,19:00,10\n",
+    )
+    assert mixed.status_code == 422
+    assert mixed.json()["code"] == "MIXED_SHARDS"
+
+    imported = client.post(
+        "/api/v1/admin/class-sessions/import", content=header + "100,1,1,tue,18:00,19:00,10\n",
+    )
+    assert imported.status_code == 200, imported.text
+
+    def session_count(engine):
+        with sessionmaker(bind=engine)() as db:
+            return db.query(ClassSession).count()
+
+    assert session_count(router.engine("balti")) == 2
+    assert session_count(primary) == 0
+
+
+def test_outbox_is_drained_and_purged_on_every_shard(shards):
+    primary, router = shards
+    split_database(primary, router, log=lambda message: None)
+    client = TestClient(app)
+    for phone, location_id in (("+37360000101", 100), ("+37360000102", 1)):
+        response = client.post(
+            "/api/v1/leads/guest-visit",
+            json={"first_name": "Anna", "phone": phone, "location_id": location_id, "program_type_id": 1},
+        )
+        assert response.status_code == 200
+
+    dispatchers = build_shard_dispatchers()
+    assert [dispatcher.name for dispatcher in dispatchers] == [PRIMARY_SHARD, "balti"]
+    assert [dispatcher.dispatch_once() for dispatcher in dispatchers] == [1, 1]
+
+    for engine in (primary, router.engine("balti")):
+        with sessionmaker(bind=engine)() as db:
+            db.query(OutboxMessage).update({"sent_at": datetime(2000, 1, 1)})
+            db.commit()
+    assert purge_delivered_outbox() == 2
+
+
+def test_schedule_versions_are_read_from_the_owning_shard(shards, monkeypatch):
+    from app.services.schedule_changes import ScheduleChangeBroadcaster
+
+    primary, router = shards
+    split_database(primary, router, log=lambda message: None)
+    client = TestClient(app)
+    for location_id in (1, 100):
+        response = client.post("/api/v1/admin/class-sessions/", json={
+            "location_id": location_id, "program_type_id": 1, "trainer_id": 1,
+            "weekday": location_id % 7, "start_time": "18:00", "end_time": "19:00", "capacity": 10,
+        })
+        assert response.status_code == 201, response.text
+
+    assert ScheduleChangeBroadcaster()._load_versions() == {1: 1, 100: 1}
+
+    # версия одной локации — одна строка из её шарда, без обхода всех шардов
+    def read_all(self):
+        raise AssertionError("all shards were read")
+
+    monkeypatch.setattr(ScheduleChangeBroadcaster, "_load_versions", read_all)
+    response = client.get("/api/v1/schedule/version", params={"location_id": 100})
+    assert response.json() == {"location_id": 100, "version": 1}
+
+
+def test_catalog_writes_go_to_primary_and_are_copied_to_shards(shards):
+    primary, router = shards
+    split_database(primary, router, log=lambda message: None)
+    balti = router.engine("balti")
+    client = TestClient(app)
+
+    def location_name(engine, location_id):
+        with sessionmaker(bind=engine)() as db:
+            location = db.get(Location, location_id)
+            return location.name if location is not None else None
+
+    created = client.post("/api/v1/admin/locations", json={"name": "Balti North", "address": "-"})
+    assert created.status_code == 201
+    new_id = created.json()["id"]
+    assert location_name(primary, new_id) == location_name(balti, new_id) == "Balti North"
+
+    # location_id=100 в пути не уводит запись в шард balti
+    assert client.patch("/api/v1/admin/locations/100", json={"name": "Balti Mall"}).status_code == 200
+    assert location_name(primary, 100) == location_name(balti, 100) == "Balti Mall"
+
+    assert client.delete(f"/api/v1/admin/locations/{new_id}").status_code == 204
+    assert location_name(primary, new_id) is None and location_name(balti, new_id) is None
+
+    # ссылки проверяются и в шардах: занятие локации 100 живёт в balti
+    response = client.post("/api/v1/admin/class-sessions/", json={
+        "location_id": 100, "program_type_id": 1, "trainer_id": 1,
+        "weekday": 0, "start_time": "18:00", "end_time": "19:00", "capacity": 10,
+    })
+    assert response.status_code == 201
+    in_use = client.delete("/api/v1/admin/trainers/1")
+    assert in_use.status_code == 409 and in_use.json()["code"] == "TRAINER_IN_USE"
+
+
+def test_cross_location_reads_fan_out_over_shards(shards):
+    primary, router = shards
+    split_database(primary, router, log=lambda message: None)
+    client = TestClient(app)
+    for location_id, phone in ((1, "+37360000201"), (100, "+37360000202")):
+        response = client.post("/api/v1/admin/class-sessions/", json={
+            "location_id": location_id, "program_type_id": 1, "trainer_id": 1,
+            "weekday": 0 if location_id == 100 else 1, "start_time": "18:00", "end_time": "19:00", "capacity": 10,
+        })
+        assert response.status_code == 201, response.text
+        response = client.post(
+            "/api/v1/leads/guest-visit",
+            json={"first_name": "Anna", "phone": phone, "location_id": location_id, "program_type_id": 1},
+        )
+        assert response.status_code == 200
+
+    found = client.get("/api/v1/schedule/search").json()
+    assert [row["location_id"] for row in found] == [100, 1]  # понедельник раньше вторника
+    assert len(client.get("/api/v1/schedule/search", params={"location_id": [1, 100], "limit": 1}).json()) == 1
+
+    [total] = client.get("/api/v1/admin/analytics/leads/summary").json()
+    assert total["leads"] == 2
+    by_location = client.get("/api/v1/admin/analytics/leads/summary", params={"group_by": "location"}).json()
+    assert [(row["location_id"], row["leads"]) for row in by_location] == [(1, 1), (100, 1)]
+    daily = client.get("/api/v1/admin/analytics/leads/daily").json()
+    assert [row["location_id"] for row in daily] == [1, 100]
+
+
+def test_id_and_all_location_endpoints_cover_every_shard(shards):
+    primary, router = shards
+    split_database(primary, router, log=lambda message: None)
+    client = TestClient(app)
+    for location_id, weekday in ((1, 1), (100, 0), (100, 2)):
+        response = client.post("/api/v1/admin/class-sessions/", json={
+            "location_id": location_id, "program_type_id": 1, "trainer_id": 1,
+            "weekday": weekday, "start_time": "18:00", "end_time": "19:00", "capacity": 10,
+        })
+        assert response.status_code == 201, response.text
+    for engine, location_id in ((primary, 1), (router.engine("balti"), 100)):
+        with sessionmaker(bind=engine)() as db:
+            db.add(MembershipPlan(name=f"Monthly {location_id}", price=90, duration_days=30, location_id=location_id))
+            db.commit()
+
+    # id=1 есть в обоих шардах; id=2 — только в balti
+    ambiguous = client.get("/api/v1/admin/class-sessions/1")
+    assert ambiguous.status_code == 422 and ambiguous.json()["code"] == "AMBIGUOUS_ID"
+    assert client.get("/api/v1/admin/class-sessions/1", headers={"X-Cohai-City": "balti"}).json()["location_id"] == 100
+    assert client.get("/api/v1/admin/class-sessions/1", params={"location_id": 1}).json()["location_id"] == 1
+    assert client.get("/api/v1/admin/class-sessions/2").json()["location_id"] == 100
+
+    moved = client.patch("/api/v1/admin/class-sessions/2", json={"location_id": 1})
+    assert moved.status_code == 422 and moved.json()["code"] == "CROSS_SHARD_MOVE"
+    assert client.patch("/api/v1/admin/class-sessions/2", json={"capacity": 12}).json()["capacity"] == 12
+    assert client.delete("/api/v1/admin/class-sessions/2").status_code == 204
+    assert client.get("/api/v1/admin/class-sessions/2").status_code == 404
+
+    plans = client.get("/api/v1/memberships").json()
+    assert [(plan["id"], plan["location_id"]) for plan in plans] == [(1, 1), (1, 100)]
+    assert client.get("/api/v1/memberships/1", headers={"X-Cohai-City": "balti"}).json()["location_id"] == 100
+
+    feed = client.get("/api/v1/schedule.ics").text
+    assert "Balti Center" in feed and "Chisinau Center" in feed
+
+    slots = client.get("/api/v1/admin/occupancy/slots", params={"under": 1}).json()
+    assert sorted(slot["location_id"] for slot in slots["under"]) == [1, 100]